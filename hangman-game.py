@@ -1,76 +1,34 @@
-import random
+import argparse
 import time
-import os
-import json
-from datetime import datetime
 
-class HangmanGame:
-    """
-    A comprehensive Hangman game with multiple features:
-    - Different difficulty levels
-    - Word categories
-    - Score tracking
-    - ASCII art animations
-    - Hint system
-    - Player profiles
-    - Basic statistics
+from hangman_checkpoint import CheckpointStore, restore_game
+from hangman_engine import (
+    HangmanEngine, INVALID, ALREADY_GUESSED, CORRECT, REVEALED, HINT_RAREST, HINT_STRATEGIES,
+)
+from hangman_events import GameEventLog
+from hangman_profiles import PROFILE_BACKENDS, open_profile_store
+from hangman_render import FrameRenderer
+from hangman_selection import WordSelector, target_difficulty
+from hangman_words import WORD_CATEGORIES, WordIndex
+
+# Screens of the game; each screen method returns the next one to show
+MAIN_MENU = "main_menu"
+PROFILE_MENU = "profile_menu"
+GAME = "game"
+GAME_OVER = "game_over"
+EXIT = "exit"
+
+# Difficulty setting that picks words from the player's results
+ADAPTIVE = "adaptive"
+# Difficulty setting where the word keeps changing to dodge guesses
+EVIL = "evil"
+# Hint strategy that asks the solver for the letter hardest to find by guessing
+SOLVER_HINT = "solver"
+
+# ASCII art for hangman stages
+HANGMAN_STAGES = [
+    # 0 incorrect guesses
     """
-    
-    def __init__(self):
-        """Initialize the Hangman game with default settings."""
-        # Game configuration
-        self.max_incorrect_guesses = 6  # Number of attempts before game over
-        self.current_incorrect_guesses = 0  # Current number of incorrect guesses
-        self.guessed_letters = []  # Letters already guessed
-        self.word_to_guess = ""  # The word player needs to guess
-        self.word_display = []  # Word display with revealed letters and underscores
-        self.game_over = False  # Flag to track if the game is over
-        self.game_won = False  # Flag to track if the player won
-        self.current_player = "Guest"  # Default player name
-        self.score = 0  # Player's score for the current game
-        self.difficulty = "medium"  # Default difficulty level
-        self.category = "random"  # Default word category
-        self.game_start_time = None  # Track when the game started
-        self.game_end_time = None  # Track when the game ended
-        self.hints_used = 0  # Track how many hints were used
-        
-        # Word categories with words of varying difficulties
-        self.word_categories = {
-            "animals": {
-                "easy": ["dog", "cat", "fish", "bird", "frog", "duck", "cow", "pig", "fox", "wolf"],
-                "medium": ["dolphin", "elephant", "penguin", "kangaroo", "leopard", "giraffe", "zebra", "monkey", "turtle", "rabbit"],
-                "hard": ["platypus", "rhinoceros", "hippopotamus", "chameleon", "crocodile", "chimpanzee", "porcupine", "orangutan", "anaconda", "tarantula"]
-            },
-            "countries": {
-                "easy": ["spain", "japan", "italy", "egypt", "india", "china", "peru", "chile", "cuba", "mali"],
-                "medium": ["australia", "germany", "canada", "mexico", "brazil", "turkey", "russia", "sweden", "ireland", "morocco"],
-                "hard": ["kazakhstan", "zimbabwe", "uruguay", "switzerland", "philippines", "madagascar", "mongolia", "nicaragua", "azerbaijan", "bangladesh"]
-            },
-            "technology": {
-                "easy": ["mouse", "phone", "code", "game", "data", "wifi", "chip", "blog", "site", "byte"],
-                "medium": ["keyboard", "internet", "software", "hardware", "database", "network", "website", "computer", "algorithm", "password"],
-                "hard": ["cryptography", "blockchain", "javascript", "middleware", "kubernetes", "recursion", "virtualization", "microservice", "authentication", "algorithm"]
-            },
-            "space": {
-                "easy": ["star", "moon", "mars", "sun", "sky", "earth", "space", "comet", "orbit", "venus"],
-                "medium": ["galaxy", "jupiter", "neptune", "planet", "asteroid", "meteor", "saturn", "gravity", "cosmos", "telescope"],
-                "hard": ["constellation", "supernova", "spacecraft", "atmosphere", "nebulosity", "satellite", "observatory", "interstellar", "gravitational", "astrophysics"]
-            },
-            "food": {
-                "easy": ["cake", "rice", "fish", "meat", "milk", "corn", "egg", "soup", "taco", "pie"],
-                "medium": ["chicken", "burger", "spaghetti", "sandwich", "chocolate", "pancake", "lasagna", "burrito", "waffle", "cupcake"],
-                "hard": ["quesadilla", "croissant", "asparagus", "blueberry", "carbonara", "guacamole", "cheesecake", "stroganoff", "bruschetta", "frittata"]
-            }
-        }
-        
-        # Player profiles storage
-        self.player_profiles = {}
-        self.load_player_profiles()
-        
-        # ASCII art for hangman stages
-        self.hangman_stages = [
-            # 0 incorrect guesses
-            """
               +---+
               |   |
                   |
@@ -79,8 +37,8 @@ class HangmanGame:
                   |
             =========
             """,
-            # 1 incorrect guess
-            """
+    # 1 incorrect guess
+    """
               +---+
               |   |
               O   |
@@ -89,8 +47,8 @@ class HangmanGame:
                   |
             =========
             """,
-            # 2 incorrect guesses
-            """
+    # 2 incorrect guesses
+    """
               +---+
               |   |
               O   |
@@ -99,8 +57,8 @@ class HangmanGame:
                   |
             =========
             """,
-            # 3 incorrect guesses
-            """
+    # 3 incorrect guesses
+    """
               +---+
               |   |
               O   |
@@ -109,8 +67,8 @@ class HangmanGame:
                   |
             =========
             """,
-            # 4 incorrect guesses
-            """
+    # 4 incorrect guesses
+    """
               +---+
               |   |
               O   |
@@ -119,8 +77,8 @@ class HangmanGame:
                   |
             =========
             """,
-            # 5 incorrect guesses
-            """
+    # 5 incorrect guesses
+    """
               +---+
               |   |
               O   |
@@ -129,8 +87,8 @@ class HangmanGame:
                   |
             =========
             """,
-            # 6 incorrect guesses (game over)
-            """
+    # 6 incorrect guesses (game over)
+    """
               +---+
               |   |
               O   |
@@ -139,10 +97,10 @@ class HangmanGame:
                   |
             =========
             """
-        ]
-        
-        # ASCII art for game title
-        self.title_art = """
+]
+
+# ASCII art for game title
+TITLE_ART = """
         ██╗  ██╗ █████╗ ███╗   ██╗ ██████╗ ███╗   ███╗ █████╗ ███╗   ██╗
         ██║  ██║██╔══██╗████╗  ██║██╔════╝ ████╗ ████║██╔══██╗████╗  ██║
         ███████║███████║██╔██╗ ██║██║  ███╗██╔████╔██║███████║██╔██╗ ██║
@@ -150,9 +108,12 @@ class HangmanGame:
         ██║  ██║██║  ██║██║ ╚████║╚██████╔╝██║ ╚═╝ ██║██║  ██║██║ ╚████║
         ╚═╝  ╚═╝╚═╝  ╚═╝╚═╝  ╚═══╝ ╚═════╝ ╚═╝     ╚═╝╚═╝  ╚═╝╚═╝  ╚═══╝
         """
-        
-        # ASCII art for win/lose messages
-        self.win_art = """
+
+# One-line title of the game screen, which has to fit a 24-row terminal
+GAME_TITLE = "        ═════════════════════  H A N G M A N  ═════════════════════"
+
+# ASCII art for win/lose messages
+WIN_ART = """
          __   __  _______  __   __    _     _  ___   __    _  __   __
         |  | |  ||       ||  | |  |  | | _ | ||   | |  |  | ||  | |  |
         |  |_|  ||   _   ||  | |  |  | || || ||   | |   |_| ||  |_|  |
@@ -161,8 +122,8 @@ class HangmanGame:
           |   |  |       ||       |  |   _   ||   | | | |   ||   _   |
           |___|  |_______||_______|  |__| |__||___| |_|  |__||__| |__|
         """
-        
-        self.lose_art = """
+
+LOSE_ART = """
          __   __  _______  __   __    ___      _______  _______  _______    __
         |  | |  ||       ||  | |  |  |   |    |       ||       ||       |  |  |
         |  |_|  ||   _   ||  | |  |  |   |    |   _   ||  _____||_     _|  |  |
@@ -172,88 +133,150 @@ class HangmanGame:
           |___|  |_______||_______|  |_______||_______||_______|  |___|    |__|
         """
 
+
+class HangmanGame:
+    """
+    A comprehensive Hangman game with multiple features:
+    - Different difficulty levels
+    - Word categories
+    - Score tracking
+    - ASCII art animations
+    - Hint system
+    - Player profiles
+    - Basic statistics
+    """
+    
+    # The art is shared by every game rather than rebuilt for each one
+    hangman_stages = [stage.lstrip("\n").rstrip() for stage in HANGMAN_STAGES]  # Without the blank margins
+    title_art = TITLE_ART
+    game_title = GAME_TITLE
+    win_art = WIN_ART
+    lose_art = LOSE_ART
+    
+    def __init__(self, profile_store=None, word_index=None, profile_backend="journal", event_log=None,
+                 hint_strategy=HINT_RAREST, checkpoints=None):
+        """
+        Initialize the Hangman game with default settings.
+        
+        Without a profile_store, the store for profile_backend is only opened
+        when a profile is first needed, so a guest never waits for it.
+        word_index defaults to the built-in word categories, indexed when a
+        word is first needed, and event_log to a GameEventLog in the current
+        directory (opened on the first finished game). hint_strategy is one of
+        the engine's HINT_STRATEGIES, or SOLVER_HINT. checkpoints defaults to
+        a CheckpointStore in the current directory, read on the first game.
+        """
+        # Game configuration
+        self.engine = HangmanEngine()  # Game rules and state of the current game
+        self.standard_engine = self.engine
+        self.evil_engine = None  # Built on the first evil game
+        # Redraws only the changed lines of the game screen; the choice and letter
+        # prompts and the feedback line are printed below it
+        self.renderer = FrameRenderer(reserved=3)
+        self.current_player = "Guest"  # Default player name
+        self.difficulty = "medium"  # Default difficulty level
+        self.category = "random"  # Default word category
+        self.word_id = None  # Word id of the current game in the word index
+        
+        # Words to guess, indexed by category, difficulty and length on first use
+        self._word_index = word_index
+        self._word_selector = None  # No repeats until a player has seen every word
+        self.solver = None  # Built from the word index when first needed
+        self.hint_session = None  # Solver narrowing state of the current game, for solver hints
+        self.hint_strategy = hint_strategy
+        
+        # Player profiles storage, opened on first use
+        self.profile_backend = profile_backend
+        self._player_profiles = profile_store
+        
+        # Every finished game is appended to the binary event log for replay
+        self.event_log = event_log if event_log is not None else GameEventLog()
+        
+        # The game in progress is checkpointed after every move, so it can be resumed
+        self._checkpoints = checkpoints
+        
+        # Latency histograms and game counters, only kept once enable_metrics() is called
+        self.metrics = None
+    
+    @property
+    def word_index(self):
+        """The words to guess, indexed from the built-in categories on first use."""
+        if self._word_index is None:
+            self._word_index = WordIndex.from_categories(WORD_CATEGORIES)
+        return self._word_index
+    
+    @property
+    def word_selector(self):
+        """The shuffle-bag word selector, built on first use."""
+        if self._word_selector is None:
+            self._word_selector = WordSelector(self.word_index)
+        return self._word_selector
+    
+    @property
+    def checkpoints(self):
+        """Checkpoints of unfinished games, one per player, opened on first use."""
+        if self._checkpoints is None:
+            self._checkpoints = CheckpointStore(self.word_index)
+        return self._checkpoints
+    
+    def enable_metrics(self, metrics):
+        """Record GameMetrics for guesses, rendering, profile loads, saves and writes, and word selection."""
+        from hangman_metrics import instrument
+        
+        self.metrics = metrics
+        # The timers wrap this game's methods, so a game without metrics pays nothing.
+        # Guesses are timed in the engine, without process_guess's feedback pause.
+        instrument(self.standard_engine, "guess", metrics.guess_seconds)
+        if self.evil_engine is not None:
+            instrument(self.evil_engine, "guess", metrics.guess_seconds)
+        instrument(self, "display_game", metrics.render_seconds)
+        instrument(self, "load_player_profiles", metrics.profile_load_seconds)
+        instrument(self, "update_player_stats", metrics.profile_save_seconds)
+        if self._player_profiles is not None:
+            metrics.instrument_profile_store(self._player_profiles)
+        instrument(self, "choose_random_word", metrics.word_selection_seconds)
+    
     def clear_screen(self):
-        """Clear the console screen (works on Windows, macOS, and Linux)."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Clear the console screen with ANSI escapes (no shell is spawned)."""
+        self.renderer.clear()
     
-    def load_player_profiles(self):
-        """Load player profiles from a JSON file if it exists."""
-        try:
-            with open("hangman_profiles.json", "r") as file:
-                self.player_profiles = json.load(file)
+    @property
+    def player_profiles(self):
+        """The player profile store, opened the first time it is used."""
+        if self._player_profiles is None:
+            self.load_player_profiles()
+        return self._player_profiles
+    
+    def load_player_profiles(self, profile_store=None):
+        """Open the player profile store (JSON snapshot plus change journal by default)."""
+        self._player_profiles = profile_store if profile_store is not None else open_profile_store(self.profile_backend)
+        if self.metrics is not None:
+            # Journal writes happen behind update_player_stats, in the store's own flushes
+            self.metrics.instrument_profile_store(self._player_profiles)
+        if self._player_profiles.load_status == "loaded":
             print("Player profiles loaded successfully!")
-        except FileNotFoundError:
-            # If the file doesn't exist, create an empty dictionary
-            self.player_profiles = {}
+        elif self._player_profiles.load_status == "corrupted":
+            print(f"Player profile file corrupted (a copy was kept as {self._player_profiles.path}.corrupt). "
+                  "Starting fresh!")
+        else:
             print("No player profiles found. Starting fresh!")
-        except json.JSONDecodeError:
-            # If the file is corrupted
-            self.player_profiles = {}
-            print("Player profile file corrupted. Starting fresh!")
-    
-    def save_player_profiles(self):
-        """Save player profiles to a JSON file."""
-        try:
-            with open("hangman_profiles.json", "w") as file:
-                json.dump(self.player_profiles, file, indent=4)
-            print("Player profiles saved successfully!")
-        except Exception as e:
-            print(f"Failed to save player profiles: {e}")
     
     def create_player_profile(self, name):
         """Create a new player profile or load an existing one."""
         if name in self.player_profiles:
             print(f"Welcome back, {name}!")
         else:
-            self.player_profiles[name] = {
-                "games_played": 0,
-                "games_won": 0,
-                "games_lost": 0,
-                "best_score": 0,
-                "total_score": 0,
-                "favorite_category": "",
-                "last_played": "",
-                "highest_streak": 0,
-                "current_streak": 0
-            }
+            self.player_profiles.create(name)
             print(f"New player profile created for {name}!")
         
         self.current_player = name
     
     def update_player_stats(self, won):
         """Update player statistics after a game."""
-        if self.current_player in self.player_profiles:
-            profile = self.player_profiles[self.current_player]
-            profile["games_played"] += 1
-            profile["last_played"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            if won:
-                profile["games_won"] += 1
-                profile["current_streak"] += 1
-                if profile["current_streak"] > profile["highest_streak"]:
-                    profile["highest_streak"] = profile["current_streak"]
-            else:
-                profile["games_lost"] += 1
-                profile["current_streak"] = 0
-            
-            profile["total_score"] += self.score
-            if self.score > profile["best_score"]:
-                profile["best_score"] = self.score
-            
-            # Update favorite category based on most played
-            if "category_counts" not in profile:
-                profile["category_counts"] = {}
-            
-            if self.category not in profile["category_counts"]:
-                profile["category_counts"][self.category] = 1
-            else:
-                profile["category_counts"][self.category] += 1
-            
-            # Find the most played category
-            favorite = max(profile["category_counts"].items(), key=lambda x: x[1])
-            profile["favorite_category"] = favorite[0]
-            
-            self.save_player_profiles()
+        # A player who never selected a profile this session has nothing to update
+        if self._player_profiles is not None and self.current_player in self._player_profiles:
+            # One journal append instead of rewriting the whole profile file
+            self.player_profiles.record_game(self.current_player, won, self.engine.score, self.category)
     
     def display_player_stats(self):
         """Display player statistics."""
@@ -266,205 +289,168 @@ class HangmanGame:
         print(f"\n{'=' * 40}")
         print(f"  Player Stats: {self.current_player}")
         print(f"{'=' * 40}")
-        print(f"  Games Played: {profile['games_played']}")
-        print(f"  Games Won: {profile['games_won']}")
-        print(f"  Games Lost: {profile['games_lost']}")
-        win_rate = 0 if profile['games_played'] == 0 else (profile['games_won'] / profile['games_played']) * 100
-        print(f"  Win Rate: {win_rate:.1f}%")
-        print(f"  Best Score: {profile['best_score']}")
-        print(f"  Total Score: {profile['total_score']}")
-        print(f"  Current Streak: {profile['current_streak']}")
-        print(f"  Highest Streak: {profile['highest_streak']}")
-        
-        if "favorite_category" in profile and profile["favorite_category"]:
-            print(f"  Favorite Category: {profile['favorite_category'].capitalize()}")
-        
-        if "last_played" in profile and profile["last_played"]:
-            print(f"  Last Played: {profile['last_played']}")
+        print(f"  Games Played: {profile.games_played}")
+        print(f"  Games Won: {profile.games_won}")
+        print(f"  Games Lost: {profile.games_lost}")
+        print(f"  Win Rate: {profile.win_rate * 100:.1f}%")
+        print(f"  Best Score: {profile.best_score}")
+        print(f"  Total Score: {profile.total_score}")
+        print(f"  Current Streak: {profile.current_streak}")
+        print(f"  Highest Streak: {profile.highest_streak}")
+        
+        if profile.favorite_category:
+            print(f"  Favorite Category: {profile.favorite_category.capitalize()}")
+        
+        if profile.last_played:
+            print(f"  Last Played: {profile.last_played}")
         
         print(f"{'=' * 40}")
         input("\nPress Enter to continue...")
     
-    def choose_random_word(self):
-        """Choose a random word based on the current category and difficulty."""
-        # Get words from the selected category or from all categories if 'random'
-        if self.category == "random":
-            # If random category, pick a random category first
-            category_name = random.choice(list(self.word_categories.keys()))
-            words = self.word_categories[category_name][self.difficulty]
-        else:
-            words = self.word_categories[self.category][self.difficulty]
-        
-        # Return a random word from the list
-        return random.choice(words)
+    def close_player_profiles(self):
+        """Close the profile store if it was ever opened."""
+        if self._player_profiles is not None:
+            self._player_profiles.close()
     
-    def initialize_word_display(self):
-        """Initialize the word display with underscores for each letter."""
-        self.word_display = ["_" for _ in self.word_to_guess]
+    def close_word_selector(self):
+        """Fold the journaled draws into the shuffle bags file, if a word was ever drawn."""
+        if self._word_selector is not None:
+            self._word_selector.close()
     
-    def display_game(self):
-        """Display the current state of the game."""
-        self.clear_screen()
-        
-        # Display title
-        print(self.title_art)
-        
-        # Display game information
-        print(f"\nPlayer: {self.current_player} | Difficulty: {self.difficulty.capitalize()} | Category: {self.category.capitalize()}")
-        print(f"Score: {self.score} | Hints Used: {self.hints_used}")
-        
-        # Display hangman ASCII art
-        print(self.hangman_stages[self.current_incorrect_guesses])
-        
-        # Display word with guessed letters
-        print("\nWord: " + " ".join(self.word_display))
-        
-        # Display guessed letters
-        print("\nGuessed letters: " + ", ".join(sorted(self.guessed_letters)) if self.guessed_letters else "\nGuessed letters: None")
+    def choose_random_word(self):
+        """
+        Choose the next word and return its word id with the difficulty it is scored at.
         
-        # Display remaining attempts
-        remaining = self.max_incorrect_guesses - self.current_incorrect_guesses
-        print(f"\nRemaining attempts: {remaining}")
-    
-    def update_word_display(self, letter):
-        """Update the word display with the correctly guessed letter."""
-        for i in range(len(self.word_to_guess)):
-            if self.word_to_guess[i] == letter:
-                self.word_display[i] = letter
+        Fixed difficulties draw a word the current player has not seen yet;
+        adaptive play draws a word near the player's target difficulty.
+        """
+        if self.difficulty == ADAPTIVE:
+            profile = self._player_profiles.get(self.current_player) if self._player_profiles is not None else None
+            word_id = self.word_selector.draw_near_id(target_difficulty(profile), self.category)
+            return word_id, self.word_index.difficulty_of(word_id)
+        if self.difficulty == EVIL:
+            # Only the length and category of the word are fixed; it is scored as a hard game
+            return self.word_selector.draw_id(self.current_player, self.category, "hard"), "hard"
+        # The 'random' category draws from every category, weighted by its size
+        return self.word_selector.draw_id(self.current_player, self.category, self.difficulty), self.difficulty
     
-    def is_word_guessed(self):
-        """Check if the word has been completely guessed."""
-        return "_" not in self.word_display
+    def display_game(self):
+        """Display the current state of the game and the in-game options."""
+        engine = self.engine
+        frame = [
+            # Title
+            self.game_title,
+            # Game information
+            f"Player: {self.current_player} | Difficulty: {self.difficulty.capitalize()} | Category: {self.category.capitalize()}",
+            f"Score: {engine.score} | Hints Used: {engine.hints_used}",
+            # Hangman ASCII art
+            self.hangman_stages[engine.current_incorrect_guesses],
+            # Word with guessed letters
+            "\nWord: " + " ".join(engine.word_display),
+            # Guessed letters
+            "Guessed letters: " + (", ".join(engine.guessed_letters) if engine.guessed_letters else "None"),
+            # Remaining attempts
+            f"Remaining attempts: {engine.remaining_attempts}",
+            "\nOptions:",
+            "1. Guess a letter",
+            "2. Use a hint",
+            "3. Return to main menu",
+        ]
+        # Built as one frame so only the lines that changed are redrawn
+        self.renderer.render("\n".join(frame))
     
     def process_guess(self, guess):
-        """Process a player's guess."""
-        # Check if the guess is a single letter
-        if len(guess) != 1 or not guess.isalpha():
+        """Process a player's guess and give feedback on the result."""
+        result = self.engine.guess(guess)
+        
+        if result.outcome == INVALID:
             print("Please enter a single letter.")
             time.sleep(1)
-            return
-        
-        # Convert to lowercase
-        guess = guess.lower()
-        
-        # Check if the letter has already been guessed
-        if guess in self.guessed_letters:
+        elif result.outcome == ALREADY_GUESSED:
             print("You already guessed that letter!")
             time.sleep(1)
-            return
-        
-        # Add the letter to guessed letters
-        self.guessed_letters.append(guess)
-        
-        # Check if the guess is correct
-        if guess in self.word_to_guess:
-            print("Good guess!")
-            self.update_word_display(guess)
-            # Calculate score for correct guess based on difficulty
-            difficulty_multiplier = {"easy": 1, "medium": 2, "hard": 3}
-            self.score += 10 * difficulty_multiplier[self.difficulty]
         else:
-            print("Incorrect guess!")
-            self.current_incorrect_guesses += 1
-        
-        # Check if the game is over
-        if self.is_word_guessed():
-            self.game_won = True
-            self.game_over = True
-            self.game_end_time = time.time()
-            # Bonus points for winning based on difficulty and remaining attempts
-            time_bonus = max(0, int(300 - (self.game_end_time - self.game_start_time)))
-            difficulty_multiplier = {"easy": 1, "medium": 2, "hard": 3}
-            remaining_attempts = self.max_incorrect_guesses - self.current_incorrect_guesses
-            win_bonus = 50 * difficulty_multiplier[self.difficulty] * (remaining_attempts + 1)
-            self.score += win_bonus + time_bonus
-            # Penalty for using hints
-            self.score -= self.hints_used * 25
-            self.score = max(0, self.score)  # Ensure score doesn't go negative
-        elif self.current_incorrect_guesses >= self.max_incorrect_guesses:
-            self.game_over = True
-            self.game_end_time = time.time()
-        
-        time.sleep(0.5)  # Brief pause for feedback
+            print("Good guess!" if result.outcome == CORRECT else "Incorrect guess!")
+            time.sleep(0.5)  # Brief pause for feedback
+    
+    def get_solver(self):
+        """Return the solver over the word index, building it on first use."""
+        if self.solver is None:
+            from hangman_solver import HangmanSolver
+            
+            self.solver = HangmanSolver.from_index(self.word_index)
+        return self.solver
     
     def provide_hint(self):
         """Provide a hint to the player at the cost of score reduction."""
-        if "_" not in self.word_display:
-            print("You've already guessed the word! No hint needed.")
-            time.sleep(1)
-            return
-        
-        # Find all hidden letters
-        hidden_indices = [i for i, char in enumerate(self.word_display) if char == "_"]
-        
-        if not hidden_indices:
-            print("No more hints available.")
-            time.sleep(1)
-            return
-        
-        # Choose a random hidden letter to reveal
-        hint_index = random.choice(hidden_indices)
-        hint_letter = self.word_to_guess[hint_index]
+        if self.hint_strategy == SOLVER_HINT:
+            # Reveal the letter the player would be least likely to find by guessing
+            if self.hint_session is None:
+                self.hint_session = self.get_solver().session()
+            result = self.engine.hint(self.hint_session.hint_letter(self.engine))
+        else:
+            result = self.engine.hint(strategy=self.hint_strategy)
         
-        # Check if the letter has already been guessed
-        if hint_letter in self.guessed_letters:
-            print("Let me find another hint...")
+        if result.outcome == REVEALED:
+            print(f"Hint: The letter '{result.letter}' is in the word!")
+            time.sleep(1.5)
+        else:
+            print("You've already guessed the word! No hint needed.")
             time.sleep(1)
-            self.provide_hint()  # Try again with another letter
-            return
-        
-        # Update the display and guessed letters
-        self.guessed_letters.append(hint_letter)
-        self.update_word_display(hint_letter)
-        
-        # Increment hints used counter and reduce score
-        self.hints_used += 1
-        self.score = max(0, self.score - 25)  # Reduce score but don't go below 0
-        
-        print(f"Hint: The letter '{hint_letter}' is in the word!")
-        time.sleep(1.5)
     
     def show_game_over(self):
-        """Display the game over screen."""
+        """Record the finished game, display the game over screen and return the next screen."""
+        self.update_player_stats(self.engine.game_won)
+        self.event_log.record_game(self.engine, self.current_player, self.category)
+        if self.metrics is not None:
+            self.metrics.game_finished(self.engine.game_won)
+        
+        while True:
+            self.draw_game_over()
+            choice = self.read_game_over_choice()
+            if choice == "1":
+                return GAME  # Play again
+            elif choice == "2":
+                self.display_player_stats()  # Then show this screen again
+            else:
+                return MAIN_MENU
+    
+    def draw_game_over(self):
+        """Draw the result of the finished game and the game over options."""
+        engine = self.engine
         self.clear_screen()
         
-        if self.game_won:
+        if engine.game_won:
             print(self.win_art)
-            print(f"\nCongratulations, {self.current_player}! You guessed the word: {self.word_to_guess}")
-            print(f"Your score: {self.score}")
+            print(f"\nCongratulations, {self.current_player}! You guessed the word: {engine.word_to_guess}")
+            print(f"Your score: {engine.score}")
             
             # Calculate time taken
-            time_taken = int(self.game_end_time - self.game_start_time)
+            time_taken = int(engine.elapsed)
             minutes = time_taken // 60
             seconds = time_taken % 60
             print(f"Time taken: {minutes} minutes and {seconds} seconds")
         else:
             print(self.lose_art)
             print(f"\nSorry, {self.current_player}! You've run out of attempts.")
-            print(f"The word was: {self.word_to_guess}")
-            print(f"Your score: {self.score}")
-        
-        self.update_player_stats(self.game_won)
+            print(f"The word was: {engine.word_to_guess}")
+            print(f"Your score: {engine.score}")
         
         print("\nDo you want to:")
         print("1. Play again")
         print("2. View your statistics")
         print("3. Exit")
-        
+    
+    def read_game_over_choice(self):
+        """Ask for a valid game over option."""
         while True:
             choice = input("\nEnter your choice (1-3): ")
-            if choice == "1":
-                return True  # Play again
-            elif choice == "2":
-                self.display_player_stats()
-                return self.show_game_over()  # Show this menu again after displaying stats
-            elif choice == "3":
-                return False  # Exit
-            else:
-                print("Invalid choice. Please try again.")
+            if choice in ("1", "2", "3"):
+                return choice
+            print("Invalid choice. Please try again.")
     
     def show_main_menu(self):
-        """Display the main menu of the game."""
+        """Display the main menu of the game and return the next screen."""
         self.clear_screen()
         print(self.title_art)
         print("\nWelcome to Hangman!")
@@ -481,27 +467,25 @@ class HangmanGame:
             choice = input("\nEnter your choice (1-7): ")
             
             if choice == "1":
-                self.start_game()
-                break
+                return GAME
             elif choice == "2":
                 self.select_difficulty()
-                return self.show_main_menu()
+                return MAIN_MENU
             elif choice == "3":
                 self.select_category()
-                return self.show_main_menu()
+                return MAIN_MENU
             elif choice == "4":
-                self.manage_profile()
-                return self.show_main_menu()
+                return PROFILE_MENU
             elif choice == "5":
                 self.display_player_stats()
-                return self.show_main_menu()
+                return MAIN_MENU
             elif choice == "6":
                 self.show_instructions()
-                return self.show_main_menu()
+                return MAIN_MENU
             elif choice == "7":
                 self.clear_screen()
                 print("\nThank you for playing Hangman! Goodbye.")
-                return False
+                return EXIT
             else:
                 print("Invalid choice. Please try again.")
     
@@ -512,10 +496,12 @@ class HangmanGame:
         print("1. Easy (Simple words)")
         print("2. Medium (Moderate words)")
         print("3. Hard (Challenging words)")
-        print("4. Back to main menu")
+        print("4. Adaptive (Follows your results)")
+        print("5. Evil (The word dodges your guesses)")
+        print("6. Back to main menu")
         
         while True:
-            choice = input("\nEnter your choice (1-4): ")
+            choice = input("\nEnter your choice (1-6): ")
             
             if choice == "1":
                 self.difficulty = "easy"
@@ -533,6 +519,16 @@ class HangmanGame:
                 time.sleep(1)
                 break
             elif choice == "4":
+                self.difficulty = ADAPTIVE
+                print("Difficulty set to Adaptive")
+                time.sleep(1)
+                break
+            elif choice == "5":
+                self.difficulty = EVIL
+                print("Difficulty set to Evil")
+                time.sleep(1)
+                break
+            elif choice == "6":
                 return
             else:
                 print("Invalid choice. Please try again.")
@@ -543,7 +539,7 @@ class HangmanGame:
         print("\nSelect Word Category:")
         
         # Display available categories
-        categories = list(self.word_categories.keys())
+        categories = self.word_index.categories()
         categories.append("random")  # Add random option
         
         for i, category in enumerate(categories, 1):
@@ -569,23 +565,24 @@ class HangmanGame:
                 print("Please enter a number.")
     
     def manage_profile(self):
-        """Manage player profiles."""
+        """Manage player profiles and return the next screen."""
         self.clear_screen()
         print("\nPlayer Profile Management:")
         print("1. Create/Select a profile")
         print("2. View all profiles")
         print("3. Delete a profile")
-        print("4. Back to main menu")
+        print("4. View leaderboard")
+        print("5. Back to main menu")
         
         while True:
-            choice = input("\nEnter your choice (1-4): ")
+            choice = input("\nEnter your choice (1-5): ")
             
             if choice == "1":
                 name = input("\nEnter your name: ").strip()
                 if name:
                     self.create_player_profile(name)
                     time.sleep(1)
-                break
+                return MAIN_MENU
             elif choice == "2":
                 self.clear_screen()
                 print("\nAvailable Profiles:")
@@ -597,15 +594,43 @@ class HangmanGame:
                         print(f"{i}. {name}")
                 
                 input("\nPress Enter to continue...")
-                return self.manage_profile()
+                return PROFILE_MENU
             elif choice == "3":
                 self.delete_profile()
-                return self.manage_profile()
+                return PROFILE_MENU
             elif choice == "4":
-                return
+                self.show_leaderboard()
+                return PROFILE_MENU
+            elif choice == "5":
+                return MAIN_MENU
             else:
                 print("Invalid choice. Please try again.")
     
+    def show_leaderboard(self, limit=10):
+        """Display the top players by best score, streak, games played and win rate."""
+        self.clear_screen()
+        print(f"\n{'=' * 40}")
+        print("  Leaderboard")
+        print(f"{'=' * 40}")
+        
+        boards = [
+            ("Best Score", "best_score"),
+            ("Highest Streak", "highest_streak"),
+            ("Games Played", "games_played"),
+            ("Win Rate", "win_rate"),
+        ]
+        for title, field in boards:
+            print(f"\n  {title}:")
+            entries = self.player_profiles.leaderboard(field, limit)
+            if not entries:
+                print("    No games played yet.")
+            for i, (name, value) in enumerate(entries, 1):
+                shown = f"{value * 100:.1f}%" if field == "win_rate" else value
+                print(f"    {i}. {name}: {shown}")
+        
+        print(f"{'=' * 40}")
+        input("\nPress Enter to continue...")
+    
     def delete_profile(self):
         """Delete a player profile."""
         self.clear_screen()
@@ -633,8 +658,7 @@ class HangmanGame:
                     # Confirm deletion
                     confirm = input(f"Are you sure you want to delete the profile for {profile_name}? (y/n): ")
                     if confirm.lower() == 'y':
-                        del self.player_profiles[profile_name]
-                        self.save_player_profiles()
+                        self.player_profiles.delete(profile_name)
                         print(f"Profile for {profile_name} deleted.")
                         
                         # If the current player's profile was deleted, reset to Guest
@@ -667,41 +691,60 @@ class HangmanGame:
         print("- Easy: Simple words")
         print("- Medium: Moderate words")
         print("- Hard: Challenging words")
+        print("- Adaptive: Harder words as you win, easier ones after a loss")
+        print("- Evil: The computer changes the word to avoid your guesses (scored as Hard)")
         print("\nCategories:")
         print("- Animals, Countries, Technology, Space, Food")
         print("- Random: Words from any category")
         
         input("\nPress Enter to continue...")
     
+    def save_checkpoint(self):
+        """Checkpoint the game in progress, or drop the checkpoint once the game is over."""
+        if self.engine is not self.standard_engine:
+            return  # The evil engine's word is not settled, so there is nothing to resume
+        if self.engine.game_over:
+            self.checkpoints.discard(self.current_player)
+        else:
+            self.checkpoints.save(self.current_player, self.engine, self.word_id, self.category)
+    
+    def resume_game(self):
+        """Offer to resume the current player's unfinished game; return True if it was resumed."""
+        checkpoint = self.checkpoints.get(self.current_player)
+        if checkpoint is None:
+            return False
+        answer = input(f"\nYou have an unfinished {checkpoint.difficulty} game "
+                       f"({checkpoint.guessed_mask.bit_count()} letters guessed). Resume it? (y/n): ")
+        if answer.lower() != "y":
+            self.checkpoints.discard(self.current_player)
+            return False
+        self.engine = self.standard_engine
+        restore_game(self.engine, checkpoint, self.word_index)
+        if self.difficulty != ADAPTIVE:
+            # Play (and show) the game at the level it was started at, not the one selected since
+            self.difficulty = checkpoint.difficulty
+        self.word_id = checkpoint.word_id
+        self.category = checkpoint.category
+        return True
+    
     def start_game(self):
-        """Initialize and start a new game."""
-        # Reset game state
-        self.current_incorrect_guesses = 0
-        self.guessed_letters = []
-        self.game_over = False
-        self.game_won = False
-        self.score = 0
-        self.hints_used = 0
-        
-        # Select a word to guess
-        self.word_to_guess = self.choose_random_word()
-        
-        # Initialize word display
-        self.initialize_word_display()
+        """Play a new or resumed game until it is over or abandoned and return the next screen."""
+        # Evil games cannot be resumed, so they do not offer to resume standard ones either
+        if self.difficulty == EVIL or not self.resume_game():
+            next_screen = self.new_game()
+            if next_screen is not None:
+                return next_screen
+        if self.hint_session is not None:
+            self.hint_session.reset()  # Solver hints follow the new game from scratch
         
         # Start the game loop
-        self.game_start_time = time.time()
-        while not self.game_over:
-            # Display the current game state
+        while not self.engine.game_over:
+            # Display the current game state and options
             self.display_game()
             
             # Get player input
-            print("\nOptions:")
-            print("1. Guess a letter")
-            print("2. Use a hint")
-            print("3. Return to main menu")
-            
             choice = input("\nEnter your choice (1-3): ")
+            moves = len(self.engine.moves)
             
             if choice == "1":
                 guess = input("Enter a letter: ")
@@ -711,31 +754,110 @@ class HangmanGame:
             elif choice == "3":
                 confirm = input("Are you sure you want to exit the game? (y/n): ")
                 if confirm.lower() == 'y':
-                    return self.show_main_menu()
+                    return MAIN_MENU  # The checkpoint stays, so the game can be resumed
             else:
                 print("Invalid choice. Please try again.")
                 time.sleep(1)
-            
-            # Check if the game is over
-            if self.game_over:
-                play_again = self.show_game_over()
-                if play_again:
-                    return self.start_game()
-                else:
-                    return self.show_main_menu()
+            if len(self.engine.moves) != moves:
+                self.save_checkpoint()
+        
+        return GAME_OVER
+    
+    def new_game(self):
+        """Draw a word and reset the game state; return MAIN_MENU if no word is available."""
+        try:
+            word_id, difficulty = self.choose_random_word()
+        except LookupError as e:
+            # Imported word lists may not cover every category and difficulty
+            print(f"{e}. Please choose another category or difficulty.")
+            time.sleep(1.5)
+            return MAIN_MENU
+        if self.difficulty == EVIL:
+            if self.evil_engine is None:
+                from hangman_evil import EvilHangmanEngine
+                
+                self.evil_engine = EvilHangmanEngine(self.get_solver())
+                if self.metrics is not None:
+                    from hangman_metrics import instrument
+                    
+                    instrument(self.evil_engine, "guess", self.metrics.guess_seconds)
+            self.engine = self.evil_engine
+        else:
+            self.engine = self.standard_engine
+        self.word_id = word_id
+        if self.difficulty == EVIL:
+            # The evil word keeps changing, but only among the chosen category's words
+            self.engine.new_game(self.word_index.word(word_id), difficulty, self.category)
+        else:
+            self.engine.new_game(self.word_index.word(word_id), difficulty)
+        return None
     
     def run(self):
-        """Run the Hangman game."""
-        continue_game = True
-        while continue_game:
-            continue_game = self.show_main_menu()
+        """Run the Hangman game as a flat loop from one screen to the next."""
+        screens = {
+            MAIN_MENU: self.show_main_menu,
+            PROFILE_MENU: self.manage_profile,
+            GAME: self.start_game,
+            GAME_OVER: self.show_game_over,
+        }
+        state = MAIN_MENU
+        while state != EXIT:
+            state = screens[state]()
 
 
 def main():
     """Main function to run the Hangman game."""
+    parser = argparse.ArgumentParser(description="Play Hangman in the terminal.")
+    parser.add_argument("--profile-backend", choices=PROFILE_BACKENDS, default="journal",
+                        help="where player profiles are stored: journal (default), shared between processes, "
+                             "sqlite, or records (parsed on demand)")
+    parser.add_argument("--words", action="append", metavar="FILE",
+                        help="word file to play with instead of the built-in words "
+                             "(one word per line, or CSV with word,category,difficulty); repeatable")
+    parser.add_argument("--classify", action="store_true",
+                        help="assign word difficulties automatically from word features (needs NumPy)")
+    parser.add_argument("--hint-strategy", choices=HINT_STRATEGIES + (SOLVER_HINT,), default=HINT_RAREST,
+                        help="letter a hint reveals: a random one, the rarest in English (default), the one "
+                             "covering the most positions, or the one the solver finds hardest to guess")
+    parser.add_argument("--metrics-file", metavar="FILE",
+                        help="write metrics in Prometheus text format to FILE every --metrics-interval seconds")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve metrics in Prometheus text format at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, help="seconds between metric file writes")
+    parser.add_argument("--profile-session", metavar="DIR",
+                        help="profile this session with cProfile and tracemalloc and write the reports to DIR")
+    args = parser.parse_args()
+    
     # Create and run the game
-    game = HangmanGame()
-    game.run()
+    word_index = WordIndex.from_files(args.words) if args.words else None
+    if args.classify:
+        from hangman_difficulty import classify_index
+        word_index = classify_index(word_index or WordIndex.from_categories(WORD_CATEGORIES))
+    game = HangmanGame(word_index=word_index, profile_backend=args.profile_backend, hint_strategy=args.hint_strategy)
+    exporter = profiler = None
+    # Metrics and profiling are only imported when asked for, to keep startup short
+    if args.metrics_file or args.metrics_port is not None:
+        from hangman_metrics import GameMetrics, MetricsExporter
+        
+        metrics = GameMetrics()
+        game.enable_metrics(metrics)
+        exporter = MetricsExporter(metrics.registry, args.metrics_file, args.metrics_port,
+                                   interval=args.metrics_interval)
+    if args.profile_session:
+        from hangman_metrics import SessionProfiler
+        
+        profiler = SessionProfiler(args.profile_session)
+        profiler.start()
+    try:
+        game.run()
+    finally:
+        game.close_player_profiles()
+        game.close_word_selector()
+        game.event_log.close()
+        if exporter is not None:
+            exporter.close()
+        if profiler is not None:
+            print(f"Session profile written to {profiler.stop()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,322 @@
+"""
+Streaming analytics over Hangman game history.
+
+Reads binary game-event logs (hangman_events.log from the game or the
+server, or the per-batch logs hangman_simulate.py --event-log writes) and
+aggregates per word and per category: games, win rate, wrong guesses,
+hints used and time to solve.
+
+Logs are memory-mapped and decoded one chunk of games at a time; each chunk
+is turned into NumPy arrays and folded into per-word totals with bincount.
+Memory depends on the number of distinct words, not on the number of games,
+so logs larger than RAM are fine.
+
+The observed results can be fed back into word-difficulty assignment:
+--write-words writes the word list as word,category,difficulty CSV, with
+every word that was played often enough placed by how hard players actually
+found it. The file can be loaded with --words by the game, the server and
+the simulator.
+
+NumPy is required for this module only.
+
+Usage:
+    python hangman_analytics.py hangman_events.log*
+    python hangman_analytics.py sim-*.log --min-games 50 --write-words observed.csv
+"""
+import argparse
+import csv
+import json
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only required for analytics
+    np = None
+
+from hangman_engine import HINT_MOVE, MAX_INCORRECT_GUESSES, word_masks
+from hangman_events import iter_games, log_paths
+from hangman_words import WORD_CATEGORIES, DIFFICULTIES, WordIndex
+
+CHUNK_GAMES = 65536  # Games decoded and aggregated at a time
+MIN_GAMES = 20  # Games a word needs before its results are trusted
+OBSERVED_LOSS_WEIGHT = 0.7  # Share of the loss rate in the observed difficulty; the rest is wrong guesses
+
+_COLUMNS = ("games", "wins", "wrong", "hints", "solve_seconds")
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Game analytics need NumPy (pip install numpy)")
+
+
+def iter_chunks(records, size=CHUNK_GAMES):
+    """Group an iterable of game records into lists of at most size records."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class GameAnalytics:
+    """
+    Running per-word totals folded in from chunks of GameRecords.
+
+    A word is counted separately for each difficulty it was played at, so a
+    word that moved between levels shows up once per level. Games logged
+    with the "random" category are attributed to the word's category in
+    index, when index knows the word.
+    """
+
+    def __init__(self, index=None):
+        _require_numpy()
+        self.index = index
+        self._index_categories = None  # word -> category name, built on first use
+        self.slots = {}  # (word, difficulty id) -> slot
+        self.words = []
+        self.categories = []
+        self.difficulties = np.zeros(0, dtype=np.uint8)
+        self.letter_masks = np.zeros(0, dtype=np.uint32)
+        self.totals = {name: np.zeros(0) for name in _COLUMNS}
+        self.games = 0
+
+    def _category(self, record):
+        if record.category != "random" or self.index is None:
+            return record.category
+        if self._index_categories is None:
+            index = self.index
+            self._index_categories = {index.word(word_id): index.category_of(word_id) for word_id in range(len(index))}
+        return self._index_categories.get(record.word, record.category)
+
+    def _slot(self, record, difficulty_id, new_masks, new_difficulties):
+        key = (record.word, difficulty_id)
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.words)
+            self.words.append(record.word)
+            self.categories.append(self._category(record))
+            new_difficulties.append(difficulty_id)
+            new_masks.append(word_masks(record.word).letter_mask)
+        return slot
+
+    def add_chunk(self, records):
+        """Fold a list of GameRecords into the totals."""
+        count = len(records)
+        if not count:
+            return
+        difficulty_ids = {difficulty: i for i, difficulty in enumerate(DIFFICULTIES)}
+        new_masks = []
+        new_difficulties = []
+        slots = np.fromiter((self._slot(record, difficulty_ids[record.difficulty], new_masks, new_difficulties)
+                             for record in records), dtype=np.int64, count=count)
+        if new_masks:
+            self.letter_masks = np.concatenate((self.letter_masks, np.array(new_masks, dtype=np.uint32)))
+            self.difficulties = np.concatenate((self.difficulties, np.array(new_difficulties, dtype=np.uint8)))
+        won = np.fromiter((record.won for record in records), dtype=bool, count=count)
+        elapsed = np.fromiter((record.elapsed for record in records), dtype=np.float64, count=count)
+        move_counts = np.fromiter((len(record.moves) for record in records), dtype=np.int64, count=count) // 5
+
+        # Every move of the chunk in one array: a guess is wrong if its letter is not in the word
+        codes = np.frombuffer(b"".join(record.moves for record in records), dtype=np.uint8)[::5]
+        game_of_move = np.repeat(np.arange(count), move_counts)
+        is_hint = (codes & HINT_MOVE) != 0
+        letters = (codes & (0xFF ^ HINT_MOVE)).astype(np.uint32)
+        in_word = (self.letter_masks[slots][game_of_move] >> letters) & 1
+        wrong = np.bincount(game_of_move, weights=~is_hint & (in_word == 0), minlength=count)
+        hints = np.bincount(game_of_move, weights=is_hint, minlength=count)
+
+        size = len(self.words)
+        per_game = {"games": None, "wins": won, "wrong": wrong, "hints": hints,
+                    "solve_seconds": np.where(won, elapsed, 0.0)}
+        for name, values in per_game.items():
+            total = self.totals[name]
+            if len(total) < size:
+                total = self.totals[name] = np.concatenate((total, np.zeros(size - len(total))))
+            total += np.bincount(slots, weights=values, minlength=size)
+        self.games += count
+
+    def add_games(self, records, chunk_size=CHUNK_GAMES):
+        """Stream any number of GameRecords through add_chunk."""
+        for chunk in iter_chunks(records, chunk_size):
+            self.add_chunk(chunk)
+        return self
+
+    # Results ---------------------------------------------------------------
+
+    def word_table(self):
+        """Per-word columns as NumPy arrays (rates and means computed per word)."""
+        games = self.totals["games"]
+        wins = self.totals["wins"]
+        played = np.maximum(games, 1)
+        return {
+            "games": games.astype(np.int64),
+            "win_rate": wins / played,
+            "mean_wrong_guesses": self.totals["wrong"] / played,
+            "mean_hints": self.totals["hints"] / played,
+            "mean_solve_seconds": np.where(wins > 0, self.totals["solve_seconds"] / np.maximum(wins, 1), np.nan),
+        }
+
+    def observed_difficulty(self):
+        """Per-word score in [0, 1]: mostly the loss rate, partly the wrong guesses."""
+        table = self.word_table()
+        wrong = np.minimum(table["mean_wrong_guesses"] / MAX_INCORRECT_GUESSES, 1.0)
+        return OBSERVED_LOSS_WEIGHT * (1 - table["win_rate"]) + (1 - OBSERVED_LOSS_WEIGHT) * wrong
+
+    def _word_row(self, slot, table):
+        solve = table["mean_solve_seconds"][slot]
+        return {
+            "word": self.words[slot],
+            "category": self.categories[slot],
+            "difficulty": DIFFICULTIES[self.difficulties[slot]],
+            "games": int(table["games"][slot]),
+            "win_rate": float(table["win_rate"][slot]),
+            "mean_wrong_guesses": float(table["mean_wrong_guesses"][slot]),
+            "mean_hints": float(table["mean_hints"][slot]),
+            "mean_solve_seconds": None if np.isnan(solve) else float(solve),
+        }
+
+    def summary(self, outliers=10, min_games=MIN_GAMES):
+        """
+        Per category/difficulty totals, plus the words whose results least
+        match their level: the easiest hard words and the hardest easy ones.
+        """
+        groups = []
+        group_ids = {}
+        slot_groups = np.zeros(len(self.words), dtype=np.int64)
+        order = sorted(set(zip(self.categories, self.difficulties.tolist())))
+        for key in order:
+            group_ids[key] = len(group_ids)
+        for slot, key in enumerate(zip(self.categories, self.difficulties.tolist())):
+            slot_groups[slot] = group_ids[key]
+        sums = {name: np.bincount(slot_groups, weights=self.totals[name], minlength=len(order)) for name in _COLUMNS}
+        for i, (category, difficulty_id) in enumerate(order):
+            games, wins = sums["games"][i], sums["wins"][i]
+            groups.append({
+                "category": category,
+                "difficulty": DIFFICULTIES[difficulty_id],
+                "games": int(games),
+                "win_rate": wins / games,
+                "mean_wrong_guesses": sums["wrong"][i] / games,
+                "mean_hints": sums["hints"][i] / games,
+                "mean_solve_seconds": sums["solve_seconds"][i] / wins if wins else None,
+            })
+
+        table = self.word_table()
+        observed = self.observed_difficulty()
+        trusted = table["games"] >= min_games
+        hard = np.nonzero(trusted & (self.difficulties == DIFFICULTIES.index("hard")))[0]
+        easy = np.nonzero(trusted & (self.difficulties == DIFFICULTIES.index("easy")))[0]
+        easiest_hard = hard[np.argsort(observed[hard], kind="stable")][:outliers]
+        hardest_easy = easy[np.argsort(-observed[easy], kind="stable")][:outliers]
+        return {
+            "games": self.games,
+            "words": len(self.words),
+            "groups": groups,
+            "easiest_hard_words": [self._word_row(slot, table) for slot in easiest_hard],
+            "hardest_easy_words": [self._word_row(slot, table) for slot in hardest_easy],
+        }
+
+    def write_word_stats(self, path):
+        """Write one CSV row of statistics per word and difficulty."""
+        table = self.word_table()
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["word", "category", "difficulty", "games", "win_rate", "mean_wrong_guesses",
+                             "mean_hints", "mean_solve_seconds"])
+            for slot in range(len(self.words)):
+                row = self._word_row(slot, table)
+                writer.writerow([row["word"], row["category"], row["difficulty"], row["games"],
+                                 f"{row['win_rate']:.4f}", f"{row['mean_wrong_guesses']:.3f}",
+                                 f"{row['mean_hints']:.3f}",
+                                 "" if row["mean_solve_seconds"] is None else f"{row['mean_solve_seconds']:.1f}"])
+
+    def reassign_difficulties(self, index, min_games=MIN_GAMES):
+        """
+        Return a difficulty id for every word of index.
+
+        Words played at least min_games times (over all levels) are split
+        into easy, medium and hard at the terciles of their observed
+        difficulty; the rest keep the level index gives them.
+        """
+        from hangman_difficulty import bucket_scores
+
+        games = {}
+        weighted = {}
+        for slot, score in enumerate(self.observed_difficulty().tolist()):
+            word = self.words[slot]
+            played = self.totals["games"][slot]
+            games[word] = games.get(word, 0) + played
+            weighted[word] = weighted.get(word, 0.0) + score * played
+
+        levels = list(index.word_difficulties)
+        ids = [word_id for word_id in range(len(index)) if games.get(index.word(word_id), 0) >= min_games]
+        scores = np.array([weighted[index.word(word_id)] / games[index.word(word_id)] for word_id in ids])
+        for word_id, level in zip(ids, bucket_scores(scores).tolist()):
+            levels[word_id] = level
+        return levels
+
+
+def write_word_list(index, difficulty_ids, path):
+    """Write index as a word,category,difficulty CSV with the given difficulty ids."""
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["word", "category", "difficulty"])
+        for word_id, level in enumerate(difficulty_ids):
+            writer.writerow([index.word(word_id), index.category_of(word_id), DIFFICULTIES[level]])
+
+
+def print_summary(summary):
+    print(f"\n{'=' * 78}")
+    print(f"  Games: {summary['games']}   Words: {summary['words']}")
+    print(f"{'=' * 78}")
+    print(f"  {'Category':<14}{'Difficulty':<12}{'Games':>9}{'Win rate':>10}{'Wrong':>8}{'Hints':>8}{'Solve s':>10}")
+    for group in summary["groups"]:
+        solve = group["mean_solve_seconds"]
+        print(f"  {group['category']:<14}{group['difficulty']:<12}{group['games']:>9}"
+              f"{group['win_rate'] * 100:>9.1f}%{group['mean_wrong_guesses']:>8.2f}{group['mean_hints']:>8.2f}"
+              f"{'-' if solve is None else f'{solve:.1f}':>10}")
+    for title, key in (("Easiest hard words", "easiest_hard_words"), ("Hardest easy words", "hardest_easy_words")):
+        print(f"\n  {title}:")
+        for word in summary[key]:
+            print(f"    {word['word']:<20}{word['category']:<14}{word['win_rate'] * 100:>6.1f}% won, "
+                  f"{word['mean_wrong_guesses']:.2f} wrong, {word['games']} games")
+    print(f"{'=' * 78}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-word and per-category statistics from Hangman game logs.")
+    parser.add_argument("logs", nargs="*", help="event log files (default: hangman_events.log and its backups)")
+    parser.add_argument("--words", action="append", metavar="FILE",
+                        help="word file the games were played with (default: the built-in words)")
+    parser.add_argument("--min-games", type=int, default=MIN_GAMES, help="games a word needs to be ranked")
+    parser.add_argument("--outliers", type=int, default=10, help="number of mislabelled words to list per level")
+    parser.add_argument("--chunk", type=int, default=CHUNK_GAMES, help="games aggregated at a time")
+    parser.add_argument("--json", metavar="FILE", help="also write the summary as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="write per-word statistics as CSV")
+    parser.add_argument("--write-words", metavar="FILE",
+                        help="write the word list as CSV with difficulties reassigned from the observed results")
+    args = parser.parse_args()
+
+    index = WordIndex.from_files(args.words) if args.words else WordIndex.from_categories(WORD_CATEGORIES)
+    start = time.time()
+    analytics = GameAnalytics(index).add_games(iter_games(args.logs or log_paths()), args.chunk)
+    elapsed = time.time() - start
+    summary = analytics.summary(args.outliers, args.min_games)
+    print_summary(summary)
+    print(f"  {analytics.games} games in {elapsed:.1f}s ({analytics.games / max(elapsed, 1e-9):,.0f} games/s)")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(summary, file, indent=4)
+    if args.csv:
+        analytics.write_word_stats(args.csv)
+    if args.write_words:
+        write_word_list(index, analytics.reassign_difficulties(index, args.min_games), args.write_words)
+        print(f"  Wrote {len(index)} words to {args.write_words}")
+
+
+if __name__ == "__main__":
+    main()
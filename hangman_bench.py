@@ -0,0 +1,527 @@
+"""
+Benchmarks for the Hangman engine, profile stores and word selection.
+
+Every benchmark reports operations per second, microseconds per operation
+and the peak Python heap (tracemalloc) of one extra run. The best of
+--repeat runs is kept. Results can be saved as a baseline and later runs
+compared against it; a benchmark that got slower (or bigger) than the
+tolerance is flagged and the command exits with status 1, so it can guard
+CI.
+
+Groups:
+- engine: guess throughput of HangmanEngine, of the CLI's process_guess
+  (sleeps and output stubbed out) and of the evil engine
+- profiles: load_player_profiles startup and update_player_stats plus save
+  for every profile backend, at 1k, 100k and 1M profiles
+- words: word index construction and word draws from a large synthetic
+  corpus (shuffle bags, adaptive draws, the CLI's choose_random_word)
+- checkpoints: checkpointing a game after a move, and writing and
+  restoring the checkpoints of 10k sessions
+- startup: cold start of hangman-game.py to its first prompt in a fresh
+  interpreter (next to a bare interpreter for reference), and HangmanGame
+  construction; a cold start over --startup-budget fails the run
+
+Fixtures are generated in a temporary directory, so nothing in the working
+directory is touched.
+
+Usage:
+    python hangman_bench.py
+    python hangman_bench.py --quick --save baseline.json
+    python hangman_bench.py --quick --compare baseline.json
+    python hangman_bench.py profiles --sizes 1000 100000 --backends journal records
+    python hangman_bench.py startup --startup-budget 80
+"""
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+
+from hangman_checkpoint import CheckpointStore, restore_game
+from hangman_difficulty import ENGLISH_LETTER_FREQUENCY
+from hangman_engine import ALPHABET, ENGLISH_ORDER, HangmanEngine
+from hangman_evil import EvilHangmanEngine
+from hangman_profiles import PROFILE_BACKENDS, PROFILES_FILE, PlayerProfile
+from hangman_selection import WordSelector
+from hangman_solver import HangmanSolver
+from hangman_words import WORD_CATEGORIES, DIFFICULTIES, WordIndex
+
+GROUPS = ("engine", "profiles", "words", "checkpoints", "startup")
+PROFILE_SIZES = (1000, 100000, 1000000)
+QUICK_PROFILE_SIZES = (1000, 10000)
+CORPUS_WORDS = 1000000
+QUICK_CORPUS_WORDS = 100000
+CORPUS_CATEGORIES = 8
+REPEAT = 3
+TOLERANCE = 0.2  # Relative slowdown (or memory growth) flagged by --compare
+MEMORY_SLACK_KIB = 64  # Memory differences below this are noise
+CHECKPOINT_SESSIONS = 10000
+STARTUP_BUDGET_MS = 100  # Cold start to the first prompt allowed by the startup group
+STARTUP_RUNS = 5  # Processes started per startup measurement
+GAME_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hangman-game.py")
+
+
+def load_game_module():
+    """Import hangman-game.py (its file name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location("hangman_game", GAME_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextmanager
+def quiet():
+    """Stub out time.sleep and stdout, so only the game logic is measured."""
+    sleep = time.sleep
+    time.sleep = lambda seconds: None
+    try:
+        with redirect_stdout(io.StringIO()) as out:
+            yield out
+    finally:
+        time.sleep = sleep
+
+
+@contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def measure(run, repeat=REPEAT, memory=True):
+    """
+    Time run(), which returns the number of operations it performed.
+
+    Returns the result of the fastest of repeat runs, plus the peak Python
+    heap of one more run when memory is set.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = run()
+        seconds = time.perf_counter() - start
+        if best is None or ops / seconds > best["ops_per_sec"]:
+            best = {"ops": ops, "seconds": seconds, "ops_per_sec": ops / max(seconds, 1e-9)}
+    best["us_per_op"] = 1e6 / best["ops_per_sec"]
+    best["peak_kib"] = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            best["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return best
+
+
+def size_label(size):
+    if size >= 1000000 and size % 1000000 == 0:
+        return f"{size // 1000000}M"
+    if size >= 1000 and size % 1000 == 0:
+        return f"{size // 1000}k"
+    return str(size)
+
+
+class BenchmarkRun:
+    """Runs the selected benchmark groups and collects {name: result}."""
+
+    def __init__(self, directory, profile_sizes=PROFILE_SIZES, backends=PROFILE_BACKENDS,
+                 corpus_words=CORPUS_WORDS, repeat=REPEAT, memory=True, progress=None):
+        self.directory = directory
+        self.profile_sizes = profile_sizes
+        self.backends = backends
+        self.corpus_words = corpus_words
+        self.repeat = repeat
+        self.memory = memory
+        self.progress = progress
+        self.results = {}
+        self.game_module = load_game_module()
+        self.small_index = WordIndex.from_categories(WORD_CATEGORIES)
+        self._corpus = None
+
+    def record(self, name, run, repeat=None, memory=True):
+        result = measure(run, self.repeat if repeat is None else repeat, self.memory and memory)
+        self.results[name] = result
+        if self.progress:
+            self.progress(name, result)
+        return result
+
+    def new_game(self, **kwargs):
+        """A HangmanGame that never touches the working directory on its own."""
+        kwargs.setdefault("word_index", self.small_index)
+        game = self.game_module.HangmanGame(**kwargs)
+        game.word_selector.path = os.path.join(self.directory, "bags.json")
+        game.event_log.path = os.path.join(self.directory, "events.log")
+        game.checkpoints.path = os.path.join(self.directory, "checkpoints.bin")
+        return game
+
+    # Fixtures ----------------------------------------------------------------
+
+    def corpus_entries(self):
+        """Deterministic synthetic (word, category, difficulty) tuples."""
+        rng = random.Random(0)
+        entries = []
+        for i in range(self.corpus_words):
+            length = rng.randint(3, 14)
+            word = "".join(rng.choices(ALPHABET, weights=ENGLISH_LETTER_FREQUENCY, k=length))
+            difficulty = DIFFICULTIES[0 if length <= 5 else 1 if length <= 8 else 2]
+            entries.append((word, f"category{i % CORPUS_CATEGORIES}", difficulty))
+        return entries
+
+    def corpus(self):
+        if self._corpus is None:
+            self._corpus = WordIndex()
+            self._corpus.add_many(self.corpus_entries())
+        return self._corpus
+
+    def profile_fixture(self, size):
+        """Directory per backend holding a snapshot of size profiles (imported for sqlite and records)."""
+        root = os.path.join(self.directory, f"profiles-{size}")
+        if os.path.exists(root):
+            return root
+        os.makedirs(root)
+        rng = random.Random(size)
+        templates = []
+        for _ in range(64):
+            profile = PlayerProfile()
+            for _ in range(rng.randint(1, 40)):
+                profile.add_game(rng.random() < 0.6, rng.randint(0, 1500), rng.choice(list(WORD_CATEGORIES)),
+                                 "2024-01-01 12:00:00")
+            templates.append(profile.to_dict())
+        snapshot = os.path.join(root, PROFILES_FILE)
+        with open(snapshot, "w") as file:
+            json.dump({f"player{i}": templates[i % len(templates)] for i in range(size)}, file, separators=(",", ":"))
+        for backend in self.backends:
+            backend_dir = os.path.join(root, backend)
+            os.makedirs(backend_dir)
+            shutil.copy(snapshot, os.path.join(backend_dir, PROFILES_FILE))
+            if backend in ("sqlite", "records"):
+                # The first open imports the snapshot; benchmarks measure the opens after that
+                with working_directory(backend_dir), quiet():
+                    game = self.new_game(profile_backend=backend)
+                    game.load_player_profiles()
+                    game.close_player_profiles()
+        return root
+
+    # Groups ------------------------------------------------------------------
+
+    def run_engine(self):
+        words = [self.small_index.word(word_id) for word_id in range(len(self.small_index))]
+        engine = HangmanEngine(clock=lambda: 0.0)
+
+        def guesses():
+            count = 0
+            for _ in range(20):
+                for word in words:
+                    engine.new_game(word)
+                    for letter in ENGLISH_ORDER:
+                        engine.guess(letter)
+                        count += 1
+                        if engine.game_over:
+                            break
+            return count
+        self.record("engine.guess", guesses)
+
+        game = self.new_game()
+
+        def process_guesses():
+            count = 0
+            with quiet():
+                for word in words:
+                    game.engine.new_game(word)
+                    for letter in ENGLISH_ORDER:
+                        game.process_guess(letter)
+                        count += 1
+                        if game.engine.game_over:
+                            break
+            return count
+        self.record("cli.process_guess", process_guesses)
+
+        corpus = self.corpus()
+        evil = EvilHangmanEngine(HangmanSolver.from_index(corpus), rng=random.Random(0))
+        rng = random.Random(1)
+
+        def evil_guesses():
+            count = 0
+            for _ in range(20):
+                evil.new_game(corpus.word(rng.randrange(len(corpus))), "hard")
+                for letter in ENGLISH_ORDER:
+                    evil.guess(letter)
+                    count += 1
+                    if evil.game_over:
+                        break
+            return count
+        self.record(f"engine.evil_guess.{size_label(len(corpus))}", evil_guesses)
+
+    def run_profiles(self):
+        for size in self.profile_sizes:
+            root = self.profile_fixture(size)
+            label = size_label(size)
+            rng = random.Random(size)
+            for backend in self.backends:
+                backend_dir = os.path.join(root, backend)
+                with working_directory(backend_dir):
+                    game = self.new_game(profile_backend=backend)
+
+                    def load():
+                        # Startup up to the first profile lookup, then shut down again
+                        with quiet():
+                            game.load_player_profiles()
+                            game.player_profiles.get(f"player{rng.randrange(size)}")
+                            game.close_player_profiles()
+                        return 1
+                    self.record(f"profiles.load.{backend}.{label}", load)
+
+                    with quiet():
+                        game.load_player_profiles()
+                    store = game.player_profiles
+                    save = getattr(store, "flush", None)  # The other backends save on every change
+
+                    def updates():
+                        for _ in range(100):
+                            game.current_player = f"player{rng.randrange(size)}"
+                            game.engine.score = rng.randint(0, 1500)
+                            game.update_player_stats(rng.random() < 0.6)
+                            if save is not None:
+                                save()
+                        return 100
+                    try:
+                        self.record(f"profiles.update_save.{backend}.{label}", updates)
+                    finally:
+                        game.close_player_profiles()
+
+    def run_words(self):
+        entries = self.corpus_entries()
+        label = size_label(len(entries))
+
+        def build():
+            index = WordIndex()
+            index.add_many(entries)
+            return len(index)
+        self.record(f"words.index_build.{label}", build, repeat=1)
+        del entries
+
+        corpus = self.corpus()
+        rng = random.Random(2)
+        selector = WordSelector(corpus, path=None, rng=rng, autosave=False)
+        selector.load()
+
+        def draws(category):
+            def run():
+                for i in range(20000):
+                    selector.draw(f"player{i % 50}", category, "medium")
+                return 20000
+            return run
+        self.record(f"words.draw.{label}", draws("random"))
+        self.record(f"words.draw_category.{label}", draws("category3"))
+
+        selector.draw_near_id(0.5)  # Builds the score ranking outside the timing
+
+        def adaptive():
+            for _ in range(20000):
+                selector.draw_near_id(rng.random())
+            return 20000
+        self.record(f"words.draw_adaptive.{label}", adaptive)
+
+        def index_draws():
+            for _ in range(20000):
+                corpus.random_word("random", "medium", rng)
+            return 20000
+        self.record(f"words.index_random.{label}", index_draws)
+
+        game = self.new_game(word_index=corpus)
+
+        def choose():
+            # The CLI journals the drawing player's shuffle bag after every draw
+            for i in range(200):
+                game.current_player = f"player{i % 5}"
+                game.choose_random_word()
+            return 200
+        self.record(f"cli.choose_random_word.{label}", choose)
+
+    def run_checkpoints(self):
+        index = self.small_index
+        rng = random.Random(3)
+        engines = []
+        for session in range(CHECKPOINT_SESSIONS):
+            word_id = rng.randrange(len(index))
+            engine = HangmanEngine(clock=lambda: 0.0)
+            engine.new_game(index.word(word_id), index.difficulty_of(word_id))
+            for letter in ENGLISH_ORDER[:rng.randint(1, 6)]:
+                engine.guess(letter)
+            engines.append((f"player{session}", engine, word_id))
+        path = os.path.join(self.directory, "checkpoints.bin")
+        store = CheckpointStore(index, path, autosave=False)
+        store.load()
+
+        def saves():
+            for player, engine, word_id in engines:
+                store.save(player, engine, word_id)
+            return len(engines)
+        self.record("checkpoints.save", saves)
+
+        def flush():
+            store.save(*engines[0])  # One change makes the whole file due
+            store.flush()
+            return 1
+        self.record(f"checkpoints.flush.{size_label(CHECKPOINT_SESSIONS)}", flush)
+
+        engine = HangmanEngine()
+
+        def restore():
+            # A restart: read every session, then resume each of them
+            restored = CheckpointStore(index, path)
+            restored.load()
+            for player in restored.records:
+                restore_game(engine, restored.get(player), index)
+            return 1
+        self.record(f"checkpoints.restore.{size_label(CHECKPOINT_SESSIONS)}", restore)
+
+    def run_startup(self):
+        def spawn(args):
+            # The main menu's Exit option: the process quits at its first prompt
+            def run():
+                for _ in range(STARTUP_RUNS):
+                    subprocess.run(args, input="7\n", stdout=subprocess.DEVNULL, cwd=self.directory,
+                                   text=True, check=True)
+                return STARTUP_RUNS
+            return run
+        # The child processes' memory is not traced, so none is reported
+        self.record("startup.python", spawn([sys.executable, "-c", "input()"]), memory=False)
+        self.record("startup.game", spawn([sys.executable, GAME_SCRIPT]), memory=False)
+
+        def construct():
+            with working_directory(self.directory):
+                for _ in range(1000):
+                    self.game_module.HangmanGame()
+            return 1000
+        self.record("startup.game_init", construct)
+
+    def run(self, groups=GROUPS):
+        for group in groups:
+            getattr(self, "run_" + group)()
+        return self.results
+
+
+def save_baseline(results, path):
+    data = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file, indent=4)
+    os.replace(temp_path, path)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Return (name, result, baseline result, regressions) for every benchmark in both runs."""
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        regressions = []
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append("slower")
+        if (result["peak_kib"] is not None and base.get("peak_kib") is not None
+                and result["peak_kib"] > base["peak_kib"] * (1 + tolerance) + MEMORY_SLACK_KIB):
+            regressions.append("memory")
+        rows.append((name, result, base, regressions))
+    return rows
+
+
+def format_rate(ops_per_sec):
+    return f"{ops_per_sec:,.0f}" if ops_per_sec >= 100 else f"{ops_per_sec:.2f}"
+
+
+def format_memory(kib):
+    return "-" if kib is None else f"{kib:,.0f}"
+
+
+def print_result(name, result):
+    print(f"  {name:<40}{format_rate(result['ops_per_sec']):>14}{result['us_per_op']:>16,.1f}"
+          f"{format_memory(result['peak_kib']):>12}")
+
+
+def print_comparison(rows):
+    print(f"\n  {'Benchmark':<40}{'ops/s':>14}{'baseline':>14}{'change':>9}{'peak KiB':>12}{'baseline':>12}")
+    for name, result, base, regressions in rows:
+        change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+        flag = "  << " + ", ".join(regressions) if regressions else ""
+        print(f"  {name:<40}{format_rate(result['ops_per_sec']):>14}{format_rate(base['ops_per_sec']):>14}"
+              f"{change * 100:>8.1f}%{format_memory(result['peak_kib']):>12}"
+              f"{format_memory(base.get('peak_kib')):>12}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Hangman engine, profile stores and word selection.")
+    parser.add_argument("groups", nargs="*", help=f"groups to run: {', '.join(GROUPS)} (default: all)")
+    parser.add_argument("--quick", action="store_true",
+                        help=f"smaller fixtures: {', '.join(map(size_label, QUICK_PROFILE_SIZES))} profiles, "
+                             f"{size_label(QUICK_CORPUS_WORDS)} words")
+    parser.add_argument("--sizes", type=int, nargs="+", help="profile counts to benchmark")
+    parser.add_argument("--backends", nargs="+", choices=PROFILE_BACKENDS, default=list(PROFILE_BACKENDS))
+    parser.add_argument("--corpus", type=int, help="words in the synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per benchmark (the fastest counts)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--save", metavar="FILE", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="relative change flagged as a regression")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET_MS, metavar="MS",
+                        help="milliseconds allowed for the game's cold start to its first prompt")
+    args = parser.parse_args()
+    unknown = [group for group in args.groups if group not in GROUPS]
+    if unknown:
+        parser.error(f"unknown group: {', '.join(unknown)}")
+
+    sizes = args.sizes or (QUICK_PROFILE_SIZES if args.quick else PROFILE_SIZES)
+    corpus_words = args.corpus or (QUICK_CORPUS_WORDS if args.quick else CORPUS_WORDS)
+    print(f"  {'Benchmark':<40}{'ops/s':>14}{'us/op':>16}{'peak KiB':>12}")
+    with tempfile.TemporaryDirectory(prefix="hangman-bench-") as directory:
+        bench = BenchmarkRun(directory, sizes, args.backends, corpus_words, args.repeat,
+                             not args.no_memory, progress=print_result)
+        results = bench.run(args.groups or GROUPS)
+
+    failed = False
+    startup = results.get("startup.game")
+    if startup is not None and startup["us_per_op"] > args.startup_budget * 1000:
+        print(f"\n  Cold start took {startup['us_per_op'] / 1000:.1f} ms, over the {args.startup_budget:g} ms budget")
+        failed = True
+
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"\n  Saved {len(results)} results to {args.save}")
+    if args.compare:
+        with open(args.compare, "r") as file:
+            rows = compare(results, json.load(file)["results"], args.tolerance)
+        print_comparison(rows)
+        regressions = [name for name, _, _, flags in rows if flags]
+        if regressions:
+            print(f"\n  {len(regressions)} regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            failed = True
+        else:
+            print(f"\n  No regressions beyond {args.tolerance:.0%}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Checkpoints of games in progress, so a game survives leaving it or a restart.
+
+A checkpoint is a small binary record of the game's state - word id,
+difficulty, category, guessed-letter mask, incorrect guesses, score, hints
+and elapsed time - followed by the moves so far, in the same five-byte form
+as the event log, so a resumed game is logged and replayed exactly like one
+played in a single go. A typical checkpoint is well under 100 bytes.
+
+CheckpointStore keeps the packed checkpoint of every session in memory,
+keyed by player, and writes them all to one file atomically: after every
+change with autosave (the CLI, which has a single session), or whenever
+flush() is called (the server, which flushes its sessions in batches). The
+file belongs to one process, so the CLI and the server default to separate
+files. On
+load the file is only split into records; a record is unpacked when its
+player comes back, so thousands of sessions are restored in milliseconds.
+
+Word ids refer to a WordIndex, so the file carries the size and a checksum
+of the word list it was written with. Checkpoints written with another word
+list are dropped rather than resumed with the wrong words.
+"""
+import os
+import struct
+import zlib
+from collections import namedtuple
+
+from hangman_words import DIFFICULTIES
+
+CHECKPOINT_FILE = "hangman_checkpoints.bin"
+SERVER_CHECKPOINT_FILE = "hangman_server_checkpoints.bin"
+MAGIC = b"HGCK"
+VERSION = 1
+RANDOM_CATEGORY = 0xFFFF  # Category id of games drawn from every category
+
+# magic, version, words in the index, checksum of the index, number of checkpoints
+_HEADER = struct.Struct("<4sBIII")
+# player name length, word id, difficulty id, category id, guessed mask, incorrect guesses,
+# max incorrect guesses, score, hints used, elapsed seconds, number of moves
+_CHECKPOINT = struct.Struct("<HIBHIBBiHdB")
+_MOVE = struct.Struct("<BI")  # Same as the event log: letter code, milliseconds since the start
+
+Checkpoint = namedtuple("Checkpoint", ["word_id", "difficulty", "category", "guessed_mask", "incorrect",
+                                       "max_incorrect_guesses", "score", "hints_used", "elapsed", "moves"])
+
+
+def index_fingerprint(index):
+    """(number of words, CRC-32 of the words) of a WordIndex."""
+    return len(index), zlib.crc32(index.buffer)
+
+
+def pack_checkpoint(player, engine, word_id, category_id):
+    """Pack the game in progress held by engine as one checkpoint record."""
+    start = engine.game_start_time
+    moves = engine.moves
+    encoded = player.encode("utf-8")
+    record = bytearray(_CHECKPOINT.pack(len(encoded), word_id, DIFFICULTIES.index(engine.difficulty), category_id,
+                                        engine.guessed_mask, engine.current_incorrect_guesses,
+                                        engine.max_incorrect_guesses, engine.score, engine.hints_used,
+                                        engine.elapsed, len(moves)))
+    record += encoded
+    for code, timestamp in moves:
+        record += _MOVE.pack(code, max(0, int((timestamp - start) * 1000)))
+    return bytes(record)
+
+
+def unpack_checkpoint(record, index):
+    """Return the Checkpoint in a packed record, or None if it does not fit the word index."""
+    (name_length, word_id, difficulty, category_id, guessed_mask, incorrect, max_incorrect, score, hints,
+     elapsed, count) = _CHECKPOINT.unpack_from(record)
+    if (word_id >= len(index) or difficulty >= len(DIFFICULTIES) or guessed_mask >> 26
+            or (category_id != RANDOM_CATEGORY and category_id >= len(index.category_names))):
+        return None
+    category = "random" if category_id == RANDOM_CATEGORY else index.category_names[category_id]
+    moves_start = _CHECKPOINT.size + name_length
+    return Checkpoint(word_id, DIFFICULTIES[difficulty], category, guessed_mask, incorrect, max_incorrect, score,
+                      hints, elapsed, record[moves_start:moves_start + count * _MOVE.size])
+
+
+def restore_game(engine, checkpoint, index):
+    """Put engine back into the state of a checkpoint; the clock resumes from its elapsed time."""
+    engine.max_incorrect_guesses = checkpoint.max_incorrect_guesses
+    engine.new_game(index.word(checkpoint.word_id), checkpoint.difficulty)
+    masks = engine.masks
+    revealed = 0
+    found = checkpoint.guessed_mask & masks.letter_mask
+    while found:
+        bit = found & -found
+        revealed |= masks.position_masks[bit.bit_length() - 1]
+        found ^= bit
+    engine.guessed_mask = checkpoint.guessed_mask
+    engine.revealed_mask = revealed
+    engine.current_incorrect_guesses = checkpoint.incorrect
+    engine.score = checkpoint.score
+    engine.hints_used = checkpoint.hints_used
+    # Time spent away from the game does not count against the time bonus
+    engine.game_start_time = engine.clock() - checkpoint.elapsed
+    start = engine.game_start_time
+    engine.moves = [(code, start + milliseconds / 1000) for code, milliseconds in _MOVE.iter_unpack(checkpoint.moves)]
+    return engine
+
+
+class CheckpointStore:
+    """
+    Checkpoints of the games in progress, one per player, in a single file.
+
+    The file is read on first use. With autosave, it is rewritten after every
+    change; otherwise call flush().
+    """
+
+    def __init__(self, index, path=CHECKPOINT_FILE, autosave=True):
+        self.index = index
+        self.path = path
+        self.autosave = autosave
+        self.records = None  # player -> packed checkpoint, loaded on first use
+        self._dirty = False
+        self._fingerprint = None  # index_fingerprint() of the index, computed once
+
+    def __len__(self):
+        if self.records is None:
+            self.load()
+        return len(self.records)
+
+    def __contains__(self, player):
+        if self.records is None:
+            self.load()
+        return player in self.records
+
+    @property
+    def fingerprint(self):
+        """index_fingerprint() of the word index, recomputed only if words were added."""
+        if self._fingerprint is None or self._fingerprint[0] != len(self.index):
+            self._fingerprint = index_fingerprint(self.index)
+        return self._fingerprint
+
+    def load(self):
+        """
+        Read the checkpoint file and return the number of checkpoints.
+
+        A missing or damaged file, or one written for another word list,
+        starts afresh.
+        """
+        self.records = {}
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return 0
+        if len(data) < _HEADER.size:
+            return 0
+        magic, version, words, checksum, count = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or (words, checksum) != self.fingerprint:
+            return 0
+        offset = _HEADER.size
+        records = {}
+        for _ in range(count):
+            if offset + _CHECKPOINT.size > len(data):
+                return 0
+            fields = _CHECKPOINT.unpack_from(data, offset)
+            name_start = offset + _CHECKPOINT.size
+            end = name_start + fields[0] + fields[-1] * _MOVE.size  # Player name, then the moves
+            if end > len(data):
+                return 0
+            name = data[name_start:name_start + fields[0]].decode("utf-8", "replace")
+            records[name] = data[offset:end]
+            offset = end
+        self.records = records
+        return len(records)
+
+    def flush(self):
+        """Write every checkpoint atomically, if anything changed."""
+        if self.records is None or not self._dirty or self.path is None:
+            return
+        words, checksum = self.fingerprint
+        data = bytearray(_HEADER.pack(MAGIC, VERSION, words, checksum, len(self.records)))
+        for record in self.records.values():
+            data += record
+        temp_path = self.path + ".tmp"
+        # No fsync: checkpoints guard against the process going away, not the machine
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, self.path)
+        self._dirty = False
+
+    def _changed(self):
+        self._dirty = True
+        if self.autosave:
+            self.flush()
+
+    def save(self, player, engine, word_id, category="random"):
+        """Checkpoint the game in progress in engine for player."""
+        if self.records is None:
+            self.load()
+        category_id = RANDOM_CATEGORY if category == "random" else self.index.category_ids[category]
+        self.records[player] = pack_checkpoint(player, engine, word_id, category_id)
+        self._changed()
+
+    def get(self, player):
+        """The player's Checkpoint, or None."""
+        if self.records is None:
+            self.load()
+        record = self.records.get(player)
+        return unpack_checkpoint(record, self.index) if record is not None else None
+
+    def discard(self, player):
+        """Forget the player's checkpoint, once the game is over or abandoned."""
+        if self.records is None:
+            self.load()
+        if self.records.pop(player, None) is not None:
+            self._changed()
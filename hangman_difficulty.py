@@ -0,0 +1,186 @@
+"""
+Automatic word-difficulty classification for large word lists.
+
+Imported dictionaries rarely say which words are easy or hard. This module
+scores every word of a WordIndex with vectorized NumPy features and buckets
+the scores into the game's easy, medium and hard levels:
+
+- length: number of letters to uncover
+- distinct: number of different letters in the word
+- rarity: average rarity of its letters in English text
+- neighbours: how many other words share its pattern with one letter
+  hidden ("cat" has "bat", "hat", "mat", ...), which makes guessing a gamble
+
+NumPy is optional for the rest of the game and only needed here. Results are
+cached on disk, keyed by a hash of the corpus, so a large list is only
+classified once.
+"""
+import hashlib
+import os
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only required for classification
+    np = None
+
+from hangman_words import DIFFICULTIES
+
+CACHE_DIR = ".hangman_cache"
+FEATURE_VERSION = 1  # Bump when the features or weights change to invalidate caches
+
+# Relative frequency of a-z in English text, in percent
+ENGLISH_LETTER_FREQUENCY = (
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+)
+
+# Weight of each feature's percentile rank in the final score
+FEATURE_WEIGHTS = {"length": 0.3, "distinct": 0.25, "rarity": 0.3, "neighbours": 0.15}
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Word-difficulty classification needs NumPy (pip install numpy)")
+
+
+def _popcount32(values):
+    """Count set bits of every element of a uint32 array."""
+    values = values - ((values >> 1) & 0x55555555)
+    values = (values & 0x33333333) + ((values >> 2) & 0x33333333)
+    values = (values + (values >> 4)) & 0x0F0F0F0F
+    return ((values * 0x01010101) & 0xFFFFFFFF) >> 24
+
+
+def _corpus_arrays(buffer, offsets):
+    """View a packed word buffer and its offsets as NumPy arrays."""
+    data = np.frombuffer(bytes(buffer), dtype=np.uint8)
+    bounds = np.frombuffer(offsets, dtype=np.uint32).astype(np.int64)
+    return data, bounds[:-1], np.diff(bounds)
+
+
+def _neighbour_counts(data, starts, lengths):
+    """Number of other words of the same length that differ in exactly one position."""
+    counts = np.zeros(len(starts), dtype=np.int64)
+    for length in np.unique(lengths):
+        ids = np.nonzero(lengths == length)[0]
+        if length <= 1:
+            counts[ids] = len(ids) - 1
+            continue
+        # One row per word of this length
+        matrix = data[starts[ids][:, None] + np.arange(length)]
+        for position in range(length):
+            masked = np.ascontiguousarray(np.delete(matrix, position, axis=1))
+            keys = masked.view(np.dtype((np.void, length - 1))).ravel()
+            _, inverse, group_sizes = np.unique(keys, return_inverse=True, return_counts=True)
+            counts[ids] += group_sizes[inverse.ravel()] - 1
+    return counts
+
+
+def word_features(buffer, offsets):
+    """
+    Compute the raw features of every word in a packed buffer.
+
+    buffer and offsets use the WordIndex layout: word i is
+    buffer[offsets[i]:offsets[i + 1]]. Returns a dict of equal-length arrays.
+    """
+    _require_numpy()
+    data, starts, lengths = _corpus_arrays(buffer, offsets)
+    if len(starts) == 0:
+        return {name: np.zeros(0) for name in FEATURE_WEIGHTS}
+
+    # Words are never empty, so reduceat over the word starts sums each word
+    codes = data.astype(np.int64) - ord("a")
+    is_letter = (codes >= 0) & (codes < 26)
+    codes = np.where(is_letter, codes, 0)
+    letter_counts = np.maximum(np.add.reduceat(is_letter.astype(np.int64), starts), 1)
+
+    # Distinct letters via a 26-bit letter mask per word
+    bits = np.where(is_letter, np.left_shift(1, codes), 0).astype(np.uint32)
+    distinct = _popcount32(np.bitwise_or.reduceat(bits, starts))
+
+    # Rarity: mean of -log(frequency) over the word's letters
+    letter_rarity = -np.log(np.asarray(ENGLISH_LETTER_FREQUENCY) / 100)
+    char_rarity = np.where(is_letter, letter_rarity[codes], 0)
+    rarity = np.add.reduceat(char_rarity, starts) / letter_counts
+
+    return {
+        "length": lengths.astype(np.float64),
+        "distinct": distinct.astype(np.float64),
+        "rarity": rarity,
+        "neighbours": _neighbour_counts(data, starts, lengths).astype(np.float64),
+    }
+
+
+def score_features(features):
+    """Combine features into one score in [0, 1] from their weighted percentile ranks."""
+    total = None
+    for name, weight in FEATURE_WEIGHTS.items():
+        values = features[name]
+        # Average rank of ties keeps equal words equal
+        _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+        upper = np.cumsum(counts)
+        mid_rank = (upper - (counts - 1) / 2 - 1)[inverse.ravel()]
+        ranks = mid_rank / max(len(values) - 1, 1)
+        total = weight * ranks if total is None else total + weight * ranks
+    return total / sum(FEATURE_WEIGHTS.values())
+
+
+def bucket_scores(scores, cut_points=(1 / 3, 2 / 3)):
+    """Turn scores into difficulty ids (0 easy, 1 medium, 2 hard) split at score quantiles."""
+    if len(scores) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    thresholds = np.quantile(scores, cut_points)
+    return np.searchsorted(thresholds, scores, side="right").astype(np.uint8)
+
+
+def corpus_hash(buffer, offsets):
+    """Hash identifying a packed corpus, used as the cache key."""
+    digest = hashlib.sha256()
+    digest.update(f"v{FEATURE_VERSION}:".encode())
+    digest.update(bytes(buffer))
+    digest.update(offsets.tobytes())
+    return digest.hexdigest()
+
+
+def classify(buffer, offsets, cache_dir=CACHE_DIR):
+    """
+    Return (scores, difficulty ids) for every word of a packed corpus.
+
+    Results are read from and written to cache_dir when it is not None.
+    """
+    _require_numpy()
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f"difficulty-{corpus_hash(buffer, offsets)}.npz")
+        try:
+            with np.load(cache_path) as cached:
+                return cached["scores"], cached["levels"]
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            pass
+
+    scores = score_features(word_features(buffer, offsets))
+    levels = bucket_scores(scores)
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = cache_path + ".tmp.npz"
+        np.savez_compressed(temp_path, scores=scores.astype(np.float32), levels=levels)
+        os.replace(temp_path, cache_path)
+    return scores, levels
+
+
+def classify_index(index, cache_dir=CACHE_DIR):
+    """Reassign the difficulty of every word in a WordIndex from its computed score."""
+    scores, levels = classify(index.buffer, index.offsets, cache_dir)
+    index.set_difficulties(levels.tolist())
+    index.set_scores(scores.tolist())
+    return index
+
+
+def classify_words(words, cache_dir=CACHE_DIR):
+    """Return a {word: difficulty} dict for a list of words (small lists and tools)."""
+    encoded = [word.encode("utf-8") for word in words]
+    buffer = b"".join(encoded)
+    offsets = np.concatenate(([0], np.cumsum([len(word) for word in encoded]))).astype(np.uint32)
+    _, levels = classify(buffer, offsets, cache_dir)
+    return {word: DIFFICULTIES[level] for word, level in zip(words, levels)}
@@ -0,0 +1,358 @@
+"""
+Headless Hangman rules engine.
+
+The engine holds the state of a single game and applies guesses and hints
+to it. It never prints, reads input or sleeps, so the same rules can drive
+the terminal front-end in hangman-game.py as well as bots, servers and
+simulators running many games in-process.
+"""
+import random
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+# Game rules shared by every front-end
+MAX_INCORRECT_GUESSES = 6
+DIFFICULTY_MULTIPLIER = {"easy": 1, "medium": 2, "hard": 3}
+HINT_PENALTY = 25
+
+# Outcomes reported in GuessResult.outcome
+INVALID = "invalid"
+ALREADY_GUESSED = "already_guessed"
+CORRECT = "correct"
+INCORRECT = "incorrect"
+GAME_FINISHED = "game_finished"
+
+# Outcomes reported in HintResult.outcome
+REVEALED = "revealed"
+NO_HINT = "no_hint"
+
+# Bit i of a letter mask stands for the i-th letter of the alphabet
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+LETTER_INDEX = {letter: i for i, letter in enumerate(ALPHABET)}
+
+# Letters from most to least frequent in English text
+ENGLISH_ORDER = "etaoinshrdlcumwfgypbvkjxqz"
+_RARITY = {LETTER_INDEX[letter]: rank for rank, letter in enumerate(reversed(ENGLISH_ORDER))}
+
+# Hint strategies: a random hidden position, the rarest hidden letter in
+# English, or the hidden letter that uncovers the most positions
+HINT_RANDOM = "random"
+HINT_RAREST = "rarest"
+HINT_MOST_POSITIONS = "most_positions"
+HINT_STRATEGIES = (HINT_RANDOM, HINT_RAREST, HINT_MOST_POSITIONS)
+
+# A move is (code, timestamp): the alphabet index of the letter, plus HINT_MOVE for a hint
+HINT_MOVE = 0x80
+
+GuessResult = namedtuple("GuessResult", ["outcome", "letter", "game_over", "game_won", "score"])
+HintResult = namedtuple("HintResult", ["outcome", "letter", "game_over", "game_won", "score"])
+
+
+class WordMasks:
+    """
+    Precomputed bitmasks for a single word.
+
+    letter_mask has bit i set when the i-th letter of the alphabet occurs in
+    the word, position_masks[i] has bit p set when that letter sits at
+    position p, and full_mask covers every guessable position. Characters
+    outside a-z (spaces, hyphens) are not part of full_mask and are shown
+    as-is from the start.
+
+    For hints, counts[i] is the number of positions of the i-th letter, and
+    the word's distinct letter indices are listed rarest first (by_rarity)
+    and most positions first (by_positions).
+    """
+
+    __slots__ = ("word", "letter_mask", "position_masks", "full_mask", "counts", "by_rarity", "by_positions")
+
+    def __init__(self, word):
+        self.word = word
+        self.position_masks = [0] * len(ALPHABET)
+        self.letter_mask = 0
+        for position, char in enumerate(word):
+            index = LETTER_INDEX.get(char)
+            if index is not None:
+                self.position_masks[index] |= 1 << position
+                self.letter_mask |= 1 << index
+        self.full_mask = 0
+        for mask in self.position_masks:
+            self.full_mask |= mask
+        self.counts = [mask.bit_count() for mask in self.position_masks]
+        letters = [i for i in range(len(ALPHABET)) if self.letter_mask >> i & 1]
+        self.by_rarity = tuple(sorted(letters, key=_RARITY.__getitem__))
+        # Ties go to the rarer letter
+        self.by_positions = tuple(sorted(self.by_rarity, key=self.counts.__getitem__, reverse=True))
+
+
+@lru_cache(maxsize=65536)
+def word_masks(word):
+    """Return the (cached) WordMasks for a lowercase word."""
+    return WordMasks(word)
+
+
+class ManualClock:
+    """Engine clock that returns whatever time its owner sets (simulations, replays)."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class HangmanEngine:
+    """
+    Pure game rules for one Hangman game at a time.
+
+    Call new_game() with the word to guess, then feed it letters through
+    guess() and hint(). Both return a result tuple describing what happened,
+    and the public attributes always reflect the current state of the game.
+
+    Every guess and hint that changes the game is also kept in moves, so a
+    finished game can be logged and replayed exactly (see hangman_events);
+    set record_moves to False when nobody needs them.
+    """
+
+    def __init__(self, max_incorrect_guesses=MAX_INCORRECT_GUESSES, clock=time.time, rng=None,
+                 hint_strategy=HINT_RANDOM):
+        """Create an engine; clock and rng can be swapped for deterministic runs."""
+        if hint_strategy not in HINT_STRATEGIES:
+            raise ValueError(f"Unknown hint strategy: {hint_strategy}")
+        self.max_incorrect_guesses = max_incorrect_guesses
+        self.clock = clock  # Source of timestamps for the time bonus
+        self.rng = rng or random.Random()  # Used to pick hint letters
+        self.hint_strategy = hint_strategy  # How hint() picks a letter when the caller does not
+        self.word_to_guess = ""
+        self.difficulty = "medium"
+        self.masks = word_masks("")
+        self.guessed_mask = 0  # Bit per alphabet letter already guessed
+        self.revealed_mask = 0  # Bit per word position already uncovered
+        self.current_incorrect_guesses = 0
+        self.score = 0
+        self.hints_used = 0
+        self.game_over = False
+        self.game_won = False
+        self.game_start_time = None
+        self.game_end_time = None
+        self.record_moves = True
+        self.moves = []  # (code, timestamp) of each guess and hint that changed the game
+
+    def new_game(self, word, difficulty="medium"):
+        """Reset the engine and start a new game for the given word."""
+        self.word_to_guess = word.lower()
+        self.difficulty = difficulty
+        self.masks = word_masks(self.word_to_guess)
+        self.guessed_mask = 0
+        self.revealed_mask = 0
+        self.current_incorrect_guesses = 0
+        self.score = 0
+        self.hints_used = 0
+        self.game_over = False
+        self.game_won = False
+        self.game_start_time = self.clock()
+        self.game_end_time = None
+        self.moves = []
+
+    @property
+    def word_display(self):
+        """The word with unrevealed letters replaced by underscores."""
+        hidden = self.masks.full_mask & ~self.revealed_mask
+        return ["_" if hidden >> i & 1 else char for i, char in enumerate(self.word_to_guess)]
+
+    @property
+    def guessed_letters(self):
+        """Letters guessed so far, in alphabetical order."""
+        return [letter for i, letter in enumerate(ALPHABET) if self.guessed_mask >> i & 1]
+
+    @property
+    def remaining_attempts(self):
+        """Number of incorrect guesses the player can still afford."""
+        return self.max_incorrect_guesses - self.current_incorrect_guesses
+
+    @property
+    def elapsed(self):
+        """Seconds spent on the current game (frozen once it is over)."""
+        if self.game_start_time is None:
+            return 0
+        end = self.game_end_time if self.game_end_time is not None else self.clock()
+        return end - self.game_start_time
+
+    def is_word_guessed(self):
+        """Check if the word has been completely guessed."""
+        return self.revealed_mask == self.masks.full_mask
+
+    def _reveal(self, index):
+        """Mark the letter with the given alphabet index as guessed and uncover it."""
+        self.guessed_mask |= 1 << index
+        self.revealed_mask |= self.masks.position_masks[index]
+
+    def _check_game_over(self):
+        """Finish the game and apply end-of-game scoring if it has been decided."""
+        if self.is_word_guessed():
+            self.game_won = True
+            self.game_over = True
+            self.game_end_time = self.clock()
+            # Bonus points for winning based on difficulty and remaining attempts
+            time_bonus = max(0, int(300 - (self.game_end_time - self.game_start_time)))
+            multiplier = DIFFICULTY_MULTIPLIER[self.difficulty]
+            win_bonus = 50 * multiplier * (self.remaining_attempts + 1)
+            self.score += win_bonus + time_bonus
+            # Penalty for using hints
+            self.score -= self.hints_used * HINT_PENALTY
+            self.score = max(0, self.score)  # Ensure score doesn't go negative
+        elif self.current_incorrect_guesses >= self.max_incorrect_guesses:
+            self.game_over = True
+            self.game_end_time = self.clock()
+
+    def _result(self, result_type, outcome, letter):
+        return result_type(outcome, letter, self.game_over, self.game_won, self.score)
+
+    def guess(self, letter):
+        """Apply a guessed letter and return a GuessResult."""
+        if self.game_over:
+            return self._result(GuessResult, GAME_FINISHED, letter)
+
+        # Check if the guess is a single letter
+        index = LETTER_INDEX.get(letter.lower()) if len(letter) == 1 else None
+        if index is None:
+            return self._result(GuessResult, INVALID, letter)
+
+        letter = letter.lower()
+        bit = 1 << index
+        if self.guessed_mask & bit:
+            return self._result(GuessResult, ALREADY_GUESSED, letter)
+
+        outcome = self._apply_guess(index)
+        self._check_game_over()
+        return self._result(GuessResult, outcome, letter)
+
+    def _apply_guess(self, index):
+        """Apply a new guess of the letter with the given alphabet index."""
+        bit = 1 << index
+        if self.masks.letter_mask & bit:
+            self._reveal(index)
+            # Score for a correct guess is based on difficulty
+            self.score += 10 * DIFFICULTY_MULTIPLIER[self.difficulty]
+            outcome = CORRECT
+        else:
+            self.guessed_mask |= bit
+            self.current_incorrect_guesses += 1
+            outcome = INCORRECT
+        if self.record_moves:
+            self.moves.append((index, self.clock()))
+        return outcome
+
+    def hint_index(self, strategy=None):
+        """
+        Return the alphabet index of the hidden letter a hint strategy
+        (default: hint_strategy) would reveal, or -1 if nothing is hidden.
+
+        The hidden letters are a bitmask of the word's letters not guessed
+        yet, and the word's letters come pre-sorted for each strategy, so
+        this looks at each distinct letter at most once and never retries.
+        """
+        masks = self.masks
+        hidden = masks.letter_mask & ~self.guessed_mask
+        if not hidden:
+            return -1
+        strategy = strategy or self.hint_strategy
+        if strategy == HINT_RAREST:
+            order = masks.by_rarity
+        elif strategy == HINT_MOST_POSITIONS:
+            order = masks.by_positions
+        elif strategy == HINT_RANDOM:
+            # Each hidden position is equally likely: a letter wins in proportion to its positions
+            counts = masks.counts
+            pick = self.rng.randrange((masks.full_mask & ~self.revealed_mask).bit_count())
+            for index in masks.by_rarity:
+                if hidden >> index & 1:
+                    pick -= counts[index]
+                    if pick < 0:
+                        return index
+        else:
+            raise ValueError(f"Unknown hint strategy: {strategy}")
+        for index in order:
+            if hidden >> index & 1:
+                return index
+
+    def hint(self, letter=None, strategy=None):
+        """
+        Reveal a hidden letter at the cost of score and return a HintResult.
+
+        A caller such as the solver can choose the letter to reveal; without
+        one (or if it is not hidden) the letter comes from a hint strategy,
+        see hint_index().
+        """
+        if self.game_over:
+            return self._result(HintResult, NO_HINT, None)
+
+        index = LETTER_INDEX.get(letter) if letter else None
+        if index is None or not (self.masks.letter_mask & ~self.guessed_mask) >> index & 1:
+            index = self.hint_index(strategy)
+            if index < 0:
+                return self._result(HintResult, NO_HINT, None)
+        self._apply_hint(index)
+        self._check_game_over()
+        return self._result(HintResult, REVEALED, ALPHABET[index])
+
+    def _apply_hint(self, index):
+        """Reveal the hidden letter with the given alphabet index as a hint."""
+        self._reveal(index)
+        if self.record_moves:
+            self.moves.append((HINT_MOVE | index, self.clock()))
+
+        # Increment hints used counter and reduce score
+        self.hints_used += 1
+        self.score = max(0, self.score - HINT_PENALTY)  # Reduce score but don't go below 0
+
+    def apply_move(self, code):
+        """
+        Apply a move as recorded in moves, skipping input checks and result tuples.
+
+        This is the fast path for replaying logged games; the move must have
+        been valid when it was recorded.
+        """
+        if code & HINT_MOVE:
+            self._apply_hint(code & ~HINT_MOVE)
+        else:
+            self._apply_guess(code)
+        self._check_game_over()
+
+    def apply_moves(self, codes):
+        """
+        Apply every move of a recorded game at once (an iterable of move codes).
+
+        The same rules as apply_move() with the state held in locals, for
+        replaying logs in bulk. The game is only checked for being over after
+        the last move, which is where a recorded game ends. Moves are not
+        recorded again.
+        """
+        position_masks = self.masks.position_masks
+        letter_mask = self.masks.letter_mask
+        correct_points = 10 * DIFFICULTY_MULTIPLIER[self.difficulty]
+        guessed = self.guessed_mask
+        revealed = self.revealed_mask
+        incorrect = self.current_incorrect_guesses
+        score = self.score
+        hints = self.hints_used
+        for code in codes:
+            if code & HINT_MOVE:
+                code &= ~HINT_MOVE
+                guessed |= 1 << code
+                revealed |= position_masks[code]
+                hints += 1
+                score = max(0, score - HINT_PENALTY)
+            elif letter_mask >> code & 1:
+                guessed |= 1 << code
+                revealed |= position_masks[code]
+                score += correct_points
+            else:
+                guessed |= 1 << code
+                incorrect += 1
+        self.guessed_mask = guessed
+        self.revealed_mask = revealed
+        self.current_incorrect_guesses = incorrect
+        self.score = score
+        self.hints_used = hints
+        self._check_game_over()
@@ -0,0 +1,382 @@
+"""
+Binary game-event log and replay for Hangman.
+
+Every finished game is appended to a log file as one frame: a fixed-size
+game record (player, category and word as string ids, difficulty, start
+time, exact duration, score, result) followed by its moves, five bytes each
+(letter code and milliseconds since the start). Strings are interned per
+log segment: a string record assigns the next id the first time a player,
+category or word appears, so the log is readable without the word list the
+games were played with. A frame is written with a single write, and the
+file is rotated like a logging.RotatingFileHandler once it grows past a
+size limit.
+
+Each frame starts with the length and CRC-32 of its records, so a reader
+steps from frame to frame without looking inside them. A frame torn by a
+crash fails its checksum; the reader then looks for the next segment header
+that is followed by an intact frame, since player names and words can
+contain the header's bytes too.
+
+Several processes can append to the same log (two CLIs, or the CLI and the
+server). Frames are written under an fcntl lock on <log>.lock, and a frame
+that follows another process's write starts a new segment, so its string
+ids never refer to another writer's strings. Without fcntl (Windows) every
+frame is its own segment.
+
+Replay feeds the recorded moves back through HangmanEngine with a clock that
+returns the recorded times, so games can be re-scored after the rules
+change, audited against the scores that were recorded, or folded into
+player profiles again.
+
+Usage:
+    python hangman_events.py stats hangman_events.log
+    python hangman_events.py audit hangman_events.log*
+    python hangman_events.py profiles --output rebuilt.json hangman_events.log*
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+
+from hangman_engine import ALPHABET, HINT_MOVE, HangmanEngine, ManualClock
+from hangman_words import DIFFICULTIES
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; every frame then starts its own segment
+    fcntl = None
+
+EVENTS_FILE = "hangman_events.log"
+ROTATE_BYTES = 16 * 1024 * 1024  # Log size that triggers a rotation
+BACKUP_COUNT = 5  # Rotated logs kept as <log>.1 (newest) to <log>.5
+
+# A segment starts with MAGIC and a version byte; string ids restart at 0
+MAGIC = b"HGEV"
+VERSION = 2
+STRING_RECORD = 1
+GAME_RECORD = 2
+
+_SEGMENT = struct.Struct("<4sB")
+_FRAME = struct.Struct("<II")  # length and CRC-32 of the frame's records
+_STRING = struct.Struct("<BH")  # type, UTF-8 length
+# type, player, category, word, difficulty id, max incorrect guesses,
+# start time, duration, score, won, number of moves
+_GAME = struct.Struct("<BIIIBBddiBH")
+_MOVE = struct.Struct("<BI")  # letter code (HINT_MOVE for hints), milliseconds since the start
+
+GameRecord = namedtuple("GameRecord", ["player", "category", "word", "difficulty", "max_incorrect_guesses",
+                                       "started", "elapsed", "score", "won", "moves"])
+
+
+class GameEventLog:
+    """
+    Appends finished games to a rotating binary log file (opened on first use).
+
+    A log only this object writes to (shared=False, e.g. one simulation
+    batch) takes no lock and leaves no <log>.lock behind.
+    """
+
+    def __init__(self, path=EVENTS_FILE, max_bytes=ROTATE_BYTES, backup_count=BACKUP_COUNT, shared=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.shared = shared
+        self._file = None
+        self._lock_file = None
+        self._strings = {}  # String -> id in the current segment
+        self._end = None  # Size of the log after this process's last frame; None starts a new segment
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        self._end = None  # Appending to an existing log starts a new segment with its own string ids
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the lock that serialises writers of this log across processes."""
+        if fcntl is None or not self.shared:
+            yield
+            return
+        if self._lock_file is None:
+            self._lock_file = open(self.path + ".lock", "a")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _rotated_elsewhere(self):
+        """Whether another process rotated the log since this one opened it."""
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _rotate(self):
+        """Shift <log>.1 .. <log>.N up by one and start a fresh log (lock held)."""
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def _string_id(self, text, out):
+        """Return the id of text, adding its string record to out the first time."""
+        string_id = self._strings.get(text)
+        if string_id is None:
+            string_id = self._strings[text] = len(self._strings)
+            encoded = text.encode("utf-8")
+            out += _STRING.pack(STRING_RECORD, len(encoded))
+            out += encoded
+        return string_id
+
+    def record_game(self, engine, player, category):
+        """Append the finished game held by engine."""
+        with self._exclusive():
+            if self._file is None:
+                self._open()
+            elif self._rotated_elsewhere():
+                self._file.close()
+                self._open()
+            size = os.fstat(self._file.fileno()).st_size
+            if size >= self.max_bytes:
+                self._rotate()
+                size = 0
+            self._write_frame(engine, player, category, size)
+
+    def _write_frame(self, engine, player, category, size):
+        """Append one game frame to a log of size bytes (lock held)."""
+        frame = bytearray()
+        if size != self._end:
+            # A new file, or another process wrote since our last frame: its strings are not ours
+            frame += _SEGMENT.pack(MAGIC, VERSION)
+            self._strings = {}
+        records = bytearray()
+        player_id = self._string_id(player, records)
+        category_id = self._string_id(category, records)
+        word_id = self._string_id(engine.word_to_guess, records)
+        start = engine.game_start_time
+        end = engine.game_end_time if engine.game_end_time is not None else engine.clock()
+        records += _GAME.pack(GAME_RECORD, player_id, category_id, word_id, DIFFICULTIES.index(engine.difficulty),
+                              engine.max_incorrect_guesses, start, end - start, engine.score, engine.game_won,
+                              len(engine.moves))
+        for code, timestamp in engine.moves:
+            records += _MOVE.pack(code, max(0, int((timestamp - start) * 1000)))
+        frame += _FRAME.pack(len(records), zlib.crc32(records))
+        frame += records
+        self._file.write(frame)
+        self._file.flush()
+        # Without a lock another process may write next, so the next frame starts afresh
+        self._end = size + len(frame) if fcntl is not None or not self.shared else None
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+def log_paths(path=EVENTS_FILE, backup_count=BACKUP_COUNT):
+    """Existing log files of a rotating log, oldest first."""
+    paths = [f"{path}.{i}" for i in range(backup_count, 0, -1)] + [path]
+    return [p for p in paths if os.path.exists(p)]
+
+
+def iter_games(paths):
+    """
+    Yield a GameRecord for every game in the given log files, in order.
+
+    Files are memory-mapped rather than read, so logs larger than RAM are
+    streamed. A frame torn by a crash is skipped up to the next segment,
+    which starts wherever the log was appended to again.
+    """
+    for path in paths:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                continue
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield from _iter_segment_games(data)
+
+
+def _frame_end(data, offset):
+    """End of the intact frame at offset, or -1 if it is torn (or not a frame)."""
+    records = offset + _FRAME.size
+    if records > len(data):
+        return -1
+    length, checksum = _FRAME.unpack_from(data, offset)
+    end = records + length
+    if end > len(data) or zlib.crc32(data[records:end]) != checksum:
+        return -1
+    return end
+
+
+def _next_segment(data, offset):
+    """Offset of the first real segment header at or after offset, or the end of data."""
+    header = _SEGMENT.pack(MAGIC, VERSION)
+    while True:
+        offset = data.find(header, offset)
+        if offset < 0:
+            return len(data)
+        # Names and words can hold the header's bytes: a real header ends the data or starts an intact frame
+        after = offset + _SEGMENT.size
+        if after == len(data) or _frame_end(data, after) >= 0:
+            return offset
+        offset += 1
+
+
+def _read_frame(data, offset, end, strings):
+    """Add the string records of the frame between offset and end to strings and return its game."""
+    while offset < end:
+        kind = data[offset]
+        if kind == STRING_RECORD:
+            _, length = _STRING.unpack_from(data, offset)
+            offset += _STRING.size
+            strings.append(data[offset:offset + length].decode("utf-8", "replace"))
+            offset += length
+        elif kind == GAME_RECORD:
+            (_, player, category, word, difficulty, max_incorrect, started, elapsed, score, won,
+             count) = _GAME.unpack_from(data, offset)
+            moves = offset + _GAME.size
+            if max(player, category, word) >= len(strings) or difficulty >= len(DIFFICULTIES):
+                return None
+            return GameRecord(strings[player], strings[category], strings[word], DIFFICULTIES[difficulty],
+                              max_incorrect, started, elapsed, score, bool(won),
+                              data[moves:moves + count * _MOVE.size])
+        else:
+            return None
+    return None
+
+
+def _iter_segment_games(data):
+    strings = None  # String table of the current segment, None until one starts
+    offset = 0
+    end = len(data)
+    while offset < end:
+        if data[offset:offset + 4] == MAGIC and offset + _SEGMENT.size <= end:
+            _, version = _SEGMENT.unpack_from(data, offset)
+            if version != VERSION:
+                raise ValueError(f"Unsupported event log version {version}")
+            strings = []
+            offset += _SEGMENT.size
+            continue
+        frame_end = _frame_end(data, offset) if strings is not None else -1
+        if frame_end < 0:
+            # A frame torn by a crash: the log continues with the segment of the next append
+            offset = _next_segment(data, offset + 1)
+            strings = None
+            continue
+        game = _read_frame(data, offset + _FRAME.size, frame_end, strings)
+        offset = frame_end
+        if game is not None:
+            yield game
+
+
+def iter_moves(record):
+    """Yield (letter, is_hint, seconds since the start) for each move of a game."""
+    for code, milliseconds in _MOVE.iter_unpack(record.moves):
+        yield ALPHABET[code & ~HINT_MOVE], bool(code & HINT_MOVE), milliseconds / 1000
+
+
+class GameReplayer:
+    """Re-runs recorded games through HangmanEngine at full speed."""
+
+    def __init__(self, engine_factory=HangmanEngine):
+        self.clock = ManualClock()
+        self.engine = engine_factory(clock=self.clock)
+        self.engine.record_moves = False
+        self.moves_replayed = 0
+
+    def replay(self, record):
+        """Play one recorded game again and return the engine holding the result."""
+        engine = self.engine
+        clock = self.clock
+        clock.now = 0.0
+        engine.max_incorrect_guesses = record.max_incorrect_guesses
+        engine.new_game(record.word, record.difficulty)
+        # The rules only read the clock when the game ends, and the time bonus
+        # needs the exact recorded duration, so the move times are not needed
+        clock.now = record.elapsed
+        codes = record.moves[::_MOVE.size]
+        engine.apply_moves(codes)
+        self.moves_replayed += len(codes)
+        return engine
+
+    def replay_all(self, paths):
+        """Yield (record, engine) for every game in the log files."""
+        for record in iter_games(paths):
+            yield record, self.replay(record)
+
+
+def played_at(record):
+    """Timestamp string of when a recorded game ended, as profiles store it."""
+    from datetime import datetime
+
+    return datetime.fromtimestamp(record.started + record.elapsed).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def rebuild_profiles(paths, replayer=None):
+    """Build {player: PlayerProfile} from the log, scoring every game with the current rules."""
+    from hangman_profiles import PlayerProfile
+
+    replayer = replayer or GameReplayer()
+    profiles = {}
+    for record, engine in replayer.replay_all(paths):
+        profile = profiles.get(record.player)
+        if profile is None:
+            profile = profiles[record.player] = PlayerProfile()
+        profile.add_game(engine.game_won, engine.score, record.category, played_at(record))
+    return profiles
+
+
+def audit(paths, replayer=None):
+    """Return (record, replayed score, replayed won) for every game whose result does not reproduce."""
+    replayer = replayer or GameReplayer()
+    return [(record, engine.score, engine.game_won) for record, engine in replayer.replay_all(paths)
+            if engine.score != record.score or engine.game_won != record.won]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and replay Hangman game-event logs.")
+    parser.add_argument("command", choices=["stats", "audit", "profiles"])
+    parser.add_argument("logs", nargs="*", help=f"log files, oldest first (default: {EVENTS_FILE} and its backups)")
+    parser.add_argument("--output", default="rebuilt_profiles.json", help="snapshot written by the profiles command")
+    args = parser.parse_args()
+    paths = args.logs or log_paths()
+
+    replayer = GameReplayer()
+    start = time.perf_counter()
+    if args.command == "stats":
+        games = wins = 0
+        for _, engine in replayer.replay_all(paths):
+            games += 1
+            wins += engine.game_won
+        print(f"{games} games, {wins} won")
+    elif args.command == "audit":
+        mismatches = audit(paths, replayer)
+        for record, score, won in mismatches:
+            print(f"{record.player} {record.word!r} at {played_at(record)}: recorded {record.score} "
+                  f"({'won' if record.won else 'lost'}), replayed {score} ({'won' if won else 'lost'})")
+        print(f"{len(mismatches)} games do not reproduce")
+    else:
+        from hangman_profiles import write_snapshot
+
+        profiles = rebuild_profiles(paths, replayer)
+        with open(args.output, "w") as file:
+            write_snapshot(profiles, file)
+        print(f"Wrote {len(profiles)} profiles to {args.output}")
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {replayer.moves_replayed} moves in {elapsed:.2f}s "
+          f"({replayer.moves_replayed / max(elapsed, 1e-9):,.0f} moves/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Adversarial ("evil") Hangman.
+
+EvilHangmanEngine does not commit to a word when the game starts. It keeps
+every dictionary word of the right length and category that is consistent
+with the game so far, and on each guess splits them by the pattern the
+letter would reveal, then keeps the largest group. The player only sees a normal game:
+word_to_guess is always one member of that group, so the display, scoring
+and game-over screen work unchanged.
+
+Candidates are a bitset over one of HangmanSolver's length buckets. Groups
+are split with big-integer ANDs against its per-position letter bitsets,
+largest group first, which keeps a guess around a millisecond on a
+100k-word dictionary.
+"""
+import heapq
+import time
+
+from hangman_engine import ALPHABET, LETTER_INDEX, MAX_INCORRECT_GUESSES, HangmanEngine, word_masks
+
+
+class EvilHangmanEngine(HangmanEngine):
+    """HangmanEngine whose word keeps changing to dodge the player's guesses."""
+
+    def __init__(self, solver, max_incorrect_guesses=MAX_INCORRECT_GUESSES, clock=time.time, rng=None):
+        """solver provides the dictionary (its length buckets) the word is chosen from."""
+        super().__init__(max_incorrect_guesses, clock, rng)
+        self.solver = solver
+        self.bucket = None  # Length bucket of the current game, None for a plain game
+        self.candidates = 0  # Bit i set while bucket word i is still possible
+        self.word_id = -1  # Bucket index of word_to_guess
+
+    def new_game(self, word, difficulty="medium", category="random"):
+        """
+        Start a game with the length (and spaces or hyphens) of word; the
+        word itself is not fixed, except that it stays in category.
+        """
+        super().new_game(word, difficulty)
+        self.bucket = self.solver.buckets.get(len(self.word_to_guess))
+        self.candidates = 0
+        self.word_id = -1
+        if self.bucket is None:
+            return  # No dictionary words of this length: play word as an ordinary game
+        if category == "random":
+            candidates = self.bucket.all_mask
+        else:
+            candidates = self.bucket.category_masks.get(category, 0)
+        for position, char in enumerate(self.word_to_guess):
+            if char not in LETTER_INDEX:
+                candidates &= self.bucket.position_masks[position].get(char, 0)
+        if not candidates:
+            self.bucket = None
+            return
+        self._settle(candidates)
+
+    @property
+    def candidate_count(self):
+        """Number of words the game could still end on."""
+        return self.candidates.bit_count() if self.bucket is not None else 1
+
+    def _settle(self, candidates):
+        """Narrow the candidates and make sure word_to_guess is one of them."""
+        self.candidates = candidates
+        if self.word_id >= 0 and candidates >> self.word_id & 1:
+            return
+        # Start looking at a random bit so the final word is not always the first one
+        start = self.rng.randrange(candidates.bit_length())
+        above = candidates >> start
+        if above:
+            self.word_id = start + (above & -above).bit_length() - 1
+        else:
+            self.word_id = (candidates & -candidates).bit_length() - 1
+        self.word_to_guess = self.bucket.words[self.word_id].decode("ascii")
+        self.masks = word_masks(self.word_to_guess)
+
+    def largest_group(self, letter):
+        """
+        Return (position mask, candidate bitset) of the largest group of
+        candidates sharing the positions letter would reveal; mask 0 is the
+        group of words without the letter.
+
+        Groups are split one position at a time, always splitting the
+        largest group left. Splitting never grows a group, so the first group
+        with no position left to split is the answer, and the many small
+        groups a full partition would produce are never built. Ties go to
+        the group revealing fewer letters.
+        """
+        position_masks = self.bucket.position_masks
+        length = len(position_masks)
+        # (-size, letters revealed, pattern, tie breaker, next position, group)
+        heap = [(-self.candidates.bit_count(), 0, 0, 0, 0, self.candidates)]
+        pushed = 1
+        while True:
+            size, revealed, pattern, _, position, group = heapq.heappop(heap)
+            while position < length and not position_masks[position].get(letter, 0) & group:
+                position += 1
+            if position == length:
+                return pattern, group
+            inside = group & position_masks[position][letter]
+            outside = group ^ inside
+            heapq.heappush(heap, (-inside.bit_count(), revealed + 1, pattern | 1 << position, pushed, position + 1, inside))
+            if outside:
+                heapq.heappush(heap, (size + inside.bit_count(), revealed, pattern, pushed + 1, position + 1, outside))
+            pushed += 2
+
+    def _dodge(self, letter):
+        """Keep the largest group of candidates for letter."""
+        _, group = self.largest_group(letter)
+        self._settle(group)
+
+    def guess(self, letter):
+        if self.bucket is not None and not self.game_over and len(letter) == 1:
+            index = LETTER_INDEX.get(letter.lower())
+            if index is not None and not self.guessed_mask >> index & 1:
+                self._dodge(ALPHABET[index])
+        return super().guess(letter)
+
+    def hint(self, letter=None, strategy=None):
+        result = super().hint(letter, strategy)
+        if self.bucket is not None and result.letter is not None:
+            # Only words with the hinted letter in exactly the same places stay possible
+            candidates = self.candidates
+            for position, char in enumerate(self.word_to_guess):
+                mask = self.bucket.position_masks[position].get(result.letter, 0)
+                candidates &= mask if char == result.letter else ~mask
+            self._settle(candidates)
+        return result
@@ -0,0 +1,340 @@
+"""
+Lightweight metrics for Hangman: counters, latency histograms and export.
+
+A MetricsRegistry holds counters and fixed-bucket histograms and renders
+them in the Prometheus text exposition format. MetricsExporter writes that
+text to a file every few seconds (atomically, for node_exporter's textfile
+collector) and/or serves it over HTTP at /metrics.
+
+Metrics cost nothing until they are turned on: instrument() wraps a method
+of one object with a timer, so code that is not instrumented runs exactly
+as before. GameMetrics bundles the metrics the game and the server record.
+
+SessionProfiler is the opt-in deep dive: it runs cProfile and tracemalloc
+for one whole session and writes the profile and the top allocation sites
+when the session ends.
+
+http.server, cProfile, pstats and tracemalloc are only imported by the
+exporter and the profiler that use them: they would otherwise take longer
+to import than the rest of the game.
+"""
+import functools
+import io
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the latency histogram buckets, from 50 us to 5 s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+EXPORT_INTERVAL = 15.0  # Seconds between metric file writes
+PROFILE_TOP = 40  # Functions and allocation sites listed in a session profile
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Histogram:
+    """Counts of observed values per bucket, plus their sum and count."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # The last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        """Context manager that observes the seconds its block takes."""
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels)
+    if extra is not None:
+        items.append(extra)
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Named counters and histograms, each optionally split by labels."""
+
+    def __init__(self):
+        self._families = {}  # name -> [type, help, {label items: metric}]
+        self._lock = threading.Lock()
+
+    def _metric(self, kind, name, help_text, labels, factory):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is None:
+            with self._lock:
+                family = self._families.setdefault(name, [kind, help_text, {}])
+        if family[0] != kind:
+            raise ValueError(f"Metric {name} is already registered as a {family[0]}")
+        metric = family[2].get(key)
+        if metric is None:
+            with self._lock:
+                metric = family[2].setdefault(key, factory())
+        return metric
+
+    def counter(self, name, help_text, **labels):
+        """Return the counter for name and labels, registering it the first time."""
+        return self._metric("counter", name, help_text, labels, Counter)
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, **labels):
+        """Return the histogram for name and labels, registering it the first time."""
+        return self._metric("histogram", name, help_text, labels, lambda: Histogram(buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            families = [(name, kind, help_text, list(metrics.items()))
+                        for name, (kind, help_text, metrics) in sorted(self._families.items())]
+        for name, kind, help_text, metrics in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in metrics:
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {metric.value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.bounds + (float("inf"),), metric.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(metric.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the rendered metrics to path atomically."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            file.write(self.render())
+        os.replace(temp_path, path)
+
+
+def instrument(obj, method_name, histogram):
+    """
+    Time every call of obj's method in histogram.
+
+    The timed wrapper is stored on the object itself, so other instances
+    and the class are untouched.
+    """
+    method = getattr(obj, method_name)
+    perf_counter = time.perf_counter
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - start)
+
+    setattr(obj, method_name, timed)
+    return timed
+
+
+class GameMetrics:
+    """The metrics recorded by the game and the server, on one registry."""
+
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        registry = self.registry
+        self.guess_seconds = registry.histogram("hangman_guess_seconds", "Time to process a guess")
+        self.render_seconds = registry.histogram("hangman_render_seconds", "Time to draw the game screen")
+        self.profile_load_seconds = registry.histogram("hangman_profile_load_seconds",
+                                                       "Time to open the player profile store")
+        self.profile_save_seconds = registry.histogram("hangman_profile_save_seconds",
+                                                       "Time to record a finished game in the profile store")
+        self.profile_flush_seconds = registry.histogram("hangman_profile_flush_seconds",
+                                                        "Time to write queued profile changes to disk")
+        self.profile_compaction_seconds = registry.histogram("hangman_profile_compaction_seconds",
+                                                             "Time to fold the profile journal into the snapshot")
+        self.word_selection_seconds = registry.histogram("hangman_word_selection_seconds",
+                                                         "Time to choose the next word")
+        self._games = {won: registry.counter("hangman_games_finished_total", "Games played to the end",
+                                             result="won" if won else "lost") for won in (True, False)}
+
+    def game_finished(self, won):
+        self._games[bool(won)].inc()
+
+    def instrument_profile_store(self, store):
+        """
+        Time the disk writes a profile store makes outside record_game().
+
+        The journal store only queues a change in record_game() and writes it
+        in _write_journal(), which flush() calls on its background thread when
+        changes are queued (idle flushes are not timed); journal and record
+        stores also rewrite their files in _compact(). Stores without those
+        methods write inside record_game(), which profile_save_seconds already
+        times.
+        """
+        for method_name, histogram in (("_write_journal", self.profile_flush_seconds),
+                                       ("_compact", self.profile_compaction_seconds)):
+            if hasattr(store, method_name):
+                instrument(store, method_name, histogram)
+
+    def command_seconds(self, command):
+        """Histogram of the time the server spends on one protocol command."""
+        return self.registry.histogram("hangman_command_seconds", "Time to handle a server command",
+                                       command=command)
+
+
+def _metrics_server(registry, host, port):
+    """HTTP server answering GET /metrics with the rendered registry."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes are not worth a line on the game screen
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    return server
+
+
+class MetricsExporter:
+    """
+    Publishes a registry: written to path every interval seconds and/or
+    served at http://host:port/metrics, from daemon threads.
+    """
+
+    def __init__(self, registry, path=None, port=None, host="127.0.0.1", interval=EXPORT_INTERVAL):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._closed = threading.Event()
+        self._writer = None
+        self.http_server = None
+        if port is not None:
+            self.http_server = _metrics_server(registry, host, port)
+            threading.Thread(target=self.http_server.serve_forever, name="metrics-http", daemon=True).start()
+        if path is not None:
+            self._writer = threading.Thread(target=self._write_loop, name="metrics-writer", daemon=True)
+            self._writer.start()
+
+    @property
+    def port(self):
+        return self.http_server.server_address[1] if self.http_server is not None else None
+
+    def _write_loop(self):
+        while not self._closed.wait(self.interval):
+            self.write()
+
+    def write(self):
+        if self.path is not None:
+            try:
+                self.registry.write(self.path)
+            except OSError:
+                pass  # Metrics must never take the game down; the next write tries again
+
+    def close(self):
+        """Stop exporting, after a final write of the file."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._writer is not None:
+            self._writer.join()
+        self.write()
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+
+
+class SessionProfiler:
+    """
+    cProfile and tracemalloc for one session, written to a directory on stop():
+    session.pstats (for pstats or snakeviz) and session.txt (top functions by
+    cumulative time, then the top allocation sites and the peak heap).
+    """
+
+    def __init__(self, directory, frames=10):
+        self.directory = directory
+        self.frames = frames
+        self.profiler = None
+
+    def start(self):
+        import cProfile
+        import tracemalloc
+
+        os.makedirs(self.directory, exist_ok=True)
+        tracemalloc.start(self.frames)
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self):
+        """Stop capturing, write the reports and return the path of the summary."""
+        if self.profiler is None:
+            return None
+        import pstats
+        import tracemalloc
+
+        self.profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.profiler.dump_stats(os.path.join(self.directory, "session.pstats"))
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        out.write(f"\nPython heap: {current / 1024:,.0f} KiB at the end, {peak / 1024:,.0f} KiB at the peak\n")
+        out.write(f"\nTop {PROFILE_TOP} allocation sites still alive:\n")
+        for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+            out.write(f"{stat}\n")
+        summary_path = os.path.join(self.directory, "session.txt")
+        with open(summary_path, "w") as file:
+            file.write(out.getvalue())
+        self.profiler = None
+        return summary_path
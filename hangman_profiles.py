@@ -0,0 +1,1167 @@
+"""
+Player profile storage for Hangman.
+
+Profiles are kept in memory as a dictionary of compact PlayerProfile records
+and saved in the same shape that has always been written to
+hangman_profiles.json. Instead of rewriting that file after every game, each
+change is appended as one small JSON line to a journal next to it. The journal is replayed on load and folded
+back into the JSON snapshot by a background thread once it grows past a size
+threshold.
+
+Changes are written behind: they are queued in memory and written by a
+background thread, so the game-over path never waits on disk I/O.
+
+SharedJournalProfileStore lets several processes on one host use the same
+files safely: writes are serialised with fcntl advisory locks and every
+process tails the journal for the changes made by the others.
+
+SQLiteProfileStore offers the same interface on top of the standard-library
+sqlite3 module, for player bases too large to hold in memory.
+
+RecordProfileStore keeps one JSON line per profile in an append-only record
+file and only reads a name-to-offset index when it opens; a profile is parsed
+the first time it is asked for.
+"""
+import atexit
+import heapq
+import json
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; only SharedJournalProfileStore needs it
+    fcntl = None
+
+PROFILES_FILE = "hangman_profiles.json"
+PROFILES_DB = "hangman_profiles.db"
+PROFILES_RECORDS = "hangman_profiles.records"
+JOURNAL_COMPACT_BYTES = 256 * 1024  # Journal size that triggers a compaction
+FLUSH_INTERVAL = 1.0  # Seconds between background writes of queued changes
+RECORD_CACHE_SIZE = 1024  # Parsed profiles kept in memory by RecordProfileStore
+
+# Stats that can be ranked with leaderboard()
+LEADERBOARD_FIELDS = ("best_score", "highest_streak", "games_played", "win_rate")
+
+
+class PlayerProfile:
+    """
+    Statistics of one player.
+
+    A __slots__ record instead of a dictionary: the counters are plain
+    attributes and the games per category live in a small unsigned array
+    indexed by a category id, so a profile costs a couple of hundred bytes
+    rather than a dozen dictionaries and boxed strings. The favorite category
+    is kept up to date as games are added instead of being searched for.
+    """
+
+    __slots__ = ("games_played", "games_won", "games_lost", "best_score", "total_score",
+                 "last_played", "highest_streak", "current_streak", "category_counts", "favorite_id")
+
+    # Category ids are shared by every profile in the process
+    category_names = []
+    category_ids = {}
+
+    def __init__(self):
+        self.games_played = 0
+        self.games_won = 0
+        self.games_lost = 0
+        self.best_score = 0
+        self.total_score = 0
+        self.last_played = ""
+        self.highest_streak = 0
+        self.current_streak = 0
+        self.category_counts = array("I")  # category id -> games played
+        self.favorite_id = -1  # -1 until the first game
+
+    @classmethod
+    def category_id(cls, category):
+        """Return the id of a category name, registering it on first use."""
+        category_id = cls.category_ids.get(category)
+        if category_id is None:
+            category_id = cls.category_ids[category] = len(cls.category_names)
+            cls.category_names.append(category)
+        return category_id
+
+    @property
+    def favorite_category(self):
+        return self.category_names[self.favorite_id] if self.favorite_id >= 0 else ""
+
+    @property
+    def win_rate(self):
+        """Fraction of games won, 0 for a player who has not played yet."""
+        if self.games_played == 0:
+            return 0
+        return self.games_won / self.games_played
+
+    def _count(self, category_id):
+        counts = self.category_counts
+        return counts[category_id] if category_id < len(counts) else 0
+
+    def counts_by_category(self):
+        """Return {category name: games played} for the categories played."""
+        return {self.category_names[i]: count for i, count in enumerate(self.category_counts) if count}
+
+    def add_game(self, won, score, category, played_at):
+        """Update the statistics with the result of one game."""
+        self.games_played += 1
+        self.last_played = played_at
+
+        if won:
+            self.games_won += 1
+            self.current_streak += 1
+            if self.current_streak > self.highest_streak:
+                self.highest_streak = self.current_streak
+        else:
+            self.games_lost += 1
+            self.current_streak = 0
+
+        self.total_score += score
+        if score > self.best_score:
+            self.best_score = score
+
+        # Only the category just played can overtake the favorite
+        category_id = self.category_id(category)
+        counts = self.category_counts
+        if category_id >= len(counts):
+            counts.extend([0] * (category_id + 1 - len(counts)))
+        counts[category_id] += 1
+        if self.favorite_id < 0 or counts[category_id] > self._count(self.favorite_id):
+            self.favorite_id = category_id
+
+    def to_dict(self):
+        """Return the profile in the hangman_profiles.json format."""
+        profile = {
+            "games_played": self.games_played,
+            "games_won": self.games_won,
+            "games_lost": self.games_lost,
+            "best_score": self.best_score,
+            "total_score": self.total_score,
+            "favorite_category": self.favorite_category,
+            "last_played": self.last_played,
+            "highest_streak": self.highest_streak,
+            "current_streak": self.current_streak
+        }
+        counts = self.counts_by_category()
+        if counts:
+            profile["category_counts"] = counts
+        return profile
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a profile from the hangman_profiles.json format (missing stats are 0)."""
+        profile = cls()
+        profile.games_played = data.get("games_played", 0)
+        profile.games_won = data.get("games_won", 0)
+        profile.games_lost = data.get("games_lost", 0)
+        profile.best_score = data.get("best_score", 0)
+        profile.total_score = data.get("total_score", 0)
+        profile.last_played = data.get("last_played", "")
+        profile.highest_streak = data.get("highest_streak", 0)
+        profile.current_streak = data.get("current_streak", 0)
+
+        counts = data.get("category_counts") or {}
+        if counts:
+            ids = [cls.category_id(category) for category in counts]
+            profile.category_counts = array("I", bytes(4 * (max(ids) + 1)))
+            for category_id, count in zip(ids, counts.values()):
+                profile.category_counts[category_id] = count
+        favorite = data.get("favorite_category")
+        if favorite:
+            profile.favorite_id = cls.category_id(favorite)
+        elif counts:
+            profile.favorite_id = max(ids, key=profile._count)
+        return profile
+
+
+def apply_entry(profiles, entry):
+    """Apply one journal entry to a dictionary of profiles."""
+    op = entry.get("op")
+    name = entry.get("name")
+    if op == "create":
+        profiles.setdefault(name, PlayerProfile())
+    elif op == "delete":
+        profiles.pop(name, None)
+    elif op == "game" and name in profiles:
+        profiles[name].add_game(entry["won"], entry["score"], entry["category"], entry["at"])
+
+
+def replay_journal(profiles, path):
+    """Apply every complete entry of a journal file to profiles."""
+    try:
+        with open(path, "r") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A line torn by a crash mid-append; the lines after it are still valid
+                apply_entry(profiles, entry)
+    except FileNotFoundError:
+        pass
+
+
+def truncate_torn_tail(path):
+    """
+    Cut a journal back to the end of its last complete line.
+
+    A crash mid-append leaves a line without its newline; appending after it
+    would glue the next entry onto the torn bytes and lose both.
+    """
+    try:
+        with open(path, "r+b") as file:
+            end = file.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                file.seek(start)
+                newline = file.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                file.truncate(position)
+    except FileNotFoundError:
+        pass
+
+
+def read_snapshot(path):
+    """Load a hangman_profiles.json snapshot as a dictionary of PlayerProfile."""
+    with open(path, "r") as file:
+        return {name: PlayerProfile.from_dict(data) for name, data in json.load(file).items()}
+
+
+def write_snapshot(profiles, file):
+    """Write a dictionary of PlayerProfile in the hangman_profiles.json format."""
+    json.dump({name: profile.to_dict() for name, profile in profiles.items()}, file, indent=4)
+
+
+def fsync_directory(path):
+    """Make a rename inside the directory of path durable (best effort)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JournalProfileStore:
+    """
+    Profile store backed by a JSON snapshot plus an append-only journal.
+
+    The store behaves like a read-only dictionary of profiles; changes go
+    through create(), record_game() and delete(). Those only update memory
+    and queue a journal line: a background thread writes the queued lines
+    every flush_interval seconds (and on close), so finishing a game never
+    waits on disk. When the journal passes compact_bytes it is rotated to
+    <journal>.old and a background thread merges it into the snapshot.
+
+    Every file is replaced atomically (temporary file, fsync, os.replace),
+    so a crash can lose at most the last unflushed changes, never the file.
+    A journal line torn by a crash is cut off when the store is next opened,
+    so later changes are appended after the last complete line.
+    Compaction is crash-safe too: the new snapshot is written to
+    <snapshot>.tmp and only becomes authoritative once <journal>.old has
+    been removed, so a load either replays the old journal or finishes
+    installing the new snapshot, never both.
+    """
+
+    def __init__(self, path=PROFILES_FILE, compact_bytes=JOURNAL_COMPACT_BYTES, flush_interval=FLUSH_INTERVAL):
+        """Open the store; a flush_interval of 0 writes every change synchronously."""
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.old_journal_path = self.journal_path + ".old"
+        self.compact_bytes = compact_bytes
+        self.flush_interval = flush_interval
+        self.profiles = {}
+        self.load_status = "missing"  # "loaded", "missing" or "corrupted"
+        self._lock = threading.Lock()  # Guards profiles and the pending lines
+        self._io_lock = threading.Lock()  # Guards the journal file and compaction
+        self._pending = []  # Journal lines not written yet
+        self._compactor = None
+        self._journal = None
+        self._load()
+
+        self._closed = threading.Event()
+        self._flusher = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="profile-flusher", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def _load(self):
+        """Read the snapshot, replay the journals and reopen the journal for appending."""
+        self._recover_compaction()
+        try:
+            self.profiles = read_snapshot(self.path)
+            self.load_status = "loaded"
+        except FileNotFoundError:
+            self.profiles = {}
+        except json.JSONDecodeError:
+            # Keep the damaged file for inspection instead of overwriting it later
+            os.replace(self.path, self.path + ".corrupt")
+            self.profiles = {}
+            self.load_status = "corrupted"
+
+        journal_found = os.path.exists(self.journal_path) or os.path.exists(self.old_journal_path)
+        replay_journal(self.profiles, self.old_journal_path)
+        replay_journal(self.profiles, self.journal_path)
+        if journal_found and self.load_status == "missing":
+            self.load_status = "loaded"
+
+        truncate_torn_tail(self.journal_path)
+        self._journal = open(self.journal_path, "a")
+        if os.path.exists(self.old_journal_path):
+            # A previous compaction did not finish; pick it up again
+            self._start_compaction()
+
+    def _recover_compaction(self):
+        """Finish or discard a compaction that was interrupted by a crash."""
+        temp_path = self.path + ".tmp"
+        if not os.path.exists(temp_path):
+            return
+        if os.path.exists(self.old_journal_path):
+            os.remove(temp_path)  # The old journal is still authoritative
+        else:
+            os.replace(temp_path, self.path)  # The old journal was already merged
+
+    # Read access -----------------------------------------------------------
+
+    def __contains__(self, name):
+        return name in self.profiles
+
+    def __getitem__(self, name):
+        return self.profiles[name]
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def __iter__(self):
+        return iter(self.profiles)
+
+    def keys(self):
+        return self.profiles.keys()
+
+    def get(self, name, default=None):
+        return self.profiles.get(name, default)
+
+    def leaderboard(self, field="best_score", limit=10):
+        """Return the top (name, value) pairs for one of LEADERBOARD_FIELDS."""
+        if field not in LEADERBOARD_FIELDS:
+            raise ValueError(f"Unknown leaderboard field: {field}")
+        ranked = ((getattr(profile, field), name) for name, profile in self.profiles.items()
+                  if field != "win_rate" or profile.games_played > 0)
+        return [(name, value) for value, name in heapq.nlargest(limit, ranked)]
+
+    # Changes ---------------------------------------------------------------
+
+    def create(self, name):
+        """Create an empty profile for name if it does not exist yet."""
+        if name not in self.profiles:
+            self._append({"op": "create", "name": name})
+
+    def record_game(self, name, won, score, category, played_at=None):
+        """Add the result of one game to the statistics of name."""
+        if played_at is None:
+            played_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._append({"op": "game", "name": name, "won": won, "score": score,
+                      "category": category, "at": played_at})
+
+    def delete(self, name):
+        """Remove the profile of name."""
+        if name in self.profiles:
+            self._append({"op": "delete", "name": name})
+
+    def _append(self, entry):
+        """Apply an entry in memory and queue it for the journal."""
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            apply_entry(self.profiles, entry)
+            self._pending.append(line)
+        if self._flusher is None:
+            self.flush()
+
+    # Writing ---------------------------------------------------------------
+
+    def _flush_loop(self):
+        """Write queued changes every flush_interval seconds until closed."""
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write every queued change to the journal and fsync it."""
+        with self._io_lock:
+            with self._lock:
+                lines, self._pending = self._pending, []
+            if lines and self._journal is not None:
+                self._write_journal(lines)
+
+    def _write_journal(self, lines):
+        """Append lines to the journal and fsync it (I/O lock held)."""
+        self._journal.write("".join(lines))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        if self._journal.tell() >= self.compact_bytes:
+            self._schedule_compaction()
+
+    # Compaction ------------------------------------------------------------
+
+    def _schedule_compaction(self):
+        """Rotate the journal and compact it, unless a compaction is running (I/O lock held)."""
+        if self._compactor is not None:
+            return
+        if os.path.exists(self.old_journal_path):
+            # A failed compaction left <journal>.old unmerged: rotating now would
+            # overwrite it, so merge it first and rotate once that has worked
+            self._start_compaction()
+        else:
+            self._rotate_journal()
+
+    def _rotate_journal(self):
+        """Move the current journal aside and start a compaction (I/O lock held)."""
+        self._journal.close()
+        os.replace(self.journal_path, self.old_journal_path)
+        self._journal = open(self.journal_path, "a")
+        self._start_compaction()
+
+    def _start_compaction(self):
+        self._compactor = threading.Thread(target=self._compact, name="profile-compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact(self):
+        """Merge the rotated journal into a new snapshot (runs in the background)."""
+        try:
+            try:
+                profiles = read_snapshot(self.path)
+            except FileNotFoundError:
+                profiles = {}
+            replay_journal(profiles, self.old_journal_path)
+
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as file:
+                write_snapshot(profiles, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.remove(self.old_journal_path)  # From here on the new snapshot is authoritative
+            os.replace(temp_path, self.path)
+            fsync_directory(self.path)
+        except (OSError, json.JSONDecodeError):
+            pass  # The old journal stays in place and is merged on the next load
+        finally:
+            with self._io_lock:
+                self._compactor = None
+
+    def _wait_for_compaction(self):
+        with self._io_lock:
+            compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def compact(self):
+        """Fold the whole journal into the snapshot now and wait for it to finish."""
+        self.flush()
+        self._wait_for_compaction()
+        with self._io_lock:
+            if os.path.exists(self.old_journal_path):
+                self._schedule_compaction()  # Retry a failed merge before rotating again
+        self._wait_for_compaction()
+        with self._io_lock:
+            if self._journal.tell() > 0:
+                self._schedule_compaction()
+        self._wait_for_compaction()
+
+    def close(self):
+        """Write queued changes, wait for a running compaction and close the journal."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        atexit.unregister(self.close)
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        self._wait_for_compaction()
+        with self._io_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class SharedJournalProfileStore(JournalProfileStore):
+    """
+    Journal store that several processes can share (POSIX only).
+
+    Every change is written through under an exclusive fcntl lock on
+    <snapshot>.lock, after first applying whatever other processes appended
+    since this process last looked. The journal is one ordered log of
+    per-game deltas, so counters such as games_played, total_score and
+    category_counts from every process add up instead of the last writer
+    replacing the whole file. Reads pick up other processes' changes first.
+
+    A rotation by another process is detected from the journal's inode and
+    answered with a full reload. Compaction holds <snapshot>.compact.lock for
+    its whole run, and installs the new snapshot under the main lock, so a
+    concurrent load never sees a half-finished compaction.
+    """
+
+    def __init__(self, path=PROFILES_FILE, compact_bytes=JOURNAL_COMPACT_BYTES):
+        if fcntl is None:
+            raise RuntimeError("SharedJournalProfileStore needs fcntl (POSIX systems only)")
+        self.lock_path = path + ".lock"
+        self.compact_lock_path = path + ".compact.lock"
+        self._lock_file = open(self.lock_path, "a")
+        self._journal_inode = None
+        self._journal_offset = 0  # Bytes of the current journal applied in memory
+        # Changes are written through, so there is no background flusher
+        super().__init__(path, compact_bytes, flush_interval=0)
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the cross-process lock (and the in-process I/O lock)."""
+        with self._io_lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    # Loading and catching up -----------------------------------------------
+
+    def _load(self):
+        with self._exclusive():
+            self._recover_compaction()
+            self._read_all()
+            start_compaction = os.path.exists(self.old_journal_path)
+        if start_compaction:
+            # A previous compaction did not finish; pick it up again
+            self._start_compaction()
+
+    def _recover_compaction(self):
+        """Recover an interrupted compaction, unless another process is running one."""
+        with open(self.compact_lock_path, "a") as compact_lock:
+            try:
+                fcntl.flock(compact_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # The .tmp file belongs to a live compaction
+            try:
+                super()._recover_compaction()
+            finally:
+                fcntl.flock(compact_lock, fcntl.LOCK_UN)
+
+    def _read_all(self):
+        """Rebuild profiles from the snapshot and both journals (lock held)."""
+        try:
+            self.profiles = read_snapshot(self.path)
+            self.load_status = "loaded"
+        except FileNotFoundError:
+            self.profiles = {}
+        except json.JSONDecodeError:
+            os.replace(self.path, self.path + ".corrupt")
+            self.profiles = {}
+            self.load_status = "corrupted"
+        replay_journal(self.profiles, self.old_journal_path)
+
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, "a")
+        self._journal_inode = os.fstat(self._journal.fileno()).st_ino
+        self._journal_offset = 0
+        self._catch_up()
+        if self.profiles and self.load_status == "missing":
+            self.load_status = "loaded"
+
+    def _catch_up(self):
+        """Apply journal lines other processes appended since the last look (lock held)."""
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            stat = None
+        if stat is None or stat.st_ino != self._journal_inode or stat.st_size < self._journal_offset:
+            # Another process rotated the journal under us
+            self._read_all()
+            return
+        if stat.st_size == self._journal_offset:
+            return
+        with open(self.journal_path, "rb") as file:
+            file.seek(self._journal_offset)
+            data = file.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        with self._lock:
+            for line in complete.splitlines():
+                try:
+                    apply_entry(self.profiles, json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # A line torn by a crashed writer
+        self._journal_offset += len(complete)
+
+    def refresh(self):
+        """Pick up changes made by other processes."""
+        try:
+            stat = os.stat(self.journal_path)
+            if stat.st_ino == self._journal_inode and stat.st_size == self._journal_offset:
+                return  # Nothing new; no need to take the lock
+        except FileNotFoundError:
+            pass
+        with self._exclusive():
+            self._catch_up()
+
+    # Read access -----------------------------------------------------------
+
+    def __contains__(self, name):
+        self.refresh()
+        return name in self.profiles
+
+    def __getitem__(self, name):
+        self.refresh()
+        return self.profiles[name]
+
+    def __len__(self):
+        self.refresh()
+        return len(self.profiles)
+
+    def __iter__(self):
+        self.refresh()
+        return iter(list(self.profiles))
+
+    def keys(self):
+        self.refresh()
+        return list(self.profiles)
+
+    def get(self, name, default=None):
+        self.refresh()
+        return self.profiles.get(name, default)
+
+    def leaderboard(self, field="best_score", limit=10):
+        self.refresh()
+        return super().leaderboard(field, limit)
+
+    # Writing ---------------------------------------------------------------
+
+    def _append(self, entry):
+        """Append an entry after catching up, so the journal order is the apply order."""
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._exclusive():
+            self._catch_up()
+            if os.fstat(self._journal.fileno()).st_size != self._journal_offset:
+                # Bytes past the last complete line are a line torn by a crashed writer
+                # (live writers hold the lock): cut them off before appending
+                self._journal.truncate(self._journal_offset)
+            self._journal.write(line)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_offset = self._journal.tell()
+            with self._lock:
+                apply_entry(self.profiles, entry)
+            if self._journal_offset >= self.compact_bytes:
+                self._schedule_compaction()
+
+    def _rotate_journal(self):
+        """Move the journal aside and start a compaction (cross-process lock held)."""
+        self._journal.close()
+        os.replace(self.journal_path, self.old_journal_path)
+        self._journal = open(self.journal_path, "a")
+        self._journal_inode = os.fstat(self._journal.fileno()).st_ino
+        self._journal_offset = 0
+        self._start_compaction()
+
+    def _compact(self):
+        """Merge <journal>.old into the snapshot while holding the compaction lock."""
+        try:
+            with open(self.compact_lock_path, "a") as compact_lock:
+                fcntl.flock(compact_lock, fcntl.LOCK_EX)
+                if not os.path.exists(self.old_journal_path):
+                    return  # Another process finished it first
+                try:
+                    profiles = read_snapshot(self.path)
+                except FileNotFoundError:
+                    profiles = {}
+                replay_journal(profiles, self.old_journal_path)
+
+                temp_path = self.path + ".tmp"
+                with open(temp_path, "w") as file:
+                    write_snapshot(profiles, file)
+                    file.flush()
+                    os.fsync(file.fileno())
+                with self._exclusive():
+                    os.remove(self.old_journal_path)
+                    os.replace(temp_path, self.path)
+                fsync_directory(self.path)
+        except (OSError, json.JSONDecodeError):
+            pass  # The old journal stays in place and is merged later
+        finally:
+            with self._io_lock:
+                self._compactor = None
+
+    def compact(self):
+        """Fold the whole journal into the snapshot now and wait for it to finish."""
+        self._wait_for_compaction()
+        with self._exclusive():
+            if os.path.exists(self.old_journal_path):
+                self._schedule_compaction()  # Retry a failed merge before rotating again
+        self._wait_for_compaction()
+        with self._exclusive():
+            self._catch_up()
+            if self._journal_offset > 0:
+                self._schedule_compaction()
+        self._wait_for_compaction()
+
+    def close(self):
+        super().close()
+        self._lock_file.close()
+
+
+class SQLiteProfileStore:
+    """
+    Profile store backed by an SQLite database.
+
+    Exposes the same dictionary-like interface as JournalProfileStore, but
+    profiles are read from disk on demand, so startup time and memory stay
+    flat however many players are registered. The ranked stats are indexed,
+    which makes leaderboard() a short index walk instead of a full scan.
+    """
+
+    COLUMNS = ("games_played", "games_won", "games_lost", "best_score", "total_score",
+               "favorite_category", "last_played", "highest_streak", "current_streak")
+
+    def __init__(self, path=PROFILES_DB, import_from=PROFILES_FILE):
+        """Open (or create) the database; a new database imports import_from if it exists."""
+        self.path = path
+        is_new = not os.path.exists(path)
+        import sqlite3  # Only this store needs it, so the others start without loading it
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._create_schema()
+        self.load_status = "loaded" if len(self) else "missing"
+        if is_new and import_from and os.path.exists(import_from):
+            self.import_json(import_from)
+
+    def _create_schema(self):
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    name TEXT PRIMARY KEY,
+                    games_played INTEGER NOT NULL DEFAULT 0,
+                    games_won INTEGER NOT NULL DEFAULT 0,
+                    games_lost INTEGER NOT NULL DEFAULT 0,
+                    best_score INTEGER NOT NULL DEFAULT 0,
+                    total_score INTEGER NOT NULL DEFAULT 0,
+                    favorite_category TEXT NOT NULL DEFAULT '',
+                    last_played TEXT NOT NULL DEFAULT '',
+                    highest_streak INTEGER NOT NULL DEFAULT 0,
+                    current_streak INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS category_counts (
+                    name TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (name, category)
+                );
+                CREATE INDEX IF NOT EXISTS profiles_best_score ON profiles(best_score);
+                CREATE INDEX IF NOT EXISTS profiles_highest_streak ON profiles(highest_streak);
+                CREATE INDEX IF NOT EXISTS profiles_games_played ON profiles(games_played);
+                CREATE INDEX IF NOT EXISTS profiles_win_rate
+                    ON profiles(CAST(games_won AS REAL) / games_played) WHERE games_played > 0;
+            """)
+
+    def import_json(self, path):
+        """Copy every profile from a hangman_profiles.json style file into the database."""
+        try:
+            with open(path, "r") as file:
+                profiles = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        with self._lock, self.conn:
+            for name, data in profiles.items():
+                self._write(name, PlayerProfile.from_dict(data))
+        self.load_status = "loaded" if profiles else self.load_status
+
+    def _write(self, name, profile):
+        """Insert or replace one profile and its category counts (lock held)."""
+        values = [getattr(profile, column) for column in self.COLUMNS]
+        self.conn.execute(
+            f"INSERT INTO profiles (name, {', '.join(self.COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' * len(self.COLUMNS))}) "
+            f"ON CONFLICT(name) DO UPDATE SET "
+            f"{', '.join(column + ' = excluded.' + column for column in self.COLUMNS)}",
+            [name] + values)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO category_counts (name, category, count) VALUES (?, ?, ?)",
+            [(name, category, count) for category, count in profile.counts_by_category().items()])
+
+    def _read(self, name):
+        """Fetch one profile as a PlayerProfile, or None (lock held)."""
+        row = self.conn.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM profiles WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        data = dict(zip(self.COLUMNS, row))
+        data["category_counts"] = dict(self.conn.execute(
+            "SELECT category, count FROM category_counts WHERE name = ?", (name,)))
+        return PlayerProfile.from_dict(data)
+
+    # Read access -----------------------------------------------------------
+
+    def __contains__(self, name):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM profiles WHERE name = ?", (name,)).fetchone() is not None
+
+    def __getitem__(self, name):
+        profile = self.get(name)
+        if profile is None:
+            raise KeyError(name)
+        return profile
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT name FROM profiles ORDER BY rowid")]
+
+    def get(self, name, default=None):
+        with self._lock:
+            profile = self._read(name)
+        return default if profile is None else profile
+
+    def leaderboard(self, field="best_score", limit=10):
+        """Return the top (name, value) pairs for one of LEADERBOARD_FIELDS."""
+        if field not in LEADERBOARD_FIELDS:
+            raise ValueError(f"Unknown leaderboard field: {field}")
+        if field == "win_rate":
+            query = ("SELECT name, CAST(games_won AS REAL) / games_played AS value FROM profiles "
+                     "WHERE games_played > 0 ORDER BY value DESC, name DESC LIMIT ?")
+        else:
+            query = f"SELECT name, {field} FROM profiles ORDER BY {field} DESC, name DESC LIMIT ?"
+        with self._lock:
+            return [tuple(row) for row in self.conn.execute(query, (limit,))]
+
+    # Changes ---------------------------------------------------------------
+
+    def create(self, name):
+        """Create an empty profile for name if it does not exist yet."""
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO profiles (name) VALUES (?)", (name,))
+
+    def record_game(self, name, won, score, category, played_at=None):
+        """Add the result of one game to the statistics of name."""
+        if played_at is None:
+            played_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self.conn:
+            profile = self._read(name)
+            if profile is not None:
+                profile.add_game(won, score, category, played_at)
+                self._write(name, profile)
+
+    def delete(self, name):
+        """Remove the profile of name."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM category_counts WHERE name = ?", (name,))
+            self.conn.execute("DELETE FROM profiles WHERE name = ?", (name,))
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.conn.close()
+
+
+class RecordProfileStore:
+    """
+    Profile store that parses profiles on demand from a record file.
+
+    Every change appends the player's whole profile as one JSON line to
+    <records>; a deletion appends a tombstone. <records>.idx holds the names
+    and the offset and length of each name's latest line as packed arrays,
+    and is all that is read on startup: opening the store costs a few
+    milliseconds per hundred thousand players and does not depend on how
+    large the profiles are. A profile is read with one seek the first time
+    it is needed and kept in a small cache.
+
+    The index records the size of the record file it describes. Lines
+    appended after it was written (for example before a crash) are scanned
+    on open; a missing or damaged index is rebuilt from the whole file.
+    Superseded lines are dropped when the store is closed, once they take up
+    more than half of the file.
+    """
+
+    def __init__(self, path=PROFILES_RECORDS, import_from=PROFILES_FILE, compact_bytes=JOURNAL_COMPACT_BYTES):
+        """Open (or create) the record file; a new file imports import_from if it exists."""
+        self.path = path
+        self.index_path = path + ".idx"
+        self.compact_bytes = compact_bytes
+        self.slots = {}  # name -> slot in offsets and lengths
+        self.offsets = array("Q")  # slot -> offset of the latest record
+        self.lengths = array("I")  # slot -> length of the latest record
+        self.dead_bytes = 0  # Bytes of superseded records and tombstones
+        self._cache = {}  # name -> PlayerProfile, oldest first
+        self._lock = threading.Lock()
+        self._closed = False
+
+        is_new = not os.path.exists(path)
+        self._file = open(path, "a+b")
+        self._load_index()
+        self.load_status = "loaded" if self.slots else "missing"
+        if is_new and import_from and os.path.exists(import_from):
+            self.import_json(import_from)
+        atexit.register(self.close)
+
+    # Index -----------------------------------------------------------------
+
+    def _load_index(self):
+        """Read the index and bring it up to date with the record file."""
+        size = os.fstat(self._file.fileno()).st_size
+        indexed_size = 0
+        try:
+            with open(self.index_path, "rb") as file:
+                header = json.loads(file.readline())
+                count = header["count"]
+                offsets = array("Q", file.read(8 * count))
+                lengths = array("I", file.read(4 * count))
+                names = file.read().decode("utf-8").split("\n") if count else []
+            if len(offsets) == len(lengths) == len(names) == count and header["size"] <= size:
+                self.slots = dict(zip(names, range(count)))
+                self.offsets, self.lengths = offsets, lengths
+                self.dead_bytes = header["dead"]
+                indexed_size = header["size"]
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass  # Rebuilt from the record file below
+        if indexed_size < size:
+            self._scan(indexed_size)
+        self._size = self._file.seek(0, os.SEEK_END)  # Where the next record goes
+
+    def _scan(self, start):
+        """Index the records from offset start to the end of the file."""
+        self._file.seek(start)
+        offset = start
+        for line in self._file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            if record is None or not line.endswith(b"\n"):
+                # A record torn by a crash mid-append; nothing after it is valid
+                self._file.truncate(offset)
+                break
+            self._point(record["name"], None if record.get("deleted") else offset, len(line))
+            offset += len(line)
+
+    def _point(self, name, offset, length):
+        """Make the record at offset the latest one of name; None marks a deletion."""
+        slot = self.slots.get(name)
+        if slot is not None:
+            self.dead_bytes += self.lengths[slot]
+        if offset is None:
+            self.dead_bytes += length
+            if slot is not None:
+                del self.slots[name]
+        elif slot is None:
+            self.slots[name] = len(self.offsets)
+            self.offsets.append(offset)
+            self.lengths.append(length)
+        else:
+            self.offsets[slot] = offset
+            self.lengths[slot] = length
+
+    def _write_index(self):
+        """Save the index atomically, stamped with the record file size (lock held)."""
+        names = list(self.slots)
+        slots = list(self.slots.values())
+        header = {"size": self._size, "count": len(names), "dead": self.dead_bytes}
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(json.dumps(header).encode("utf-8") + b"\n")
+            file.write(array("Q", [self.offsets[slot] for slot in slots]).tobytes())
+            file.write(array("I", [self.lengths[slot] for slot in slots]).tobytes())
+            file.write("\n".join(names).encode("utf-8"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.index_path)
+
+    # Records ---------------------------------------------------------------
+
+    def _parse(self, name):
+        """Read and parse the latest record of name (lock held)."""
+        slot = self.slots[name]
+        self._file.seek(self.offsets[slot])
+        return PlayerProfile.from_dict(json.loads(self._file.read(self.lengths[slot]))["profile"])
+
+    def _read(self, name):
+        """Return the PlayerProfile of name, or None (lock held)."""
+        profile = self._cache.get(name)
+        if profile is None and name in self.slots:
+            profile = self._parse(name)
+            self._remember(name, profile)
+        return profile
+
+    def _remember(self, name, profile):
+        self._cache[name] = profile
+        if len(self._cache) > RECORD_CACHE_SIZE:
+            # Every change is already on disk, so the oldest entry can simply go
+            del self._cache[next(iter(self._cache))]
+
+    def _append(self, name, record, sync=True):
+        """Append one record and point the index at it (lock held)."""
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        offset = self._size
+        self._file.write(line)
+        self._size += len(line)
+        if sync:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._point(name, None if record.get("deleted") else offset, len(line))
+
+    def _save(self, name, profile):
+        self._append(name, {"name": name, "profile": profile.to_dict()})
+        self._remember(name, profile)
+
+    def import_json(self, path):
+        """Copy every profile from a hangman_profiles.json snapshot and its journal."""
+        try:
+            profiles = read_snapshot(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            profiles = {}
+        replay_journal(profiles, path + ".journal")
+        with self._lock:
+            for name, profile in profiles.items():
+                self._append(name, {"name": name, "profile": profile.to_dict()}, sync=False)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.load_status = "loaded" if self.slots else self.load_status
+
+    # Read access -----------------------------------------------------------
+
+    def __contains__(self, name):
+        return name in self.slots
+
+    def __getitem__(self, name):
+        profile = self.get(name)
+        if profile is None:
+            raise KeyError(name)
+        return profile
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __iter__(self):
+        return iter(list(self.slots))
+
+    def keys(self):
+        return list(self.slots)
+
+    def get(self, name, default=None):
+        with self._lock:
+            profile = self._read(name)
+        return default if profile is None else profile
+
+    def leaderboard(self, field="best_score", limit=10):
+        """Return the top (name, value) pairs for one of LEADERBOARD_FIELDS (reads every record)."""
+        if field not in LEADERBOARD_FIELDS:
+            raise ValueError(f"Unknown leaderboard field: {field}")
+        ranked = []
+        with self._lock:
+            for name in self.slots:
+                # Parse without caching so a full scan does not flush the cache
+                profile = self._cache.get(name) or self._parse(name)
+                if field != "win_rate" or profile.games_played > 0:
+                    ranked.append((getattr(profile, field), name))
+        return [(name, value) for value, name in heapq.nlargest(limit, ranked)]
+
+    # Changes ---------------------------------------------------------------
+
+    def create(self, name):
+        """Create an empty profile for name if it does not exist yet."""
+        with self._lock:
+            if name not in self.slots:
+                self._save(name, PlayerProfile())
+
+    def record_game(self, name, won, score, category, played_at=None):
+        """Add the result of one game to the statistics of name."""
+        if played_at is None:
+            played_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            profile = self._read(name)
+            if profile is not None:
+                profile.add_game(won, score, category, played_at)
+                self._save(name, profile)
+
+    def delete(self, name):
+        """Remove the profile of name."""
+        with self._lock:
+            if name in self.slots:
+                self._append(name, {"name": name, "deleted": True})
+                self._cache.pop(name, None)
+
+    # Maintenance -----------------------------------------------------------
+
+    def compact(self):
+        """Rewrite the record file with only the latest record of each profile."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the record file without superseded records (lock held)."""
+        temp_path = self.path + ".tmp"
+        names = sorted(self.slots, key=lambda name: self.offsets[self.slots[name]])
+        offsets = array("Q")
+        lengths = array("I")
+        with open(temp_path, "wb") as file:
+            for name in names:
+                slot = self.slots[name]
+                self._file.seek(self.offsets[slot])
+                offsets.append(file.tell())
+                lengths.append(self.lengths[slot])
+                file.write(self._file.read(self.lengths[slot]))
+            file.flush()
+            os.fsync(file.fileno())
+        # Without an index the next open rescans, so a crash in between is harmless
+        try:
+            os.remove(self.index_path)
+        except FileNotFoundError:
+            pass
+        self._file.close()
+        os.replace(temp_path, self.path)
+        fsync_directory(self.path)
+        self._file = open(self.path, "a+b")
+        self._size = sum(lengths)
+        self.slots = dict(zip(names, range(len(names))))
+        self.offsets, self.lengths = offsets, lengths
+        self.dead_bytes = 0
+
+    def close(self):
+        """Drop superseded records if they dominate the file and save the index."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            atexit.unregister(self.close)
+            self._file.flush()
+            if self._size >= self.compact_bytes and self.dead_bytes * 2 > self._size:
+                self._compact()
+            self._write_index()
+            self._file.close()
+
+
+PROFILE_BACKENDS = ("journal", "shared", "sqlite", "records")
+
+
+def open_profile_store(backend="journal"):
+    """Open the profile store for one of PROFILE_BACKENDS."""
+    if backend == "sqlite":
+        return SQLiteProfileStore()
+    if backend == "records":
+        return RecordProfileStore()
+    if backend == "shared":
+        return SharedJournalProfileStore()
+    if backend == "journal":
+        return JournalProfileStore()
+    raise ValueError(f"Unknown profile backend: {backend}")
@@ -0,0 +1,83 @@
+"""
+Terminal rendering for Hangman without spawning a shell.
+
+FrameRenderer draws a screen as a list of lines. The first frame after a
+clear is written in full; later frames only rewrite the lines that changed,
+using ANSI cursor positioning, and every frame goes out in a single write.
+When the output is not a terminal the frame is simply printed.
+
+A frame is only diffed while it and the rows reserved for the prompts and
+messages printed below it fit the terminal: once the screen scrolls, the
+rows on screen no longer match the frame's rows.
+"""
+import os
+import shutil
+import sys
+
+CSI = "\x1b["
+HOME_AND_CLEAR = CSI + "H" + CSI + "2J"
+
+
+def enable_windows_ansi():
+    """Turn on ANSI escape processing for the Windows console (a no-op elsewhere)."""
+    if os.name != "nt":
+        return
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError):
+        pass
+
+
+class FrameRenderer:
+    """Draws full-screen frames, rewriting only the lines that changed."""
+
+    def __init__(self, stream=None, reserved=0):
+        """reserved is the number of rows printed below a frame before the next one is drawn."""
+        self.stream = stream or sys.stdout
+        self.reserved = reserved
+        self.ansi = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.previous = None  # Lines currently on screen, None when unknown
+        if self.ansi:
+            enable_windows_ansi()
+
+    def clear(self):
+        """Clear the screen and forget the previous frame."""
+        self.previous = None
+        if self.ansi:
+            self.stream.write(HOME_AND_CLEAR)
+            self.stream.flush()
+
+    def render(self, text):
+        """
+        Draw a frame given as text (the same text print() would have shown).
+
+        The cursor is left on the line below the frame, ready for input.
+        """
+        lines = text.split("\n")
+        if not self.ansi:
+            self.stream.write(text + "\n")
+            self.stream.flush()
+            return
+
+        # Absolute cursor positions only work if nothing scrolls or wraps
+        size = shutil.get_terminal_size()
+        fits = len(lines) + self.reserved < size.lines and all(len(line) < size.columns for line in lines)
+
+        if self.previous is None or not fits:
+            out = [HOME_AND_CLEAR, text, "\n"]
+        else:
+            out = []
+            for row, line in enumerate(lines):
+                if row >= len(self.previous) or self.previous[row] != line:
+                    out.append(f"{CSI}{row + 1};1H{line}{CSI}K")
+            # Park the cursor below the frame and wipe old prompts and messages
+            out.append(f"{CSI}{len(lines) + 1};1H{CSI}J")
+
+        self.previous = lines if fits else None
+        self.stream.write("".join(out))
+        self.stream.flush()
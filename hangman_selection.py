@@ -0,0 +1,345 @@
+"""
+Word selection without repeats for Hangman.
+
+WordSelector keeps a shuffle bag for every player and every (category,
+difficulty) pair: each word of the bucket is drawn exactly once, in random
+order, before any word comes up again. A bag is not a shuffled copy of the
+bucket but a pseudorandom permutation of its positions (a small Feistel
+network with cycle walking), so its whole state is three integers - bucket
+size, seed and number of words drawn - whatever the size of the corpus, and
+every draw is O(1).
+
+The bag states are saved to a small JSON file, so the no-repeat guarantee
+survives restarts. Between saves, each draw appends the drawing player's bag
+as one JSON line to a journal next to the file, which is replayed on load and
+folded back into the file every BAG_JOURNAL_LIMIT draws.
+
+For adaptive play, words are also ranked by a numeric difficulty score in
+[0, 1]. Word ids are kept sorted by score, so drawing a word near a target
+difficulty is a pair of bisections, O(log n), instead of a filter over the
+corpus. target_difficulty() turns a player's results into that target.
+"""
+import json
+import os
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+
+from hangman_words import DIFFICULTIES
+
+BAGS_FILE = "hangman_bags.json"
+BAG_JOURNAL_LIMIT = 1000  # Journaled draws after which the bags file is rewritten
+
+# Adaptive difficulty
+ADAPTIVE_START = 0.5  # Target score for a player without results
+TARGET_WIN_RATE = 0.7  # Win rate the adaptive target steers players towards
+CONFIDENCE_GAMES = 10  # Games after which the win rate counts for half
+STREAK_STEP = 0.04  # Target change per game of the current winning streak (or last loss)
+MAX_STREAK_STEPS = 5
+ADAPTIVE_WIDTH = 0.05  # Words are drawn from target +- this score
+
+_MASK64 = (1 << 64) - 1
+_FEISTEL_ROUNDS = 4
+
+
+def _mix(value, seed, round_key):
+    """64-bit integer hash (splitmix64 finalizer) of a value, seed and round."""
+    x = (value * 0x9E3779B97F4A7C15 + seed + round_key * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def permute(position, size, seed):
+    """
+    Map position in [0, size) to its place in the seed's permutation of [0, size).
+
+    The Feistel network permutes the smallest even power-of-two domain that
+    holds size; values that land outside [0, size) are fed through again,
+    which takes fewer than four rounds on average.
+    """
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    half_mask = (1 << half_bits) - 1
+    value = position
+    while True:
+        left, right = value >> half_bits, value & half_mask
+        for round_key in range(_FEISTEL_ROUNDS):
+            left, right = right, left ^ (_mix(right, seed, round_key) & half_mask)
+        value = (left << half_bits) | right
+        if value < size:
+            return value
+
+
+def target_difficulty(profile):
+    """
+    Difficulty score to aim for with a player's next word (0 easiest, 1 hardest).
+
+    The target moves up while the player wins more than TARGET_WIN_RATE of
+    their games and down while they win fewer; the win rate is trusted more
+    as games add up. A winning streak pushes the target up a step per game,
+    and a game just lost pulls it down a step.
+    """
+    if profile is None or profile.games_played == 0:
+        return ADAPTIVE_START
+    confidence = profile.games_played / (profile.games_played + CONFIDENCE_GAMES)
+    target = ADAPTIVE_START + confidence * (profile.win_rate - TARGET_WIN_RATE)
+    if profile.current_streak:
+        target += STREAK_STEP * min(profile.current_streak, MAX_STREAK_STEPS)
+    else:
+        target -= STREAK_STEP
+    return min(max(target, 0.0), 1.0)
+
+
+def heuristic_scores(index):
+    """
+    Difficulty scores for an index that has not been classified.
+
+    Each difficulty level gets a third of the scale, and inside a level
+    longer words with more distinct letters rank higher.
+    """
+    scores = array("f")
+    offsets = index.offsets
+    buffer = index.buffer
+    for word_id, level in enumerate(index.word_difficulties):
+        word = buffer[offsets[word_id]:offsets[word_id + 1]]
+        spread = (min(len(set(word)), 13) / 13 + min(len(word), 15) / 15) / 2
+        scores.append((level + 0.999 * spread) / 3)
+    return scores
+
+
+class ShuffleBag:
+    """Draws every position of [0, size) once, in random order, then starts a new round."""
+
+    __slots__ = ("size", "seed", "drawn")
+
+    def __init__(self, size, seed, drawn=0):
+        self.size = size
+        self.seed = seed
+        self.drawn = drawn
+
+    def draw(self, rng=random):
+        """Return the next position of the bag."""
+        if self.drawn >= self.size:
+            # Every position has been drawn: refill with a fresh order
+            self.seed = rng.getrandbits(64)
+            self.drawn = 0
+        position = permute(self.drawn, self.size, self.seed)
+        self.drawn += 1
+        return position
+
+
+class WordSelector:
+    """
+    Draws words from a WordIndex with one shuffle bag per player and bucket.
+
+    With weighted=True (the default) the "random" category has a bag over
+    every word of the difficulty, so each category comes up in proportion
+    to its size. With weighted=False a category is picked with equal chance
+    first and the word comes from that category's own bag.
+
+    Bags are loaded from path on the first draw. With autosave, every draw
+    is journaled; otherwise call save(). close() saves and closes the journal.
+    """
+
+    def __init__(self, index, path=BAGS_FILE, rng=random, weighted=True, autosave=True):
+        self.index = index
+        self.path = path
+        self.rng = rng
+        self.weighted = weighted
+        self.autosave = autosave
+        self.bags = None  # player -> {"category/difficulty": ShuffleBag}, loaded on first use
+        self._bounds = {}  # difficulty id -> (index size, bucket keys, cumulative sizes)
+        self._ranked = {}  # category id or None -> (index size, sorted scores, word ids)
+        self._dirty = False
+        self._journal = None  # Journal file, opened on the first journaled draw
+        self._journaled = 0  # Draws in the journal
+        self._torn = False  # The journal ends in a line cut short by a crash
+
+    # Persistence -----------------------------------------------------------
+
+    @property
+    def journal_path(self):
+        return self.path + ".journal"
+
+    def load(self):
+        """Read the saved bag states and replay the journal (a missing or damaged file starts afresh)."""
+        self.bags = {}
+        self._journaled = 0
+        self._torn = False
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as file:
+                players = json.load(file)["players"]
+            for player, bags in players.items():
+                self.bags[player] = {key: ShuffleBag(*state) for key, state in bags.items()}
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, AttributeError):
+            self.bags = {}
+        try:
+            with open(self.journal_path, "r") as file:
+                for line in file:
+                    self._torn = not line.endswith("\n")
+                    try:
+                        player, key, size, seed, drawn = json.loads(line)
+                    except (json.JSONDecodeError, TypeError, ValueError):
+                        continue  # A line cut short by a crash
+                    # Each line holds the whole state of one bag, so the last one wins
+                    self.bags.setdefault(player, {})[key] = ShuffleBag(size, seed, drawn)
+                    self._journaled += 1
+        except FileNotFoundError:
+            pass
+        self._dirty = self._journaled > 0
+
+    def save(self):
+        """Write the bag states atomically, if anything changed."""
+        if self.bags is None or not self._dirty or self.path is None:
+            return
+        players = {player: {key: [bag.size, bag.seed, bag.drawn] for key, bag in bags.items()}
+                   for player, bags in self.bags.items()}
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"players": players}, file, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        self._dirty = False
+        # The file now holds every journaled draw; a crash before the journal
+        # is gone only replays bag states the file already has
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self._journaled = 0
+        self._torn = False
+
+    def close(self):
+        """Save the bags and close the journal."""
+        self.save()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _journal_bag(self, player, key, bag):
+        """Append one bag's state to the journal; no fsync, as it only guards against restarts."""
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a")
+            if self._torn:
+                self._journal.write("\n")  # Keep the next line apart from the torn one
+                self._torn = False
+        self._journal.write(json.dumps([player, key, bag.size, bag.seed, bag.drawn], separators=(",", ":")) + "\n")
+        self._journal.flush()
+        self._journaled += 1
+        if self._journaled >= BAG_JOURNAL_LIMIT:
+            self.save()
+
+    # Drawing ---------------------------------------------------------------
+
+    def _bag(self, player, key, size):
+        """Return the player's bag for a bucket, starting a new one if the bucket changed."""
+        if self.bags is None:
+            self.load()
+        bags = self.bags.setdefault(player, {})
+        bag = bags.get(key)
+        if bag is None or bag.size != size:
+            # New bucket, or a different word list than the bag was drawn from
+            bag = bags[key] = ShuffleBag(size, self.rng.getrandbits(64))
+        return bag
+
+    def _difficulty_bounds(self, difficulty_id):
+        """Bucket keys of a difficulty and the running total of their sizes."""
+        cached = self._bounds.get(difficulty_id)
+        if cached is not None and cached[0] == len(self.index):
+            return cached[1], cached[2]
+        keys = list(self.index.difficulty_buckets[difficulty_id])
+        bounds = []
+        total = 0
+        for key in keys:
+            total += len(self.index.buckets[key])
+            bounds.append(total)
+        self._bounds[difficulty_id] = (len(self.index), keys, bounds)
+        return keys, bounds
+
+    def draw_id(self, player, category="random", difficulty="medium"):
+        """Return the next word id for a player, category and difficulty."""
+        index = self.index
+        difficulty_id = DIFFICULTIES.index(difficulty)
+        if category == "random":
+            keys, bounds = self._difficulty_bounds(difficulty_id)
+            if not keys:
+                raise LookupError(f"No {difficulty} words available")
+            if self.weighted:
+                key = f"random/{difficulty}"
+                bag = self._bag(player, key, bounds[-1])
+                position = bag.draw(self.rng)
+                # Position in the concatenation of the difficulty's buckets
+                i = bisect_right(bounds, position)
+                ids = index.buckets[keys[i]]
+                word_id = ids[position - (bounds[i - 1] if i else 0)]
+                self._drawn(player, key, bag)
+                return word_id
+            category = index.category_names[self.rng.choice(keys)[0]]
+
+        ids = index.bucket(category, difficulty)
+        if not ids:
+            raise LookupError(f"No {difficulty} words in category {category!r}")
+        key = f"{category}/{difficulty}"
+        bag = self._bag(player, key, len(ids))
+        word_id = ids[bag.draw(self.rng)]
+        self._drawn(player, key, bag)
+        return word_id
+
+    def draw(self, player, category="random", difficulty="medium"):
+        """Return the next word for a player, category and difficulty."""
+        return self.index.word(self.draw_id(player, category, difficulty))
+
+    def _drawn(self, player, key, bag):
+        self._dirty = True
+        if self.autosave and self.path is not None:
+            self._journal_bag(player, key, bag)
+
+    # Adaptive difficulty ---------------------------------------------------
+
+    def _ranking(self, category_id):
+        """Scores in ascending order and the matching word ids, for one category or all."""
+        cached = self._ranked.get(category_id)
+        if cached is not None and cached[0] == len(self.index):
+            return cached[1], cached[2]
+        index = self.index
+        scores = index.word_scores
+        if scores is None or len(scores) != len(index):
+            scores = heuristic_scores(index)
+        order = sorted(range(len(index)), key=scores.__getitem__)
+        if category_id is not None:
+            categories = index.word_categories
+            order = [word_id for word_id in order if categories[word_id] == category_id]
+        ids = array("I", order)
+        ranked = array("f", [scores[word_id] for word_id in order])
+        self._ranked[category_id] = (len(index), ranked, ids)
+        return ranked, ids
+
+    def draw_near_id(self, target, category="random", width=ADAPTIVE_WIDTH):
+        """
+        Return the id of a random word whose score is within width of target.
+
+        When no word is that close, the word with the nearest score is used.
+        """
+        if category == "random":
+            category_id = None
+        else:
+            category_id = self.index.category_ids.get(category)
+            if category_id is None:
+                raise LookupError(f"No words in category {category!r}")
+        scores, ids = self._ranking(category_id)
+        if not ids:
+            raise LookupError("No words available")
+        low = bisect_left(scores, target - width)
+        high = bisect_right(scores, target + width)
+        if low < high:
+            return ids[self.rng.randrange(low, high)]
+        # Nothing in range: take the closer of the neighbours around target
+        if low == len(ids) or (low > 0 and target - scores[low - 1] <= scores[low] - target):
+            low -= 1
+        return ids[low]
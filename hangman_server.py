@@ -0,0 +1,441 @@
+"""
+Asyncio multiplayer Hangman server.
+
+Every TCP connection gets its own HangmanSession backed by HangmanEngine,
+while all sessions share one word index, one word selector and one profile
+store. Sessions are plain objects driven by the event loop, so thousands of
+idle players cost a few kilobytes each, with no blocking sleeps. Profile
+writes, which fsync or commit with most backends, run in order on one
+background thread; a session waits for its own last write before its next
+command, so STATS always includes the game just finished.
+
+Protocol: the client sends one command per line and receives exactly one
+JSON object per line in reply.
+
+    HELLO <name>                  select or create a player profile; a game
+                                  the player left unfinished is resumed
+    CATEGORY <name>|random        choose the word category
+    DIFFICULTY easy|medium|hard|adaptive
+                                  choose the difficulty; adaptive follows
+                                  the player's results
+    NEW                           start a new game
+    GUESS <letter>                guess a letter
+    HINT [random|rarest|most_positions]
+                                  reveal a letter (costs score); the
+                                  default strategy is random
+    STATE                         show the current game
+    STATS                         show the player's statistics
+    QUIT                          close the connection
+
+Every reply has "ok" (true/false); errors carry an "error" message.
+
+Games of players who said HELLO are checkpointed after every move and the
+checkpoints are written to disk every second, so a restarted server picks
+up where its players left off.
+
+Usage:
+    python hangman_server.py serve --port 5050
+    python hangman_server.py client --port 5050
+    python hangman_server.py bots --port 5050 --clients 1000 --games 3
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hangman_checkpoint import SERVER_CHECKPOINT_FILE, CheckpointStore, restore_game
+from hangman_engine import HangmanEngine, HINT_STRATEGIES, REVEALED
+from hangman_events import EVENTS_FILE, GameEventLog
+from hangman_metrics import GameMetrics, MetricsExporter
+from hangman_profiles import PROFILE_BACKENDS, open_profile_store
+from hangman_selection import WordSelector, target_difficulty
+from hangman_solver import HangmanSolver
+from hangman_words import WORD_CATEGORIES, DIFFICULTIES, WordIndex
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5050
+CHECKPOINT_INTERVAL = 1.0  # Seconds between writes of the session checkpoints
+
+
+class HangmanSession:
+    """Game state and command handling for one connected player."""
+
+    def __init__(self, word_index, profiles, selector, event_log=None, metrics=None, checkpoints=None,
+                 profile_writer=None):
+        self.word_index = word_index
+        self.profiles = profiles
+        # Executor for profile writes, or None to write inline (outside an event loop)
+        self.profile_writer = profile_writer
+        self.pending_write = None  # Future of the last queued profile write
+        self.has_profile = False  # The player said HELLO, so their games go to their profile
+        self.selector = selector
+        self.event_log = event_log
+        self.metrics = metrics
+        self.checkpoints = checkpoints
+        self.engine = HangmanEngine()
+        self.player = "Guest"
+        self.category = "random"
+        self.difficulty = "medium"
+        self.word_id = None
+        self.in_game = False
+
+    def handle(self, line):
+        """Run one command line and return the reply dictionary."""
+        command, _, argument = line.strip().partition(" ")
+        handler = getattr(self, "cmd_" + command.lower(), None)
+        if handler is None:
+            return self.error(f"Unknown command: {command}")
+        return handler(argument.strip())
+
+    @staticmethod
+    def error(message):
+        return {"ok": False, "error": message}
+
+    def state(self, **extra):
+        """Reply describing the current game."""
+        engine = self.engine
+        reply = {
+            "ok": True,
+            "word": "".join(engine.word_display),
+            "guessed": "".join(engine.guessed_letters),
+            "remaining": engine.remaining_attempts,
+            "score": engine.score,
+            "hints": engine.hints_used,
+            "over": engine.game_over,
+            "won": engine.game_won,
+        }
+        if engine.game_over:
+            reply["answer"] = engine.word_to_guess
+        reply.update(extra)
+        return reply
+
+    def write_profile(self, method, *args):
+        """Run a profile store write on the writer thread, or inline without one."""
+        if self.profile_writer is None:
+            method(*args)
+        else:
+            self.pending_write = asyncio.get_running_loop().run_in_executor(self.profile_writer, method, *args)
+
+    def checkpoint(self):
+        """Checkpoint the game in progress of a player with a profile."""
+        if self.checkpoints is not None and self.has_profile:
+            self.checkpoints.save(self.player, self.engine, self.word_id, self.category)
+
+    def finish_game(self):
+        """Record a finished game in the shared profile store and event log."""
+        self.in_game = False
+        if self.has_profile:
+            self.write_profile(self.profiles.record_game, self.player, self.engine.game_won, self.engine.score,
+                               self.category)
+            if self.checkpoints is not None:
+                self.checkpoints.discard(self.player)
+        if self.event_log is not None:
+            self.event_log.record_game(self.engine, self.player, self.category)
+        if self.metrics is not None:
+            self.metrics.game_finished(self.engine.game_won)
+
+    # Commands --------------------------------------------------------------
+
+    def cmd_hello(self, name):
+        if not name:
+            return self.error("Usage: HELLO <name>")
+        existing = name in self.profiles  # The only membership check of the session
+        if not existing:
+            self.write_profile(self.profiles.create, name)
+        self.player = name
+        self.has_profile = True
+        resumed = False
+        if existing and not self.in_game and self.checkpoints is not None:
+            checkpoint = self.checkpoints.get(name)
+            if checkpoint is not None:
+                restore_game(self.engine, checkpoint, self.word_index)
+                self.word_id = checkpoint.word_id
+                self.category = checkpoint.category
+                self.in_game = resumed = True
+        return {"ok": True, "player": name, "new": not existing, "resumed": resumed}
+
+    def cmd_category(self, category):
+        category = category.lower()
+        if category != "random" and category not in self.word_index.category_ids:
+            return self.error(f"Unknown category: {category}")
+        self.category = category
+        return {"ok": True, "category": category}
+
+    def cmd_difficulty(self, difficulty):
+        difficulty = difficulty.lower()
+        if difficulty not in DIFFICULTIES and difficulty != "adaptive":
+            return self.error(f"Unknown difficulty: {difficulty}")
+        self.difficulty = difficulty
+        return {"ok": True, "difficulty": difficulty}
+
+    def cmd_new(self, _):
+        try:
+            if self.difficulty == "adaptive":
+                target = target_difficulty(self.profiles.get(self.player))
+                word_id = self.selector.draw_near_id(target, self.category)
+                difficulty = self.word_index.difficulty_of(word_id)
+            else:
+                word_id = self.selector.draw_id(self.player, self.category, self.difficulty)
+                difficulty = self.difficulty
+        except LookupError as e:
+            return self.error(str(e))
+        if self.in_game and self.checkpoints is not None and self.has_profile:
+            self.checkpoints.discard(self.player)  # The unfinished game is abandoned
+        self.word_id = word_id
+        self.engine.new_game(self.word_index.word(word_id), difficulty)
+        self.in_game = True
+        return self.state()
+
+    def cmd_guess(self, letter):
+        if not self.in_game:
+            return self.error("No game in progress; send NEW")
+        moves = len(self.engine.moves)
+        result = self.engine.guess(letter)
+        if result.game_over:
+            self.finish_game()
+        elif len(self.engine.moves) != moves:
+            self.checkpoint()
+        return self.state(outcome=result.outcome, letter=result.letter)
+
+    def cmd_hint(self, strategy):
+        if not self.in_game:
+            return self.error("No game in progress; send NEW")
+        strategy = strategy.lower() or None
+        if strategy is not None and strategy not in HINT_STRATEGIES:
+            return self.error(f"Unknown hint strategy: {strategy}")
+        result = self.engine.hint(strategy=strategy)
+        if result.outcome != REVEALED:
+            return self.error("No hint available")
+        if result.game_over:
+            self.finish_game()
+        else:
+            self.checkpoint()
+        return self.state(outcome=result.outcome, letter=result.letter)
+
+    def cmd_state(self, _):
+        if not self.engine.word_to_guess:
+            return self.error("No game played yet; send NEW")
+        return self.state()
+
+    def cmd_stats(self, _):
+        profile = self.profiles.get(self.player)
+        if profile is None:
+            return self.error("No player profile; send HELLO <name>")
+        return {"ok": True, "player": self.player, "stats": profile.to_dict()}
+
+    def cmd_quit(self, _):
+        return {"ok": True, "bye": True}
+
+
+class HangmanServer:
+    """Accepts connections and runs one HangmanSession per client."""
+
+    def __init__(self, word_index, profiles, host=DEFAULT_HOST, port=DEFAULT_PORT, selector=None, event_log=None,
+                 metrics=None, checkpoints=None):
+        self.word_index = word_index
+        self.profiles = profiles
+        self.event_log = event_log  # Shared GameEventLog, or None to log nothing
+        self.metrics = metrics  # GameMetrics, or None to measure nothing
+        # Shared CheckpointStore without autosave, written every CHECKPOINT_INTERVAL; None to keep none
+        self.checkpoints = checkpoints
+        # Shuffle bags are saved on shutdown rather than after every game
+        self.selector = selector if selector is not None else WordSelector(word_index, autosave=False)
+        # One thread keeps profile writes off the event loop and in the order they were made
+        self.profile_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-writer")
+        self.host = host
+        self.port = port
+        self.sessions = 0  # Number of connected clients
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        # Port 0 asks the OS for a free port; remember the one it chose
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        flusher = asyncio.create_task(self.flush_checkpoints()) if self.checkpoints is not None else None
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+
+    def close(self):
+        """Wait for the queued profile writes; call before closing the profile store."""
+        self.profile_writer.shutdown(wait=True)
+
+    async def flush_checkpoints(self):
+        """Write the checkpoints of all sessions in one batch every CHECKPOINT_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL)
+            self.checkpoints.flush()
+
+    async def handle_client(self, reader, writer):
+        session = HangmanSession(self.word_index, self.profiles, self.selector, self.event_log, self.metrics,
+                                 self.checkpoints, self.profile_writer)
+        self.sessions += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode("utf-8", "replace")
+                if session.pending_write is not None:
+                    # Commands see the session's own profile changes
+                    await session.pending_write
+                    session.pending_write = None
+                if self.metrics is None:
+                    reply = session.handle(line)
+                else:
+                    start = time.perf_counter()
+                    reply = session.handle(line)
+                    command = line.strip().partition(" ")[0].lower()
+                    if not hasattr(session, "cmd_" + command):
+                        command = "unknown"
+                    self.metrics.command_seconds(command).observe(time.perf_counter() - start)
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+                if reply.get("bye"):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+
+class HangmanClient:
+    """Minimal asyncio client for the line protocol, for testing and bots."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def send(self, command):
+        """Send one command and return the decoded reply."""
+        self.writer.write(command.encode("utf-8") + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(line)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_bot(host, port, name, games, solver):
+    """Connect, play a number of games with the solver and return how many were won."""
+    client = await HangmanClient.connect(host, port)
+    session = solver.session()  # Bots share the solver's dictionary, but each follows its own game
+    wins = 0
+    try:
+        await client.send(f"HELLO {name}")
+        for _ in range(games):
+            state = await client.send("NEW")
+            session.reset()
+            while state["ok"] and not state["over"]:
+                display = list(state["word"])
+                letter = session.next_guess(display, state["guessed"])
+                state = await client.send(f"GUESS {letter}")
+            wins += state.get("won", False)
+        await client.send("QUIT")
+    finally:
+        await client.close()
+    return wins
+
+
+async def run_bots(host, port, clients, games, word_index):
+    """Play games from many concurrent bot connections."""
+    solver = HangmanSolver.from_index(word_index)
+    results = await asyncio.gather(*(run_bot(host, port, f"bot{i}", games, solver) for i in range(clients)))
+    print(f"{clients} bots played {clients * games} games and won {sum(results)}")
+
+
+async def run_client(host, port):
+    """Interactive line client: type protocol commands, see the JSON replies."""
+    client = await HangmanClient.connect(host, port)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            command = await loop.run_in_executor(None, input, "> ")
+            reply = await client.send(command)
+            print(json.dumps(reply))
+            if reply.get("bye"):
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hangman multiplayer server and test clients.")
+    parser.add_argument("mode", choices=["serve", "client", "bots"])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--words", action="append", metavar="FILE", help="word file to use instead of the built-in words")
+    parser.add_argument("--profile-backend", choices=PROFILE_BACKENDS, default="journal")
+    parser.add_argument("--event-log", default=EVENTS_FILE, help="binary log of finished games ('' to disable)")
+    parser.add_argument("--checkpoints", default=SERVER_CHECKPOINT_FILE,
+                        help="checkpoints of unfinished games, resumed after a restart ('' to disable)")
+    parser.add_argument("--metrics-file", metavar="FILE", help="write Prometheus metrics to FILE periodically")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT", help="serve Prometheus metrics on PORT")
+    parser.add_argument("--clients", type=int, default=100, help="bot connections (bots mode)")
+    parser.add_argument("--games", type=int, default=3, help="games per bot (bots mode)")
+    args = parser.parse_args()
+
+    word_index = WordIndex.from_files(args.words) if args.words else WordIndex.from_categories(WORD_CATEGORIES)
+
+    if args.mode == "client":
+        asyncio.run(run_client(args.host, args.port))
+    elif args.mode == "bots":
+        asyncio.run(run_bots(args.host, args.port, args.clients, args.games, word_index))
+    else:
+        profiles = open_profile_store(args.profile_backend)
+        event_log = GameEventLog(args.event_log) if args.event_log else None
+        checkpoints = None
+        if args.checkpoints:
+            checkpoints = CheckpointStore(word_index, args.checkpoints, autosave=False)
+            start = time.perf_counter()
+            restored = checkpoints.load()
+            if restored:
+                print(f"Restored {restored} unfinished games from {args.checkpoints} "
+                      f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        metrics = exporter = None
+        if args.metrics_file or args.metrics_port is not None:
+            metrics = GameMetrics()
+            metrics.instrument_profile_store(profiles)
+            exporter = MetricsExporter(metrics.registry, args.metrics_file, args.metrics_port, args.host)
+        server = HangmanServer(word_index, profiles, args.host, args.port, event_log=event_log, metrics=metrics,
+                               checkpoints=checkpoints)
+        print(f"Hangman server listening on {args.host}:{args.port}")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            server.selector.save()
+            if checkpoints is not None:
+                checkpoints.flush()
+            profiles.close()
+            if event_log is not None:
+                event_log.close()
+            if exporter is not None:
+                exporter.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Monte Carlo simulation of Hangman games for balancing scoring and difficulty.
+
+Plays large numbers of games through HangmanEngine with a configurable
+guessing strategy, spread over a multiprocessing pool. Work is cut into
+batches with their own deterministic seed, so a run is reproducible no matter
+how many workers execute it. Each batch returns compact aggregates that the
+parent merges as they arrive, so memory depends on the size of the word list,
+not on the number of games.
+
+With --event-log, every batch also writes its games to a binary event log
+(<prefix>-<seed>.log) for hangman_analytics.py to stream.
+
+Usage:
+    python hangman_simulate.py --games 1000000 --strategy frequency
+    python hangman_simulate.py --games 1000000 --event-log sim
+"""
+import argparse
+import json
+import os
+import random
+import time
+from array import array
+from multiprocessing import Pool
+
+from hangman_engine import ALPHABET, ENGLISH_ORDER, HINT_RANDOM, HINT_STRATEGIES, HangmanEngine, ManualClock
+from hangman_events import GameEventLog
+from hangman_solver import HangmanSolver
+from hangman_words import WORD_CATEGORIES, DIFFICULTIES, WordIndex
+
+STRATEGIES = ("frequency", "entropy", "english", "random")
+SCORE_BIN = 25  # Width of a score histogram bin
+SCORE_BINS = 160  # Scores of SCORE_BIN * SCORE_BINS and above share the last bin
+BATCH_GAMES = 10000
+
+_worker = None  # Per-process simulation state, set up by _init_worker
+
+
+class _Worker:
+    """Word index, solver and engine shared by every batch run in one process."""
+
+    def __init__(self, word_files, classify, strategy, seconds_per_move, hint_at, max_hints, event_log=None,
+                 hint_strategy=HINT_RANDOM):
+        self.index = WordIndex.from_files(word_files) if word_files else WordIndex.from_categories(WORD_CATEGORIES)
+        if classify:
+            from hangman_difficulty import classify_index
+            classify_index(self.index)
+        self.strategy = strategy
+        self.solver = HangmanSolver.from_index(self.index, strategy) if strategy in ("frequency", "entropy") else None
+        self.session = self.solver.session() if self.solver is not None else None
+        self.seconds_per_move = seconds_per_move
+        self.hint_at = hint_at
+        self.max_hints = max_hints
+        self.clock = ManualClock()  # Moves only when a simulated player acts
+        self.engine = HangmanEngine(clock=self.clock, hint_strategy=hint_strategy)
+        self.event_log = event_log  # Prefix of the per-batch event logs, or None
+        self.engine.record_moves = event_log is not None
+
+    def choose_letter(self, rng):
+        engine = self.engine
+        if self.session is not None:
+            return self.session.choose_letter(engine)
+        guessed = engine.guessed_mask
+        letters = [letter for i, letter in enumerate(ALPHABET) if not guessed >> i & 1]
+        if self.strategy == "random":
+            return rng.choice(letters)
+        return next(letter for letter in ENGLISH_ORDER if letter in letters)
+
+    def play(self, word_id, rng):
+        """Play one game of the given word and return the finished engine."""
+        engine = self.engine
+        engine.rng = rng  # Hints draw from the batch's seeded generator
+        engine.new_game(self.index.word(word_id), self.index.difficulty_of(word_id))
+        if self.session is not None:
+            self.session.reset()
+        while not engine.game_over:
+            self.clock.now += self.seconds_per_move
+            if engine.remaining_attempts <= self.hint_at and engine.hints_used < self.max_hints:
+                engine.hint()
+            else:
+                engine.guess(self.choose_letter(rng))
+        return engine
+
+    def run_batch(self, games, seed):
+        """Play a batch of games on uniformly drawn words and aggregate the results."""
+        rng = random.Random(seed)
+        log = None
+        if self.event_log is not None:
+            path = f"{self.event_log}-{seed}.log"
+            if os.path.exists(path):
+                os.remove(path)  # A rerun of the batch replaces its log
+            log = GameEventLog(path, max_bytes=1 << 62, shared=False)
+        groups = {}  # (category, difficulty) -> [games, wins, score sum, wrong sum, hints sum, histogram]
+        words = {}  # word id -> [games, losses]
+        word_count = len(self.index)
+        for _ in range(games):
+            word_id = rng.randrange(word_count)
+            engine = self.play(word_id, rng)
+            if log is not None:
+                log.record_game(engine, f"simulated-{self.strategy}", self.index.category_of(word_id))
+
+            key = (self.index.category_of(word_id), engine.difficulty)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = [0, 0, 0, 0, 0, [0] * SCORE_BINS]
+            group[0] += 1
+            group[1] += engine.game_won
+            group[2] += engine.score
+            group[3] += engine.current_incorrect_guesses
+            group[4] += engine.hints_used
+            group[5][min(engine.score // SCORE_BIN, SCORE_BINS - 1)] += 1
+
+            counts = words.get(word_id)
+            if counts is None:
+                counts = words[word_id] = [0, 0]
+            counts[0] += 1
+            counts[1] += not engine.game_won
+        if log is not None:
+            log.close()
+        return groups, words
+
+
+def _init_worker(*args):
+    global _worker
+    _worker = _Worker(*args)
+
+
+def _run_batch(task):
+    games, seed = task
+    return _worker.run_batch(games, seed)
+
+
+class SimulationStats:
+    """Running totals merged from batch results."""
+
+    def __init__(self, index):
+        self.index = index
+        self.groups = {}
+        self.word_games = array("I", bytes(4 * len(index)))
+        self.word_losses = array("I", bytes(4 * len(index)))
+        self.games = 0
+
+    def merge(self, batch):
+        groups, words = batch
+        for key, values in groups.items():
+            total = self.groups.get(key)
+            if total is None:
+                self.groups[key] = values[:5] + [list(values[5])]
+            else:
+                for i in range(5):
+                    total[i] += values[i]
+                total[5] = [a + b for a, b in zip(total[5], values[5])]
+            self.games += values[0]
+        for word_id, (games, losses) in words.items():
+            self.word_games[word_id] += games
+            self.word_losses[word_id] += losses
+
+    @staticmethod
+    def percentile(histogram, fraction):
+        """Approximate score percentile (lower edge of the bin) from a histogram."""
+        target = fraction * sum(histogram)
+        seen = 0
+        for i, count in enumerate(histogram):
+            seen += count
+            if seen >= target and count:
+                return i * SCORE_BIN
+        return 0
+
+    def summary(self, worst=10, min_games=20):
+        """Per category/difficulty totals and the words lost most often."""
+        groups = []
+        order = {difficulty: i for i, difficulty in enumerate(DIFFICULTIES)}
+        for (category, difficulty), values in sorted(self.groups.items(), key=lambda item: (item[0][0], order[item[0][1]])):
+            games, wins, score_sum, wrong_sum, hints_sum, histogram = values
+            groups.append({
+                "category": category,
+                "difficulty": difficulty,
+                "games": games,
+                "win_rate": wins / games,
+                "mean_score": score_sum / games,
+                "mean_wrong_guesses": wrong_sum / games,
+                "mean_hints": hints_sum / games,
+                "score_p10": self.percentile(histogram, 0.1),
+                "score_p50": self.percentile(histogram, 0.5),
+                "score_p90": self.percentile(histogram, 0.9),
+            })
+
+        failures = []
+        for word_id, games in enumerate(self.word_games):
+            if games >= min_games:
+                failures.append((self.word_losses[word_id] / games, games, word_id))
+        failures.sort(reverse=True)
+        words = [{
+            "word": self.index.word(word_id),
+            "category": self.index.category_of(word_id),
+            "difficulty": self.index.difficulty_of(word_id),
+            "games": games,
+            "failure_rate": rate,
+        } for rate, games, word_id in failures[:worst]]
+        return {"games": self.games, "groups": groups, "worst_words": words}
+
+
+def simulate(games, workers=None, seed=0, strategy="frequency", word_files=None, classify=False,
+             seconds_per_move=5.0, hint_at=0, max_hints=1, batch_games=BATCH_GAMES, progress=None, event_log=None,
+             hint_strategy=HINT_RANDOM):
+    """
+    Play games across a process pool and return the merged SimulationStats.
+
+    Batch i is always played with seed + i, so results only depend on the
+    arguments, not on the number of workers or their scheduling.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    worker_args = (word_files, classify, strategy, seconds_per_move, hint_at, max_hints, event_log, hint_strategy)
+    tasks = []
+    remaining = games
+    while remaining > 0:
+        size = min(batch_games, remaining)
+        tasks.append((size, seed + len(tasks)))
+        remaining -= size
+
+    # The parent only needs the index for names and per-word totals
+    index = WordIndex.from_files(word_files) if word_files else WordIndex.from_categories(WORD_CATEGORIES)
+    if classify:
+        from hangman_difficulty import classify_index
+        classify_index(index)
+    stats = SimulationStats(index)
+
+    if workers == 1:
+        _init_worker(*worker_args)
+        for batch in map(_run_batch, tasks):
+            stats.merge(batch)
+            if progress:
+                progress(stats.games, games)
+        return stats
+
+    with Pool(workers, initializer=_init_worker, initargs=worker_args) as pool:
+        for batch in pool.imap_unordered(_run_batch, tasks):
+            stats.merge(batch)
+            if progress:
+                progress(stats.games, games)
+    return stats
+
+
+def print_summary(summary):
+    print(f"\n{'=' * 86}")
+    print(f"  Simulated games: {summary['games']}")
+    print(f"{'=' * 86}")
+    print(f"  {'Category':<14}{'Difficulty':<12}{'Games':>9}{'Win rate':>10}{'Mean':>8}"
+          f"{'P10':>7}{'P50':>7}{'P90':>7}{'Wrong':>7}{'Hints':>7}")
+    for group in summary["groups"]:
+        print(f"  {group['category']:<14}{group['difficulty']:<12}{group['games']:>9}"
+              f"{group['win_rate'] * 100:>9.1f}%{group['mean_score']:>8.0f}"
+              f"{group['score_p10']:>7}{group['score_p50']:>7}{group['score_p90']:>7}"
+              f"{group['mean_wrong_guesses']:>7.2f}{group['mean_hints']:>7.2f}")
+    print("\n  Words lost most often:")
+    for word in summary["worst_words"]:
+        print(f"    {word['word']:<20}{word['category']:<14}{word['difficulty']:<8}"
+              f"{word['failure_rate'] * 100:>6.1f}% of {word['games']} games")
+    print(f"{'=' * 86}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Hangman games to balance scoring and difficulty.")
+    parser.add_argument("--games", type=int, default=100000, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="frequency", help="how simulated players guess")
+    parser.add_argument("--words", action="append", metavar="FILE", help="word file to use instead of the built-in words")
+    parser.add_argument("--classify", action="store_true", help="assign word difficulties automatically (needs NumPy)")
+    parser.add_argument("--seconds-per-move", type=float, default=5.0, help="simulated thinking time per move")
+    parser.add_argument("--hint-at", type=int, default=0, help="take a hint once this few attempts remain (0: never)")
+    parser.add_argument("--max-hints", type=int, default=1, help="maximum hints per game")
+    parser.add_argument("--hint-strategy", choices=HINT_STRATEGIES, default=HINT_RANDOM, help="letter a hint reveals")
+    parser.add_argument("--worst", type=int, default=10, help="number of most-failed words to list")
+    parser.add_argument("--json", metavar="FILE", help="also write the summary as JSON")
+    parser.add_argument("--event-log", metavar="PREFIX", help="write every game to <PREFIX>-<batch seed>.log")
+    args = parser.parse_args()
+
+    start = time.time()
+    stats = simulate(args.games, args.workers, args.seed, args.strategy, args.words, args.classify,
+                     args.seconds_per_move, args.hint_at, args.max_hints, event_log=args.event_log,
+                     hint_strategy=args.hint_strategy)
+    elapsed = time.time() - start
+    summary = stats.summary(args.worst)
+    print_summary(summary)
+    print(f"  {summary['games']} games in {elapsed:.1f}s ({summary['games'] / elapsed:,.0f} games/s)")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(summary, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
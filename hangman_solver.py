@@ -0,0 +1,252 @@
+"""
+Hangman solver and auto-player.
+
+HangmanSolver keeps its dictionary bucketed by word length. Inside a bucket
+every (position, character) pair has a bitset, stored as a Python int, with
+bit i set when word i has that character at that position. Narrowing the
+candidates after a reveal is then a handful of big-integer AND operations
+instead of a regex scan over the word list, which keeps a move well under a
+millisecond on dictionaries of a few hundred thousand words.
+"""
+import math
+
+from hangman_engine import ALPHABET
+
+STRATEGIES = ("frequency", "entropy")
+
+
+class _LengthBucket:
+    """Words of one length plus their per-position, per-letter and per-category bitsets."""
+
+    __slots__ = ("words", "all_mask", "position_masks", "letter_masks", "category_masks")
+
+    def __init__(self, words):
+        self.words = words
+        self.all_mask = (1 << len(words)) - 1
+        self.position_masks = []  # position -> {character: bitset}
+        self.letter_masks = {}  # character -> bitset of words containing it
+        self.category_masks = {}  # category -> bitset of its words, when built from a WordIndex
+
+        length = len(words[0])
+        for position in range(length):
+            # One byte per word; translate() marks matching words in C
+            column = bytes(word[position] for word in words)
+            masks = {}
+            for byte in set(column):
+                table = bytes(49 if i == byte else 48 for i in range(256))
+                masks[chr(byte)] = int(column.translate(table)[::-1], 2)
+            self.position_masks.append(masks)
+            for char, mask in masks.items():
+                self.letter_masks[char] = self.letter_masks.get(char, 0) | mask
+
+
+class HangmanSolver:
+    """
+    Picks the next letter to guess from the current word display.
+
+    After each reveal the candidate words are narrowed to those matching the
+    displayed pattern and none of the wrong letters, then the best unguessed
+    letter among the remaining candidates is chosen:
+
+    - "frequency": the letter contained in the most candidates
+    - "entropy": the letter whose present/absent split of the candidates
+      carries the most information
+    """
+
+    def __init__(self, words, strategy="frequency"):
+        """Index a dictionary of words (non-ASCII words are skipped)."""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown solver strategy: {strategy}")
+        self.strategy = strategy
+
+        by_length = {}
+        for word in words:
+            try:
+                encoded = word.lower().encode("ascii")
+            except UnicodeEncodeError:
+                continue
+            if encoded:
+                by_length.setdefault(len(encoded), {})[encoded] = None  # Ordered de-duplication
+        self.buckets = {length: _LengthBucket(list(group)) for length, group in by_length.items()}
+
+    @classmethod
+    def from_index(cls, index, strategy="frequency"):
+        """Build a solver over every word of a WordIndex, with a bitset of each category's words."""
+        solver = cls((index.word(word_id) for word_id in range(len(index))), strategy)
+        positions = {}  # word -> bucket position
+        for bucket in solver.buckets.values():
+            positions.update((word, i) for i, word in enumerate(bucket.words))
+        columns = {}  # (length, category id) -> one "0"/"1" byte per bucket word
+        for word_id, category_id in enumerate(index.word_categories):
+            try:
+                encoded = index.word(word_id).lower().encode("ascii")
+            except UnicodeEncodeError:
+                continue
+            if not encoded:
+                continue
+            column = columns.get((len(encoded), category_id))
+            if column is None:
+                column = columns[len(encoded), category_id] = bytearray(b"0" * len(solver.buckets[len(encoded)].words))
+            column[positions[encoded]] = 49
+        for (length, category_id), column in columns.items():
+            solver.buckets[length].category_masks[index.category_names[category_id]] = int(column[::-1], 2)
+        return solver
+
+    def session(self):
+        """A SolverSession to follow one game at a time, narrowing incrementally."""
+        return SolverSession(self)
+
+    # One-shot queries: each narrows from scratch, so the solver itself keeps
+    # no game state and can be shared by any number of games.
+
+    def candidates(self, display, guessed_letters):
+        """Return the dictionary words still consistent with the game so far."""
+        return self.session().candidates(display, guessed_letters)
+
+    def letter_counts(self, display, guessed_letters):
+        """Number of remaining candidates containing each unguessed letter."""
+        return self.session().letter_counts(display, guessed_letters)
+
+    def next_guess(self, display, guessed_letters):
+        """Return the best letter to guess next."""
+        return self.session().next_guess(display, guessed_letters)
+
+    def choose_letter(self, engine):
+        """Return the best next guess for a game running in a HangmanEngine."""
+        return self.session().choose_letter(engine)
+
+    def hint_letter(self, engine):
+        """Pick the hidden letter of the engine's word that is most useful to reveal."""
+        return self.session().hint_letter(engine)
+
+
+class SolverSession:
+    """
+    Narrowing state of the one game a solver is following.
+
+    Each move only applies the letters guessed since the previous call, so a
+    game costs one pass over its guesses in total. A session belongs to one
+    game at a time: call reset() when a new game starts (a shorter or longer
+    word, or a guess taken back, also starts over). Concurrent games need a
+    session each.
+    """
+
+    __slots__ = ("solver", "_bucket", "_length", "_applied", "_candidates")
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.reset()
+
+    def reset(self):
+        """Forget the game followed so far."""
+        self._bucket = None
+        self._length = None
+        self._applied = set()
+        self._candidates = 0
+
+    # Candidate filtering ---------------------------------------------------
+
+    def _narrow(self, display, guessed):
+        """Bring the candidate bitset up to date with the display and guessed letters."""
+        if self._length != len(display) or not self._applied <= guessed:
+            bucket = self._bucket = self.solver.buckets.get(len(display))
+            self._length = len(display)
+            self._applied = set()
+            self._candidates = 0
+            if bucket is not None:
+                self._candidates = bucket.all_mask
+                # Characters that are never guessed (spaces, hyphens) are shown from the start
+                for position, char in enumerate(display):
+                    if char != "_" and char not in ALPHABET:
+                        self._candidates &= bucket.position_masks[position].get(char, 0)
+        bucket = self._bucket
+        if bucket is None:
+            return None
+
+        candidates = self._candidates
+        for letter in guessed - self._applied:
+            if letter in display:
+                for position, char in enumerate(display):
+                    mask = bucket.position_masks[position].get(letter, 0)
+                    candidates &= mask if char == letter else ~mask
+            else:
+                candidates &= ~bucket.letter_masks.get(letter, 0)
+
+        self._applied = set(guessed)
+        self._candidates = candidates
+        return bucket
+
+    def candidates(self, display, guessed_letters):
+        """Return the dictionary words still consistent with the game so far."""
+        bucket = self._narrow(display, set(guessed_letters))
+        if bucket is None:
+            return []
+        mask = self._candidates
+        words = []
+        while mask:
+            low = mask & -mask
+            words.append(bucket.words[low.bit_length() - 1].decode("ascii"))
+            mask ^= low
+        return words
+
+    def letter_counts(self, display, guessed_letters):
+        """Number of remaining candidates containing each unguessed letter."""
+        guessed = set(guessed_letters)
+        bucket = self._narrow(display, guessed)
+        if bucket is None:
+            return {}
+        candidates = self._candidates
+        return {letter: (candidates & bucket.letter_masks[letter]).bit_count()
+                for letter in ALPHABET if letter not in guessed and letter in bucket.letter_masks}
+
+    # Letter choice ---------------------------------------------------------
+
+    def next_guess(self, display, guessed_letters):
+        """Return the best letter to guess next."""
+        guessed = set(guessed_letters)
+        counts = self.letter_counts(display, guessed)
+        total = self._candidates.bit_count()
+        counts = {letter: count for letter, count in counts.items() if count}
+        if not counts or total == 0:
+            # Word not in the dictionary: fall back to plain English letter order
+            return next(letter for letter in "etaoinshrdlcumwfgypbvkjxqz" if letter not in guessed)
+
+        if self.solver.strategy == "entropy":
+            def score(letter):
+                p = counts[letter] / total
+                if p >= 1:
+                    return 0.0
+                return -(p * math.log2(p) + (1 - p) * math.log2(1 - p))
+            # A letter every candidate shares carries no information but is a free hit
+            certain = [letter for letter, count in counts.items() if count == total]
+            if certain:
+                return min(certain)
+            return max(sorted(counts), key=score)
+        return max(sorted(counts), key=counts.get)
+
+    def choose_letter(self, engine):
+        """Return the best next guess for a game running in a HangmanEngine."""
+        return self.next_guess(engine.word_display, engine.guessed_letters)
+
+    def hint_letter(self, engine):
+        """
+        Pick the hidden letter of the engine's word that is most useful to reveal.
+
+        That is the letter fewest remaining candidates contain, i.e. the one
+        the player is least likely to find by guessing.
+        """
+        display = engine.word_display
+        hidden = {char for char, shown in zip(engine.word_to_guess, display) if shown == "_"}
+        if not hidden:
+            return None
+        counts = self.letter_counts(display, engine.guessed_letters)
+        return min(sorted(hidden), key=lambda letter: counts.get(letter, 0))
+
+
+def auto_play(engine, solver, word, difficulty="medium"):
+    """Play one full game of word with the solver's guesses; returns the engine."""
+    engine.new_game(word, difficulty)
+    session = solver.session()
+    while not engine.game_over:
+        engine.guess(session.choose_letter(engine))
+    return engine
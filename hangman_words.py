@@ -0,0 +1,223 @@
+"""
+Word lists for Hangman.
+
+The built-in categories live in WORD_CATEGORIES. Larger dictionaries are
+streamed from disk with iter_word_file() and stored in a WordIndex, which
+keeps every word in one packed byte buffer and indexes it by category,
+difficulty and length with arrays of integer word ids.
+"""
+import csv
+import itertools
+import os
+import random
+from array import array
+
+DIFFICULTIES = ("easy", "medium", "hard")
+CSV_COLUMNS = ["word", "category", "difficulty"]  # Column order of .csv word files
+
+# Word categories with words of varying difficulties
+WORD_CATEGORIES = {
+    "animals": {
+        "easy": ["dog", "cat", "fish", "bird", "frog", "duck", "cow", "pig", "fox", "wolf"],
+        "medium": ["dolphin", "elephant", "penguin", "kangaroo", "leopard", "giraffe", "zebra", "monkey", "turtle", "rabbit"],
+        "hard": ["platypus", "rhinoceros", "hippopotamus", "chameleon", "crocodile", "chimpanzee", "porcupine", "orangutan", "anaconda", "tarantula"]
+    },
+    "countries": {
+        "easy": ["spain", "japan", "italy", "egypt", "india", "china", "peru", "chile", "cuba", "mali"],
+        "medium": ["australia", "germany", "canada", "mexico", "brazil", "turkey", "russia", "sweden", "ireland", "morocco"],
+        "hard": ["kazakhstan", "zimbabwe", "uruguay", "switzerland", "philippines", "madagascar", "mongolia", "nicaragua", "azerbaijan", "bangladesh"]
+    },
+    "technology": {
+        "easy": ["mouse", "phone", "code", "game", "data", "wifi", "chip", "blog", "site", "byte"],
+        "medium": ["keyboard", "internet", "software", "hardware", "database", "network", "website", "computer", "algorithm", "password"],
+        "hard": ["cryptography", "blockchain", "javascript", "middleware", "kubernetes", "recursion", "virtualization", "microservice", "authentication", "algorithm"]
+    },
+    "space": {
+        "easy": ["star", "moon", "mars", "sun", "sky", "earth", "space", "comet", "orbit", "venus"],
+        "medium": ["galaxy", "jupiter", "neptune", "planet", "asteroid", "meteor", "saturn", "gravity", "cosmos", "telescope"],
+        "hard": ["constellation", "supernova", "spacecraft", "atmosphere", "nebulosity", "satellite", "observatory", "interstellar", "gravitational", "astrophysics"]
+    },
+    "food": {
+        "easy": ["cake", "rice", "fish", "meat", "milk", "corn", "egg", "soup", "taco", "pie"],
+        "medium": ["chicken", "burger", "spaghetti", "sandwich", "chocolate", "pancake", "lasagna", "burrito", "waffle", "cupcake"],
+        "hard": ["quesadilla", "croissant", "asparagus", "blueberry", "carbonara", "guacamole", "cheesecake", "stroganoff", "bruschetta", "frittata"]
+    }
+}
+
+
+def normalize_word(word):
+    """Lowercase and strip a word; return "" if it contains no letters."""
+    word = word.strip().lower()
+    return word if any(char.isalpha() for char in word) else ""
+
+
+def iter_word_file(path, category=None, difficulty="medium"):
+    """
+    Stream (word, category, difficulty) tuples from a word file.
+
+    Files ending in .csv are read as word,category,difficulty rows (a first
+    row naming those columns is skipped, missing columns fall back to the
+    defaults). Any other file holds one word per line; blank lines and lines
+    starting with "#" are ignored. The category defaults to the file name
+    without its extension. Rows with an unknown difficulty are skipped.
+    """
+    if category is None:
+        category = os.path.splitext(os.path.basename(path))[0].lower()
+
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if path.lower().endswith(".csv"):
+            rows = csv.reader(file)
+            first = next(rows, None)
+            if first is not None and [cell.strip().lower() for cell in first[:3]] != CSV_COLUMNS[:len(first)]:
+                rows = itertools.chain([first], rows)  # Not a header: the first row is a word too
+        else:
+            rows = ([line] for line in file if not line.startswith("#"))
+
+        for row in rows:
+            if not row:
+                continue
+            word = normalize_word(row[0])
+            if not word:
+                continue
+            row_category = row[1].strip().lower() if len(row) > 1 and row[1].strip() else category
+            row_difficulty = row[2].strip().lower() if len(row) > 2 and row[2].strip() else difficulty
+            if row_difficulty not in DIFFICULTIES:
+                continue
+            yield word, row_category, row_difficulty
+
+
+class WordIndex:
+    """
+    Compact, append-only index of words by category, difficulty and length.
+
+    Every word is stored once in a packed UTF-8 byte buffer and identified
+    by its position (its word id). Buckets are arrays of word ids, so a
+    dictionary with hundreds of thousands of words costs a few bytes per
+    word instead of one Python string and list slot each, and drawing a
+    random word from a bucket is O(1).
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()  # All words back to back
+        self.offsets = array("I", [0])  # Word i is buffer[offsets[i]:offsets[i + 1]]
+        self.word_categories = array("H")  # Category id of each word
+        self.word_difficulties = array("B")  # Difficulty id of each word
+        self.word_scores = None  # Numeric difficulty (0 easiest, 1 hardest) of each word, once classified
+        self.category_names = []
+        self.category_ids = {}
+        self.buckets = {}  # (category id, difficulty id) -> array of word ids
+        self.difficulty_buckets = [[] for _ in DIFFICULTIES]  # Bucket keys per difficulty id
+        self.length_buckets = {}  # word length -> array of word ids
+
+    @classmethod
+    def from_categories(cls, categories):
+        """Build an index from a nested {category: {difficulty: [words]}} dictionary."""
+        index = cls()
+        for category, levels in categories.items():
+            for difficulty, words in levels.items():
+                for word in words:
+                    index.add(word, category, difficulty)
+        return index
+
+    @classmethod
+    def from_files(cls, paths):
+        """Build an index by streaming one or more word files."""
+        index = cls()
+        for path in paths:
+            index.add_many(iter_word_file(path))
+        return index
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def add(self, word, category, difficulty):
+        """Append a word and return its word id."""
+        word_id = len(self)
+        category_id = self.category_ids.get(category)
+        if category_id is None:
+            category_id = self.category_ids[category] = len(self.category_names)
+            self.category_names.append(category)
+        difficulty_id = DIFFICULTIES.index(difficulty)
+
+        self.buffer += word.encode("utf-8")
+        self.offsets.append(len(self.buffer))
+        self.word_categories.append(category_id)
+        self.word_difficulties.append(difficulty_id)
+
+        key = (category_id, difficulty_id)
+        if key not in self.buckets:
+            self.buckets[key] = array("I")
+            self.difficulty_buckets[difficulty_id].append(key)
+        self.buckets[key].append(word_id)
+        if len(word) not in self.length_buckets:
+            self.length_buckets[len(word)] = array("I")
+        self.length_buckets[len(word)].append(word_id)
+        return word_id
+
+    def add_many(self, entries):
+        """Append every (word, category, difficulty) tuple from an iterable."""
+        for word, category, difficulty in entries:
+            self.add(word, category, difficulty)
+
+    def set_difficulties(self, difficulty_ids):
+        """Replace the difficulty id of every word and rebuild the buckets."""
+        self.word_difficulties = array("B", difficulty_ids)
+        self.buckets = {}
+        self.difficulty_buckets = [[] for _ in DIFFICULTIES]
+        for word_id, (category_id, difficulty_id) in enumerate(zip(self.word_categories, self.word_difficulties)):
+            key = (category_id, difficulty_id)
+            if key not in self.buckets:
+                self.buckets[key] = array("I")
+                self.difficulty_buckets[difficulty_id].append(key)
+            self.buckets[key].append(word_id)
+
+    def set_scores(self, scores):
+        """Store a numeric difficulty score in [0, 1] for every word."""
+        self.word_scores = array("f", scores)
+
+    def word(self, word_id):
+        """Return the word stored under word_id."""
+        return self.buffer[self.offsets[word_id]:self.offsets[word_id + 1]].decode("utf-8")
+
+    def category_of(self, word_id):
+        return self.category_names[self.word_categories[word_id]]
+
+    def difficulty_of(self, word_id):
+        return DIFFICULTIES[self.word_difficulties[word_id]]
+
+    def categories(self):
+        """Names of all categories, in the order they were first seen."""
+        return list(self.category_names)
+
+    def bucket(self, category, difficulty):
+        """Array of word ids for a category and difficulty (empty if unknown)."""
+        category_id = self.category_ids.get(category)
+        if category_id is None or difficulty not in DIFFICULTIES:
+            return array("I")
+        return self.buckets.get((category_id, DIFFICULTIES.index(difficulty)), array("I"))
+
+    def words_of_length(self, length):
+        """Array of word ids for every word with the given length."""
+        return self.length_buckets.get(length, array("I"))
+
+    def random_word_id(self, category="random", difficulty="medium", rng=random):
+        """
+        Draw a random word id for a category and difficulty in O(1).
+
+        For the "random" category a category is picked first, each with the
+        same chance, among those that have words at this difficulty.
+        """
+        if category == "random":
+            candidates = self.difficulty_buckets[DIFFICULTIES.index(difficulty)]
+            if not candidates:
+                raise LookupError(f"No {difficulty} words available")
+            ids = self.buckets[rng.choice(candidates)]
+        else:
+            ids = self.bucket(category, difficulty)
+            if not ids:
+                raise LookupError(f"No {difficulty} words in category {category!r}")
+        return ids[rng.randrange(len(ids))]
+
+    def random_word(self, category="random", difficulty="medium", rng=random):
+        """Draw a random word for a category and difficulty."""
+        return self.word(self.random_word_id(category, difficulty, rng))
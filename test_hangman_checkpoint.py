@@ -0,0 +1,120 @@
+import importlib.util
+import os
+import random
+
+import hangman_checkpoint
+from hangman_checkpoint import CheckpointStore, restore_game
+from hangman_engine import HangmanEngine
+from hangman_events import GameEventLog, audit, iter_games, iter_moves
+from hangman_words import WORD_CATEGORIES, WordIndex
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1700000000.0
+
+    def __call__(self):
+        self.now += 0.25
+        return self.now
+
+
+def half_played(index, word_id, seed):
+    """An engine part way through a game of word_id, with a hint."""
+    rng = random.Random(seed)
+    engine = HangmanEngine(clock=FakeClock(), rng=rng)
+    engine.new_game(index.word(word_id), index.difficulty_of(word_id))
+    engine.guess("e")
+    engine.hint()
+    for letter in "zqxj":
+        engine.guess(letter)
+        if engine.current_incorrect_guesses >= 2:
+            break
+    return engine
+
+
+def state(engine):
+    return (engine.word_to_guess, engine.difficulty, engine.guessed_mask, engine.revealed_mask,
+            engine.current_incorrect_guesses, engine.score, engine.hints_used,
+            [code for code, _ in engine.moves])
+
+
+def test_round_trip(tmp_path):
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    path = str(tmp_path / "checkpoints.bin")
+    store = CheckpointStore(index, path)
+    games = {f"player{i}": (i * 7, half_played(index, i * 7, i)) for i in range(10)}
+    for player, (word_id, engine) in games.items():
+        store.save(player, engine, word_id, index.category_of(word_id))
+    store.discard("player3")
+
+    store = CheckpointStore(index, path)
+    assert len(store) == 9 and "player3" not in store
+    for player, (word_id, engine) in games.items():
+        if player == "player3":
+            continue
+        checkpoint = store.get(player)
+        assert (checkpoint.word_id, checkpoint.category) == (word_id, index.category_of(word_id))
+        assert state(restore_game(HangmanEngine(clock=FakeClock()), checkpoint, index)) == state(engine)
+
+
+def test_other_word_list_drops_checkpoints(tmp_path):
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    path = str(tmp_path / "checkpoints.bin")
+    CheckpointStore(index, path).save("alice", half_played(index, 3, 0), 3)
+    other = WordIndex.from_categories({"animals": {"easy": ["cat", "dog"]}})
+    assert CheckpointStore(other, path).load() == 0
+    assert CheckpointStore(index, path).load() == 1
+
+
+def test_fingerprint_is_computed_once(tmp_path, monkeypatch):
+    calls = []
+    fingerprint = hangman_checkpoint.index_fingerprint
+    monkeypatch.setattr(hangman_checkpoint, "index_fingerprint", lambda index: calls.append(1) or fingerprint(index))
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    store = CheckpointStore(index, str(tmp_path / "checkpoints.bin"))
+    for i in range(5):
+        store.save(f"player{i}", half_played(index, i, i), i)
+    assert len(calls) == 1
+
+
+def test_resumed_game_replays_like_one_played_in_one_go(tmp_path):
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    store = CheckpointStore(index, str(tmp_path / "checkpoints.bin"))
+    engine = half_played(index, 11, 5)
+    store.save("alice", engine, 11)
+
+    resumed = restore_game(HangmanEngine(clock=FakeClock()), CheckpointStore(index, store.path).get("alice"), index)
+    for letter in "etaoinshrdlcumwfgypbvkjxqz":
+        if resumed.game_over:
+            break
+        resumed.guess(letter)
+    log = GameEventLog(str(tmp_path / "events.log"))
+    log.record_game(resumed, "alice", "animals")
+    log.close()
+
+    (record,) = iter_games([log.path])
+    assert record.word == engine.word_to_guess and record.score == resumed.score
+    assert [code for code, _ in resumed.moves][:len(engine.moves)] == [code for code, _ in engine.moves]
+    assert len(list(iter_moves(record))) == len(resumed.moves)
+    assert audit([log.path]) == []
+
+
+def test_resumed_game_keeps_its_difficulty(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("hangman_game", os.path.join(os.path.dirname(__file__),
+                                                                               "hangman-game.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    word_id = next(i for i in range(len(index)) if index.difficulty_of(i) == "hard")
+    store = CheckpointStore(index, str(tmp_path / "checkpoints.bin"))
+    store.save("alice", half_played(index, word_id, 0), word_id, index.category_of(word_id))
+
+    monkeypatch.setattr("builtins.input", lambda prompt: "y")
+    game = module.HangmanGame(profile_store={}, word_index=index, checkpoints=store)
+    game.current_player, game.difficulty = "alice", "easy"
+    assert game.resume_game()
+    assert game.difficulty == game.engine.difficulty == "hard"
+
+    game.difficulty = module.ADAPTIVE  # Adaptive play keeps drawing words near the player's level
+    assert game.resume_game()
+    assert game.difficulty == module.ADAPTIVE and game.engine.difficulty == "hard"
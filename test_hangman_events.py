@@ -0,0 +1,117 @@
+import os
+import random
+
+from hangman_engine import ALPHABET, HINT_MOVE, HangmanEngine
+from hangman_events import GameEventLog, audit, iter_games, iter_moves, log_paths
+
+WORDS = ["apple", "gravity", "python", "lion", "canada"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1700000000.0
+
+    def __call__(self):
+        self.now += 0.25
+        return self.now
+
+
+def play(word, seed):
+    """A finished game of word with a few random hints."""
+    rng = random.Random(seed)
+    engine = HangmanEngine(clock=FakeClock(), rng=rng)
+    engine.new_game(word, rng.choice(["easy", "medium", "hard"]))
+    letters = list("etaoinshrdlcumwfgypbvkjxqz")
+    while not engine.game_over:
+        if rng.random() < 0.2:
+            engine.hint()
+        else:
+            engine.guess(letters.pop(0))
+    return engine
+
+
+def test_round_trip_and_replay(tmp_path):
+    path = str(tmp_path / "events.log")
+    log = GameEventLog(path)
+    games = [(f"player{i % 3}", "animals", play(WORDS[i % len(WORDS)], i)) for i in range(20)]
+    for player, category, engine in games:
+        log.record_game(engine, player, category)
+    log.close()
+
+    records = list(iter_games([path]))
+    assert len(records) == len(games)
+    for record, (player, category, engine) in zip(records, games):
+        assert (record.player, record.category, record.word) == (player, category, engine.word_to_guess)
+        assert (record.score, record.won, record.difficulty) == (engine.score, engine.game_won, engine.difficulty)
+        assert [(letter, hint) for letter, hint, _ in iter_moves(record)] == \
+            [(ALPHABET[code & ~HINT_MOVE], bool(code & HINT_MOVE)) for code, _ in engine.moves]
+    assert audit([path]) == []
+
+
+def test_interleaved_writers_keep_their_strings(tmp_path):
+    path = str(tmp_path / "events.log")
+    writers = {"alice": GameEventLog(path), "bob": GameEventLog(path)}
+    expected = []
+    for i in range(12):
+        player = "alice" if i % 3 else "bob"
+        category = "animals" if player == "alice" else "countries"
+        engine = play(WORDS[i % len(WORDS)], i)
+        writers[player].record_game(engine, player, category)
+        expected.append((player, category, engine.word_to_guess))
+    for log in writers.values():
+        log.close()
+
+    assert [(r.player, r.category, r.word) for r in iter_games([path])] == expected
+
+
+def test_rotation_keeps_every_game(tmp_path):
+    path = str(tmp_path / "events.log")
+    first = GameEventLog(path, max_bytes=300, backup_count=50)
+    second = GameEventLog(path, max_bytes=300, backup_count=50)
+    for i in range(30):
+        (first if i % 2 else second).record_game(play(WORDS[i % len(WORDS)], i), f"player{i}", "animals")
+    first.close()
+    second.close()
+
+    paths = log_paths(path, backup_count=50)
+    assert len(paths) > 1
+    assert [record.player for record in iter_games(paths)] == [f"player{i}" for i in range(30)]
+
+
+def test_torn_frame_is_skipped(tmp_path):
+    path = str(tmp_path / "events.log")
+    log = GameEventLog(path)
+    log.record_game(play("apple", 1), "alice", "food")
+    log.close()
+    with open(path, "ab") as file:
+        file.write(b"\x02\x00\x00")  # A frame cut short by a crash
+    log = GameEventLog(path)
+    log.record_game(play("lion", 2), "bob", "animals")
+    log.close()
+
+    assert [(r.player, r.word) for r in iter_games([path])] == [("alice", "apple"), ("bob", "lion")]
+
+
+def test_names_that_look_like_a_segment_header(tmp_path):
+    # "HGEV" followed by a string record, then by a game record: both read like a header
+    for name, games in [("strings", [("alice", "animals"), ("HGEV", "zoo"), ("bob", "food")]),
+                        ("game", [("alice", "animals"), ("HGEV", "animals"), ("bob", "food")])]:
+        path = str(tmp_path / f"{name}.log")
+        log = GameEventLog(path)
+        for i, (player, category) in enumerate(games):
+            log.record_game(play("apple", i), player, category)
+        log.close()
+
+        assert [(r.player, r.category) for r in iter_games([path])] == games
+        assert audit([path]) == []
+
+
+def test_simulated_logs_leave_no_lock_files(tmp_path):
+    from hangman_simulate import simulate
+
+    prefix = str(tmp_path / "sim")
+    stats = simulate(60, workers=1, batch_games=20, event_log=prefix)
+    assert sorted(os.listdir(tmp_path)) == ["sim-0.log", "sim-1.log", "sim-2.log"]
+    paths = [f"{prefix}-{seed}.log" for seed in range(3)]
+    assert len(list(iter_games(paths))) == stats.games == 60
+    assert audit(paths) == []
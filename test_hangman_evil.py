@@ -0,0 +1,36 @@
+import random
+
+from hangman_evil import EvilHangmanEngine
+from hangman_solver import HangmanSolver
+from hangman_words import WORD_CATEGORIES, WordIndex
+
+
+def play(engine):
+    words = {engine.word_to_guess}
+    for letter in "etaoinshrdlcumwfgypbvkjxqz":
+        if engine.game_over:
+            break
+        engine.guess(letter)
+        words.add(engine.word_to_guess)
+    return words
+
+
+def test_word_stays_in_the_chosen_category():
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    engine = EvilHangmanEngine(HangmanSolver.from_index(index), rng=random.Random(0))
+    rng = random.Random(1)
+    for category in index.categories():
+        members = {index.word(word_id) for word_id in range(len(index)) if index.category_of(word_id) == category}
+        for _ in range(10):
+            word = rng.choice(sorted(members))
+            engine.new_game(word, "hard", category)
+            assert play(engine) <= members
+
+
+def test_random_category_draws_from_every_word():
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    solver = HangmanSolver.from_index(index)
+    engine = EvilHangmanEngine(solver, rng=random.Random(0))
+    word = index.word(0)
+    engine.new_game(word, "hard")
+    assert engine.candidate_count == len(solver.buckets[len(word)].words)
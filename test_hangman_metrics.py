@@ -0,0 +1,30 @@
+import time
+
+from hangman_metrics import GameMetrics
+from hangman_profiles import JournalProfileStore
+
+
+def test_profile_store_writes_are_timed(tmp_path):
+    metrics = GameMetrics()
+    store = JournalProfileStore(str(tmp_path / "profiles.json"), compact_bytes=200, flush_interval=0)
+    metrics.instrument_profile_store(store)
+    for i in range(10):
+        store.create(f"player{i}")
+        store.record_game(f"player{i}", True, 10, "animals", "2024-01-01 12:00:00")
+    store.compact()
+    store.close()
+
+    assert metrics.profile_flush_seconds.count == 20  # One synchronous write per change, none for idle flushes
+    assert metrics.profile_compaction_seconds.count >= 1
+    assert "hangman_profile_compaction_seconds_count" in metrics.registry.render()
+
+
+def test_idle_background_flushes_are_not_timed(tmp_path):
+    metrics = GameMetrics()
+    store = JournalProfileStore(str(tmp_path / "profiles.json"), flush_interval=0.01)
+    metrics.instrument_profile_store(store)
+    time.sleep(0.1)
+    assert metrics.profile_flush_seconds.count == 0
+    store.create("alice")
+    store.close()
+    assert metrics.profile_flush_seconds.count == 1
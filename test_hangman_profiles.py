@@ -0,0 +1,215 @@
+import importlib.util
+import os
+import time
+
+import pytest
+
+import hangman_profiles
+from hangman_profiles import JournalProfileStore, read_snapshot
+
+
+def open_store(tmp_path, **kwargs):
+    kwargs.setdefault("compact_bytes", 200)
+    kwargs.setdefault("flush_interval", 0)
+    return JournalProfileStore(str(tmp_path / "profiles.json"), **kwargs)
+
+
+def play(store, names, games=3):
+    for name in names:
+        store.create(name)
+        for i in range(games):
+            store.record_game(name, i % 2 == 0, 10 * i, "animals", "2024-01-01 12:00:00")
+
+
+def test_journal_round_trip(tmp_path):
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    play(store, ["alice", "bob"])
+    store.delete("bob")
+    store.close()
+
+    store = open_store(tmp_path)
+    assert list(store) == ["alice"]
+    assert store["alice"].games_played == 3
+    assert store["alice"].total_score == 30
+    store.close()
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    store = open_store(tmp_path)
+    play(store, [f"player{i}" for i in range(20)])
+    store.compact()
+    store.close()
+
+    assert not os.path.exists(store.old_journal_path)
+    assert len(read_snapshot(store.path)) == 20
+    store = open_store(tmp_path)
+    assert store["player19"].games_played == 3
+    store.close()
+
+
+def test_failed_compaction_is_retried_not_overwritten(tmp_path, monkeypatch):
+    def broken_snapshot(profiles, file):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(hangman_profiles, "write_snapshot", broken_snapshot)
+    store = open_store(tmp_path)
+    names = [f"player{i}" for i in range(30)]
+    # Enough journal for several rotations: each one must merge the last first
+    play(store, names)
+    store.compact()
+    assert os.path.exists(store.old_journal_path)
+    store.close()
+
+    monkeypatch.undo()
+    store = open_store(tmp_path)
+    assert sorted(store) == sorted(names)
+    assert all(store[name].games_played == 3 for name in names)
+    store.compact()
+    assert not os.path.exists(store.old_journal_path)
+    store.close()
+
+    store = open_store(tmp_path)
+    assert sorted(store) == sorted(names)
+    store.close()
+
+
+def test_compaction_recovers_after_crash(tmp_path):
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    play(store, ["alice"])
+    store.close()
+    # A crash after writing the new snapshot but before removing <journal>.old
+    os.replace(store.journal_path, store.old_journal_path)
+    with open(store.path + ".tmp", "w") as file:
+        file.write("{}")
+
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    assert store["alice"].games_played == 3
+    store.close()
+    assert not os.path.exists(store.path + ".tmp")
+
+
+def test_torn_journal_tail_does_not_swallow_later_games(tmp_path):
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    play(store, ["alice"], games=1)
+    store.close()
+    with open(store.journal_path, "a") as file:
+        file.write('{"op":"game","name":"ali')  # A crash mid-append
+
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    for _ in range(2):
+        store.record_game("alice", True, 10, "animals", "2024-01-01 12:00:00")
+    assert store["alice"].games_played == 3
+    store.close()
+
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    assert store["alice"].games_played == 3
+    store.compact()
+    store.close()
+    store = open_store(tmp_path)
+    assert store["alice"].games_played == 3
+    store.close()
+
+
+def test_write_behind_flush_after_crash_survives_reload(tmp_path):
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    play(store, ["alice"], games=1)
+    store.close()
+    with open(store.journal_path, "a") as file:
+        file.write('{"op":"game","na')  # A crash mid-append
+
+    store = open_store(tmp_path, compact_bytes=1 << 20, flush_interval=0.01)
+    size = os.path.getsize(store.journal_path)
+    store.record_game("alice", True, 10, "animals", "2024-01-01 12:00:00")
+    deadline = time.monotonic() + 5
+    while os.path.getsize(store.journal_path) == size and time.monotonic() < deadline:
+        time.sleep(0.01)  # Wait for the background flusher, without closing the store
+
+    reloaded = open_store(tmp_path, compact_bytes=1 << 20)
+    assert reloaded["alice"].games_played == 2
+    reloaded.close()
+    store.close()
+
+
+def test_torn_line_inside_journal_is_skipped(tmp_path):
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    play(store, ["alice"], games=1)
+    store.close()
+    with open(store.journal_path, "a") as file:
+        file.write('{"op":"game","name":"ali\n')  # Left by an older version that did not cut torn lines
+    store = open_store(tmp_path, compact_bytes=1 << 20)
+    store.record_game("alice", True, 10, "animals", "2024-01-01 12:00:00")
+    store.close()
+
+    store = open_store(tmp_path)
+    assert store["alice"].games_played == 2
+    store.close()
+
+
+@pytest.mark.skipif(hangman_profiles.fcntl is None, reason="needs fcntl")
+def test_shared_stores_add_up(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    first = hangman_profiles.SharedJournalProfileStore(path, compact_bytes=300)
+    second = hangman_profiles.SharedJournalProfileStore(path, compact_bytes=300)
+    first.create("alice")
+    for i in range(10):
+        (first if i % 2 else second).record_game("alice", True, 10, "animals", "2024-01-01 12:00:00")
+    assert first["alice"].games_played == second["alice"].games_played == 10
+    first.close()
+    second.close()
+
+    store = open_store(tmp_path)
+    assert store["alice"].total_score == 100
+    store.close()
+
+
+@pytest.mark.skipif(hangman_profiles.fcntl is None, reason="needs fcntl")
+def test_shared_store_appends_after_a_torn_line(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    first = hangman_profiles.SharedJournalProfileStore(path, compact_bytes=1 << 20)
+    second = hangman_profiles.SharedJournalProfileStore(path, compact_bytes=1 << 20)
+    first.create("alice")
+    first.record_game("alice", True, 10, "animals", "2024-01-01 12:00:00")
+    with open(first.journal_path, "a") as file:
+        file.write('{"op":"game","name":"ali')  # A third writer crashed mid-append
+    second.record_game("alice", True, 10, "animals", "2024-01-01 12:00:00")
+    first.record_game("alice", True, 10, "animals", "2024-01-01 12:00:00")
+    second.record_game("alice", True, 10, "animals", "2024-01-01 12:00:00")
+    assert first["alice"].games_played == second["alice"].games_played == 4
+    first.close()
+    second.close()
+
+    store = open_store(tmp_path)
+    assert store["alice"].games_played == 4
+    store.close()
+
+
+def test_record_store_round_trip(tmp_path):
+    path = str(tmp_path / "profiles.records")
+    store = hangman_profiles.RecordProfileStore(path, import_from=None)
+    play(store, ["alice", "bob"])
+    store.delete("bob")
+    store.close()
+
+    store = hangman_profiles.RecordProfileStore(path, import_from=None)
+    assert "bob" not in store
+    assert store["alice"].games_played == 3
+    store.close()
+
+    os.remove(path + ".idx")  # A lost index is rebuilt from the records
+    store = hangman_profiles.RecordProfileStore(path, import_from=None)
+    assert store["alice"].total_score == 30
+    store.close()
+
+
+def test_corrupt_snapshot_message_names_the_kept_copy(tmp_path, capsys):
+    spec = importlib.util.spec_from_file_location("hangman_game", os.path.join(os.path.dirname(__file__),
+                                                                               "hangman-game.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    path = tmp_path / "team.json"
+    path.write_text("{not json", encoding="utf-8")
+    store = JournalProfileStore(str(path), flush_interval=0)
+    module.HangmanGame().load_player_profiles(store)
+    assert f"{path}.corrupt" in capsys.readouterr().out
+    assert (tmp_path / "team.json.corrupt").exists()
+    store.close()
@@ -0,0 +1,61 @@
+import importlib.util
+import io
+import os
+
+import pytest
+
+import hangman_render
+from hangman_render import HOME_AND_CLEAR, FrameRenderer
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    size = {"lines": 24}
+    monkeypatch.setattr(hangman_render.shutil, "get_terminal_size",
+                        lambda: os.terminal_size((80, size["lines"])))
+    return size
+
+
+def frames(renderer, *texts):
+    """What each render wrote to the terminal."""
+    written = []
+    for text in texts:
+        start = renderer.stream.tell()
+        renderer.render(text)
+        written.append(renderer.stream.getvalue()[start:])
+    return written
+
+
+def test_only_changed_lines_are_redrawn(rows):
+    renderer = FrameRenderer(Terminal(), reserved=3)
+    first, second = frames(renderer, "a\nb\nc", "a\nB\nc")
+    assert first.startswith(HOME_AND_CLEAR)
+    assert HOME_AND_CLEAR not in second and "B" in second and "a" not in second
+
+
+def test_rows_for_prompts_are_kept_free(rows):
+    renderer = FrameRenderer(Terminal(), reserved=3)
+    text = "\n".join(map(str, range(21)))
+    assert all(frame.startswith(HOME_AND_CLEAR) for frame in frames(renderer, text, text))
+    rows["lines"] = 25
+    assert not frames(renderer, text, text)[1].startswith(HOME_AND_CLEAR)
+
+
+def test_game_screen_is_diffed_on_24_rows(rows):
+    spec = importlib.util.spec_from_file_location("hangman_game", os.path.join(os.path.dirname(__file__),
+                                                                               "hangman-game.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    game = module.HangmanGame(profile_store={})
+    game.renderer = FrameRenderer(Terminal(), reserved=game.renderer.reserved)
+    game.engine.new_game("python", "medium")
+    game.display_game()
+    start = game.renderer.stream.tell()
+    game.engine.guess("o")
+    game.display_game()
+    assert HOME_AND_CLEAR not in game.renderer.stream.getvalue()[start:]
@@ -0,0 +1,52 @@
+import os
+
+import hangman_selection
+from hangman_selection import WordSelector
+from hangman_words import WORD_CATEGORIES, WordIndex
+
+
+def open_selector(tmp_path):
+    return WordSelector(WordIndex.from_categories(WORD_CATEGORIES), str(tmp_path / "bags.json"))
+
+
+def test_no_repeats_across_restarts(tmp_path):
+    selector = open_selector(tmp_path)
+    size = len(selector.index.bucket("animals", "easy"))
+    drawn = [selector.draw_id("alice", "animals", "easy") for _ in range(size // 2)]
+    # Not closed: the journal alone must carry the draws over
+    selector = open_selector(tmp_path)
+    drawn += [selector.draw_id("alice", "animals", "easy") for _ in range(size - size // 2)]
+    selector.close()
+    assert sorted(drawn) == sorted(selector.index.bucket("animals", "easy"))
+
+
+def test_journal_is_folded_into_the_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(hangman_selection, "BAG_JOURNAL_LIMIT", 5)
+    selector = open_selector(tmp_path)
+    for i in range(12):
+        selector.draw_id(f"player{i % 3}")
+    assert os.path.exists(selector.path)
+    with open(selector.journal_path) as file:
+        assert len(file.readlines()) == 2
+    states = {player: {key: (bag.seed, bag.drawn) for key, bag in bags.items()}
+              for player, bags in selector.bags.items()}
+
+    selector.close()
+    assert not os.path.exists(selector.journal_path)
+    selector = open_selector(tmp_path)
+    selector.load()
+    assert {player: {key: (bag.seed, bag.drawn) for key, bag in bags.items()}
+            for player, bags in selector.bags.items()} == states
+
+
+def test_torn_journal_line_is_skipped(tmp_path):
+    selector = open_selector(tmp_path)
+    selector.draw_id("alice")
+    with open(selector.journal_path, "a") as file:
+        file.write('["bob","random/me')
+    selector = open_selector(tmp_path)
+    selector.draw_id("alice")
+    selector = open_selector(tmp_path)
+    selector.load()
+    assert list(selector.bags) == ["alice"]
+    assert selector.bags["alice"]["random/medium"].drawn == 2
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+from hangman_profiles import JournalProfileStore
+from hangman_server import HangmanServer, run_bot
+from hangman_solver import HangmanSolver, SolverSession
+from hangman_words import WORD_CATEGORIES, WordIndex
+
+
+class CheckedSession(SolverSession):
+    """Session that compares every guess with a fresh solver's for the same game state."""
+
+    guesses = []
+
+    def next_guess(self, display, guessed_letters):
+        letter = super().next_guess(display, guessed_letters)
+        self.guesses.append((letter, self.solver.fresh.next_guess(display, guessed_letters)))
+        return letter
+
+
+class CheckedSolver(HangmanSolver):
+    def session(self):
+        return CheckedSession(self)
+
+
+def test_concurrent_bots_follow_their_own_games(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    profiles = JournalProfileStore(str(tmp_path / "profiles.json"), flush_interval=0)
+    solver = CheckedSolver.from_index(index)
+    solver.fresh = HangmanSolver.from_index(index)
+
+    async def play():
+        server = HangmanServer(index, profiles, port=0)
+        await server.start()
+        async with server.server:
+            await asyncio.gather(*(run_bot(server.host, server.port, f"bot{i}", 3, solver) for i in range(8)))
+
+    asyncio.run(play())
+    profiles.close()
+
+    assert len(CheckedSession.guesses) > 8 * 3
+    assert all(letter == expected for letter, expected in CheckedSession.guesses)
+
+
+class WatchedStore(JournalProfileStore):
+    """Profile store that notes membership checks and the threads writes run on."""
+
+    def __init__(self, *args, **kwargs):
+        self.lookups = 0
+        self.write_threads = set()
+        super().__init__(*args, **kwargs)
+
+    def __contains__(self, name):
+        self.lookups += 1
+        return super().__contains__(name)
+
+    def create(self, name):
+        self.write_threads.add(threading.current_thread())
+        super().create(name)
+
+    def record_game(self, *args, **kwargs):
+        self.write_threads.add(threading.current_thread())
+        super().record_game(*args, **kwargs)
+
+
+def test_profile_writes_stay_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    index = WordIndex.from_categories(WORD_CATEGORIES)
+    profiles = WatchedStore(str(tmp_path / "profiles.json"), flush_interval=0)
+    solver = HangmanSolver.from_index(index)
+
+    async def play():
+        server = HangmanServer(index, profiles, port=0)
+        await server.start()
+        async with server.server:
+            await asyncio.gather(*(run_bot(server.host, server.port, f"bot{i}", 3, solver) for i in range(4)))
+        server.close()
+
+    asyncio.run(play())
+
+    assert profiles.lookups == 4  # Once per HELLO, not once per move
+    assert profiles.write_threads and threading.main_thread() not in profiles.write_threads
+    assert all(profiles[f"bot{i}"].games_played == 3 for i in range(4))
+    profiles.close()
@@ -0,0 +1,40 @@
+import random
+
+from hangman_engine import HangmanEngine
+from hangman_solver import HangmanSolver, auto_play
+
+WORDS = ["toe", "tie", "eat", "tea", "ape", "cat", "dog", "apple", "gravity", "python", "lion", "canada",
+         "ice cream"]
+
+
+def test_games_do_not_leak_into_each_other():
+    solver = HangmanSolver(WORDS)
+    assert sorted(solver.candidates("___", ["e"])) == ["cat", "dog"]
+    assert sorted(solver.candidates("t_e", ["e", "t"])) == ["tie", "toe"]
+
+    session = solver.session()
+    session.candidates("___", ["e"])
+    session.reset()
+    assert sorted(session.candidates("t_e", ["e", "t"])) == ["tie", "toe"]
+
+
+def test_session_matches_a_fresh_solver():
+    solver = HangmanSolver(WORDS, "entropy")
+    session = solver.session()
+    engine = HangmanEngine(rng=random.Random(0))
+    for word in random.Random(1).choices(WORDS, k=40):
+        engine.new_game(word, "hard")
+        session.reset()
+        while not engine.game_over:
+            display, guessed = engine.word_display, engine.guessed_letters
+            fresh = HangmanSolver(WORDS, "entropy")
+            assert session.candidates(display, guessed) == fresh.candidates(display, guessed)
+            assert session.next_guess(display, guessed) == fresh.next_guess(display, guessed)
+            engine.guess(session.choose_letter(engine))
+
+
+def test_auto_play_finds_dictionary_words():
+    solver = HangmanSolver(WORDS)
+    engine = HangmanEngine()
+    for word in WORDS:
+        assert auto_play(engine, solver, word, "easy").game_won
@@ -0,0 +1,16 @@
+from hangman_words import iter_word_file
+
+
+def test_csv_header_is_skipped_but_the_word_word_is_kept(tmp_path):
+    with_header = tmp_path / "with_header.csv"
+    with_header.write_text("Word,Category,Difficulty\nword,grammar,easy\nnoun,grammar,hard\n", encoding="utf-8")
+    assert list(iter_word_file(str(with_header))) == [("word", "grammar", "easy"), ("noun", "grammar", "hard")]
+
+    without_header = tmp_path / "without_header.csv"
+    without_header.write_text("word,grammar,easy\nnoun\n", encoding="utf-8")
+    assert list(iter_word_file(str(without_header))) == [("word", "grammar", "easy"),
+                                                         ("noun", "without_header", "medium")]
+
+    plain = tmp_path / "grammar.txt"
+    plain.write_text("# parts of speech\nverb\nword\n", encoding="utf-8")
+    assert list(iter_word_file(str(plain))) == [("verb", "grammar", "medium"), ("word", "grammar", "medium")]